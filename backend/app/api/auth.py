@@ -5,13 +5,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User as UserModel
 from app.schemas.user import UserResponse, UserCreate
 from app.database import get_db
-from app.utils.openai import client as openai_client
+from app.utils.http_clients import get_openai_client
 from app.utils.jwt import create_access_token, get_current_user
-from passlib.context import CryptContext
+from app.utils.security import hash_password, verify_password
 from datetime import datetime
 
 router = APIRouter(tags=["auth"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 async def get_user_by_username(db: AsyncSession, username: str) -> UserModel:
@@ -37,6 +36,7 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Username or email already exists")
 
     thread_id = None
+    openai_client = get_openai_client()
     if openai_client:
         try:
             thread = await openai_client.threads.create()
@@ -44,7 +44,7 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
         except Exception:
             thread_id = None
 
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = UserModel(
         username=user.username,
         email=user.email,
@@ -62,7 +62,7 @@ async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     user = await get_user_by_username(db, form_data.username)
-    if not pwd_context.verify(form_data.password, user.hashed_password):
+    if not await verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.category import Category
-from app.models.lesson import Lesson
+from fastapi import APIRouter, Request, Response
 from app.schemas.category import CategoryResponse
-from app.database import get_db
+from app.services.catalog import get_catalog
+from app.utils.etag import make_etag, not_modified, set_etag
 
 router = APIRouter(tags=["category"])
 
 @router.get("/categories", response_model=list[CategoryResponse])
-async def get_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Category))
-    categories = result.scalars().all()
+async def get_categories(request: Request, response: Response):
+    catalog = get_catalog()
+    etag = make_etag(catalog.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
     return [
         {
             "id": category.id,
@@ -23,5 +24,5 @@ async def get_categories(db: AsyncSession = Depends(get_db)):
                 for lesson in category.lessons
             ]
         }
-        for category in categories
-    ]
\ No newline at end of file
+        for category in catalog.categories
+    ]
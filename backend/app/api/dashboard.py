@@ -1,9 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.models.category import Category
-from app.models.lesson import Lesson
-from app.models.progress import Progress
+from app.services.catalog import get_catalog
+from app.services.progress_summary import get_progress_summaries, get_progress_version, completed_lesson_ids
+from app.utils.etag import make_etag, not_modified, set_etag
 from app.database import get_db
 from app.utils.jwt import get_current_user
 from typing import List
@@ -35,54 +34,46 @@ class DashboardResponse(BaseModel):
     chapters: List[ChapterResponse]
 
 @router.get("/dashboard", response_model=DashboardResponse)
-async def get_dashboard(user_id: int = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Category))
-    categories = result.scalars().all()
-    if not categories:
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    catalog = get_catalog()
+    etag = make_etag(catalog.version, user_id, await get_progress_version(db, user_id))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    if not catalog.categories:
         return DashboardResponse(chapters=[])
 
-    chapters_dict = {}
-    for category in categories:
-        chapter_id = category.chapter
-        if chapter_id not in chapters_dict:
-            chapters_dict[chapter_id] = []
-        chapters_dict[chapter_id].append(category)
+    summaries = await get_progress_summaries(db, user_id)
 
     chapters = []
-    for chapter_id, chapter_categories in sorted(chapters_dict.items()):
-        category_ids = [cat.id for cat in chapter_categories]
-        result = await db.execute(select(Lesson).filter(Lesson.category_id.in_(category_ids)))
-        lessons = result.scalars().all()
+    for chapter_id, chapter_categories in catalog.chapters:
+        lessons = [lesson for category in chapter_categories for lesson in category.lessons]
+        completed_ids = set()
+        for category in chapter_categories:
+            completed_ids |= completed_lesson_ids(summaries.get(category.id))
 
-        result = await db.execute(
-            select(Progress).filter(
-                Progress.user_id == user_id,
-                Progress.category_id.in_(category_ids),
-                Progress.type == "lesson",
-                Progress.completed == True
+        lesson_responses = [
+            LessonResponse(
+                id=str(lesson.id),
+                title=lesson.name,
+                subtitle=lesson.description or "Learn key phrases",
+                completed=str(lesson.id) in completed_ids,
+                categoryId=str(lesson.category_id)
             )
-        )
-        progress_records = result.scalars().all()
-        completed_lesson_ids = {p.activity_id.split("lesson-")[1] for p in progress_records if p.activity_id.startswith("lesson-")}
+            for lesson in lessons
+        ]
 
         total_lessons = len(lessons)
-        completed_lessons = len(completed_lesson_ids)
+        completed_lessons = len(completed_ids)
         progress = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
 
-        lesson_responses = []
-        for lesson in lessons:
-            result = await db.execute(select(Category).filter(Category.id == lesson.category_id))
-            category = result.scalars().first()
-            lesson_responses.append(
-                LessonResponse(
-                    id=str(lesson.id),
-                    title=lesson.name,
-                    subtitle=lesson.description or "Learn key phrases",
-                    completed=str(lesson.id) in completed_lesson_ids,
-                    categoryId=str(lesson.category_id)
-                )
-            )
-
         chapter_name = chapter_categories[0].name
         chapter_difficulty = chapter_categories[0].difficulty
 
@@ -96,4 +87,4 @@ async def get_dashboard(user_id: int = Depends(get_current_user), db: AsyncSessi
             )
         )
 
-    return DashboardResponse(chapters=chapters)
\ No newline at end of file
+    return DashboardResponse(chapters=chapters)
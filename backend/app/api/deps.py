@@ -0,0 +1,70 @@
+from dataclasses import dataclass, field
+from fastapi import Depends, HTTPException
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+from app.models.user import User
+from app.models.progress import Progress
+from app.services.catalog import CatalogLesson, CatalogCategory, get_catalog
+from app.database import get_db
+from app.utils.jwt import get_current_user
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class LessonContext:
+    lesson: CatalogLesson
+    user: User
+    category: CatalogCategory
+    progress: dict = field(default_factory=dict)  # activity_id -> completed, for the lesson's category
+
+    @property
+    def completed_activities(self) -> set:
+        return {activity_id for activity_id, completed in self.progress.items() if completed}
+
+    @property
+    def is_new_lesson(self) -> bool:
+        return not any(a.startswith("flashcard") or a.startswith("sentence") for a in self.progress)
+
+async def fetch_lesson_context(db: AsyncSession, lesson_id: int, user_id: int) -> LessonContext:
+    """Resolve the lesson and category from the catalog and load the user with their category
+    progress in one query.
+
+    The user lands in the session's identity map, so later ``db.get(User, user_id)`` calls in
+    the same request are served without another round trip.
+    """
+    catalog = get_catalog()
+    lesson = catalog.lesson(lesson_id)
+    if not lesson:
+        logger.error(f"Lesson with ID {lesson_id} not found")
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    category = catalog.category(lesson.category_id)
+    if not category:
+        logger.error(f"Category with ID {lesson.category_id} not found")
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    result = await db.execute(
+        select(User, Progress.activity_id, Progress.completed)
+        .outerjoin(Progress, and_(Progress.user_id == User.id, Progress.category_id == lesson.category_id))
+        .filter(User.id == user_id)
+    )
+    rows = result.all()
+    if not rows:
+        logger.error(f"User with ID {user_id} not found")
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user = rows[0][0]
+    progress = {}
+    for _, activity_id, completed in rows:
+        if activity_id is not None:
+            progress[activity_id] = progress.get(activity_id, False) or bool(completed)
+    logger.info(f"Loaded lesson context: lesson={lesson.name}, category={category.name}, user={user.email}, progress={len(progress)}")
+    return LessonContext(lesson=lesson, user=user, category=category, progress=progress)
+
+async def load_lesson_context(
+    lesson_id: int,
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> LessonContext:
+    """Dependency resolving the lesson context for the current user."""
+    return await fetch_lesson_context(db, lesson_id, user_id)
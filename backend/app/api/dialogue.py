@@ -3,21 +3,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.dialogue import Dialogue
 from app.models.user import User
-from app.models.category import Category
-from app.models.lesson import Lesson
 from app.models.progress import Progress
 from app.schemas.dialogue import DialogueResponse, ChatRequest, ChatResponse, TranslateResponse, SubmitDialogueRequest, SubmitDialogueResponse
 from app.database import get_db
 from app.utils.openai import generate_situation, chat_message, translate_message, evaluate_conversation
 from app.utils.jwt import get_current_user
+from app.services.progress_summary import record_progress
+from app.api.deps import LessonContext, load_lesson_context
 import json
 
 router = APIRouter(tags=["dialogue"])
 
 async def get_user(db: AsyncSession, user_id: int) -> User:
-    """Fetch user by ID, raising 404 if not found."""
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalars().first()
+    """Fetch user by ID, raising 404 if not found; served from the session when already loaded."""
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -25,23 +24,12 @@ async def get_user(db: AsyncSession, user_id: int) -> User:
 @router.get("/generate", response_model=DialogueResponse)
 async def generate_dialogue_situation(
     lesson_id: int,
-    user_id: int = Depends(get_current_user),
+    context: LessonContext = Depends(load_lesson_context),
     db: AsyncSession = Depends(get_db)
 ):
     """Generate or retrieve a cached situation for the dialogue."""
-    user = await get_user(db, user_id)
-    user_language = user.learning_language
-
-    # Fetch lesson and category
-    result = await db.execute(select(Lesson).filter(Lesson.id == lesson_id))
-    lesson = result.scalars().first()
-    if not lesson:
-        raise HTTPException(status_code=404, detail="Lesson not found")
-
-    result = await db.execute(select(Category).filter(Category.id == lesson.category_id))
-    category = result.scalars().first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
+    lesson, category, user_id = context.lesson, context.category, context.user.id
+    user_language = context.user.learning_language
 
     # Check for cached situation
     result = await db.execute(
@@ -121,6 +109,7 @@ async def chat(
             "situation": dialogue.situation,
             "conversation": conversation
         }
+        await record_progress(db, user_id, dialogue.category_id, f"dialogue-{dialogue.id}")
         progress = Progress(
             user_id=user_id,
             category_id=dialogue.category_id,
@@ -173,6 +162,7 @@ async def submit_dialogue(
         "situation": dialogue.situation,
         "conversation": request.conversation
     }
+    await record_progress(db, user_id, dialogue.category_id, f"dialogue-{dialogue.id}")
     progress = Progress(
         user_id=user_id,
         category_id=dialogue.category_id,
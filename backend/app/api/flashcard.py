@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
@@ -6,12 +6,13 @@ import logging
 from app.models.flashcard import Flashcard
 from app.models.user import User
 from app.models.category import Category
-from app.models.lesson import Lesson
 from app.models.flashcard_history import FlashcardHistory
-from app.schemas.flashcard import FlashcardResponse
+from app.schemas.flashcard import FlashcardResponse, DueFlashcardsResponse
 from app.database import get_db
 from app.utils.openai import generate_flashcard
+from app.api.deps import LessonContext, load_lesson_context
 from app.utils.jwt import get_current_user
+from app.services.review_scheduler import due_flashcards
 
 # Suppress SQLAlchemy logs
 for logger_name in ['sqlalchemy', 'sqlalchemy.engine', 'sqlalchemy.orm', 'sqlalchemy.pool', 'sqlalchemy.dialects']:
@@ -22,9 +23,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["flashcard"])
 
 async def get_user(db: AsyncSession, user_id: int) -> User:
-    """Fetch user by ID, raising 404 if not found."""
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalars().first()
+    """Fetch user by ID, raising 404 if not found; served from the session when already loaded."""
+    user = await db.get(User, user_id)
     if not user:
         logger.error(f"User not found for user_id: {user_id}")
         raise HTTPException(status_code=404, detail="User not found")
@@ -89,27 +89,14 @@ async def get_valid_flashcard_data(category: Category, user_language: str, lesso
 async def get_flashcard(
     lesson_id: int,
     lesson_name: str,
-    user_id: int = Depends(get_current_user),
+    context: LessonContext = Depends(load_lesson_context),
     db: AsyncSession = Depends(get_db)
 ):
     """Generate a flashcard for the given lesson."""
+    user_id, category = context.user.id, context.category
     logger.info(f"Generating flashcard for lesson_id: {lesson_id}, lesson_name: {lesson_name}, user_id: {user_id}")
     try:
-        user = await get_user(db, user_id)
-        user_language = user.learning_language or "Japanese"
-
-        # Fetch lesson and category
-        result = await db.execute(select(Lesson).filter(Lesson.id == lesson_id))
-        lesson = result.scalars().first()
-        if not lesson:
-            logger.error(f"Lesson not found for lesson_id: {lesson_id}")
-            raise HTTPException(status_code=404, detail="Lesson not found")
-
-        result = await db.execute(select(Category).filter(Category.id == lesson.category_id))
-        category = result.scalars().first()
-        if not category:
-            logger.error(f"Category not found for lesson_id: {lesson_id}")
-            raise HTTPException(status_code=404, detail="Category not found")
+        user_language = context.user.learning_language or "Japanese"
 
         # Generate flashcard
         flashcard_data = await get_valid_flashcard_data(category, user_language, lesson_name, db, user_id, lesson_id)
@@ -142,4 +129,26 @@ async def get_flashcard(
         raise
     except Exception as e:
         logger.error(f"Unexpected error in get_flashcard: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to generate flashcard")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to generate flashcard")
+
+@router.get("/due", response_model=DueFlashcardsResponse)
+async def get_due_flashcards(
+    limit: int = Query(default=20, ge=1, le=100, description="Maximum number of cards to return"),
+    user_id: int = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """The user's flashcards due for spaced-repetition review, most overdue first."""
+    due = await due_flashcards(db, user_id, limit)
+    logger.info(f"{len(due)} flashcards due for user {user_id}")
+    return {
+        "flashcards": [
+            {
+                **flashcard.to_dict(),
+                "due_at": state.due_at,
+                "interval_days": state.interval_days,
+                "ease": state.ease,
+                "repetitions": state.repetitions,
+            }
+            for flashcard, state in due
+        ]
+    }
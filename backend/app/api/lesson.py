@@ -1,19 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+import asyncio
 import logging
-from app.models.lesson import Lesson
-from app.models.user import User
-from app.models.category import Category
 from app.models.progress import Progress
 from app.models.mistaken_activity import MistakenActivity
 from app.models.flashcard import Flashcard
+from app.models.lesson_plan import LessonPlan
 from app.schemas.lesson import LessonResponse
 from app.database import get_db
-from app.utils.openai import generate_flashcard
+from app.utils.openai import generate_flashcard, generate_flashcards
 from app.api.sentence import get_scrambled_sentence
 from app.utils.jwt import get_current_user
 from app.utils.pexels import get_image
+from app.services.progress_summary import record_progress
+from app.services.catalog import get_catalog
+from app.api.deps import LessonContext, fetch_lesson_context, load_lesson_context
+from app.services.lesson_plan import (
+    regular_activities,
+    checkpoint_activities,
+    is_checkpoint_plan,
+    get_lesson_plan,
+    create_lesson_plan,
+    load_activities,
+    bind_slots,
+    rebuild_lesson_plan,
+    find_activity,
+    activity_response,
+    activity_flashcard_id,
+    find_plan_activity,
+    mark_activity_completed
+)
+from app.services.review_scheduler import record_review, GOOD, AGAIN
 import json
 
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +39,14 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["lesson"])
 
+async def attach_image(flashcard_data: dict) -> dict:
+    """Add the Pexels image URL for a freshly generated flashcard."""
+    try:
+        flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
+    except HTTPException:
+        flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
+    return flashcard_data
+
 async def get_flashcard_data(flashcard: Flashcard) -> dict:
     """Helper to format flashcard data with Pexels image."""
     pexels_image_url = "https://placehold.co/600x400"  # Default fallback
@@ -49,169 +75,170 @@ async def get_flashcard_data(flashcard: Flashcard) -> dict:
         "pexels_image_url": pexels_image_url
     }
 
-@router.get("/{lesson_id}/initial", response_model=LessonResponse)
-async def get_initial_lesson(lesson_id: int, user_id: int = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
-    logger.info(f"Received request for initial lesson {lesson_id} by user {user_id}")
-    
-    # Fetch the lesson
-    result = await db.execute(select(Lesson).filter_by(id=lesson_id))
-    lesson = result.scalars().first()
-    if not lesson:
-        logger.error(f"Lesson with ID {lesson_id} not found")
-        raise HTTPException(status_code=404, detail="Lesson not found")
-    logger.info(f"Found lesson: {lesson.name}, category_id: {lesson.category_id}")
-
-    # Fetch the user
-    result = await db.execute(select(User).filter_by(id=user_id))
-    user = result.scalars().first()
-    if not user:
-        logger.error(f"User with ID {user_id} not found")
-        raise HTTPException(status_code=404, detail="User not found")
-    logger.info(f"Found user: {user.email}, learning_language: {user.learning_language}")
+def sentence_data(sentence: dict) -> dict:
+    return {
+        "sentence_id": sentence["sentence_id"],
+        "scrambled_words": sentence["scrambled_words"],
+        "original_sentence": sentence["original_sentence"],
+        "english_sentence": sentence["english_sentence"],
+        "hints": sentence["hints"],
+        "explanation": sentence.get("explanation", "No explanation provided")
+    }
 
-    # Fetch category
-    result = await db.execute(select(Category).filter_by(id=lesson.category_id))
-    category = result.scalars().first()
-    if not category:
-        logger.error(f"Category with ID {lesson.category_id} not found")
-        raise HTTPException(status_code=404, detail="Category not found")
-    logger.info(f"Found category: {category.name}")
+async def checkpoint_outdated(db: AsyncSession, plan: LessonPlan, user_id: int, category_id: int) -> bool:
+    """Whether a checkpoint plan should be laid out again: it was finished, or mistakes were made
+    elsewhere in the category after it was built."""
+    if all(activity["completed"] for activity in load_activities(plan)):
+        return True
+    result = await db.execute(
+        select(func.max(MistakenActivity.created_at)).filter(
+            MistakenActivity.user_id == user_id,
+            MistakenActivity.category_id == category_id,
+            MistakenActivity.lesson_id != plan.lesson_id
+        )
+    )
+    newest = result.scalar()
+    return newest is not None and newest > plan.created_at
 
-    # Fetch progress
-    result = await db.execute(select(Progress).filter_by(user_id=user_id, category_id=lesson.category_id))
-    progress = result.scalars().all()
-    completed_activities = {p.activity_id for p in progress if p.completed}
-    logger.info(f"Completed activities for user {user_id}: {completed_activities}")
+async def get_or_create_plan(db: AsyncSession, context: LessonContext) -> LessonPlan:
+    """Return the user's plan for the lesson, laying out its activity slots on first entry.
 
-    # Determine if the lesson is new
-    is_new_lesson = not any(p for p in progress if p.activity_id.startswith("flashcard") or p.activity_id.startswith("sentence"))
-    logger.info(f"Lesson {lesson_id} is {'new' if is_new_lesson else 'revisited'} for user {user_id}")
+    Checkpoint plans are rebuilt from the current mistakes whenever checkpoint_outdated says so.
+    """
+    lesson, user_id = context.lesson, context.user.id
+    checkpoint = lesson.name.lower() == "checkpoint"
+    plan = await get_lesson_plan(db, user_id, lesson.id)
+    if plan and not (checkpoint and await checkpoint_outdated(db, plan, user_id, lesson.category_id)):
+        return plan
 
-    activities = []
-    if lesson.name.lower() == "checkpoint":
+    logger.info(f"Lesson {lesson.id} is {'new' if context.is_new_lesson else 'revisited'} for user {user_id}")
+    if checkpoint:
         result = await db.execute(
             select(MistakenActivity).filter_by(user_id=user_id, category_id=lesson.category_id)
         )
-        mistaken_activities = result.scalars().all()
-        if mistaken_activities:
-            for ma in mistaken_activities:
-                if ma.activity_type == "flashcard":
-                    flashcard_data = await generate_flashcard(
-                        category=category.name,
-                        target_language=user.learning_language,
-                        category_id=lesson.category_id,
-                        lesson_name=lesson.name,
-                        db=db,
-                        user_id=user_id,
-                        word=ma.word,
-                        is_new_lesson=False
-                    )
-                    try:
-                        flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
-                    except HTTPException:
-                        flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
-                    activities.append({
-                        "id": f"review-{ma.activity_id}",
-                        "type": "flashcard",
-                        "data": flashcard_data,
-                        "completed": False
-                    })
-                    break
-        else:
-            flashcard_data = await generate_flashcard(
-                category=category.name,
-                target_language=user.learning_language,
-                category_id=lesson.category_id,
-                lesson_name=lesson.name,
-                db=db,
-                user_id=user_id,
-                harder=True,
-                is_new_lesson=False
-            )
-            try:
-                flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
-            except HTTPException:
-                flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
-            activities.append({
-                "id": "new-flashcard-0",
-                "type": "flashcard",
-                "data": flashcard_data,
-                "completed": False
-            })
+        activities = checkpoint_activities(result.scalars().all())
     else:
-        cached_flashcards = []
-        if not is_new_lesson:
-            result = await db.execute(
-                select(Flashcard).filter(
-                    Flashcard.user_id == user_id,
-                    Flashcard.category_id == lesson.category_id
+        activities = regular_activities()
+    if plan:
+        return await rebuild_lesson_plan(db, user_id, lesson.id, activities)
+    return await create_lesson_plan(
+        db, user_id, lesson.id, activities, context.completed_activities, context.is_new_lesson
+    )
+
+async def reusable_flashcards(db: AsyncSession, activities: list[dict], user_id: int, category_id: int, limit: int) -> list[Flashcard]:
+    """The user's existing cards in the category that are not yet bound to a slot of this plan."""
+    bound_ids = [a["data"]["flashcard_id"] for a in activities if a["type"] == "flashcard" and a["data"]]
+    result = await db.execute(
+        select(Flashcard).filter(
+            Flashcard.user_id == user_id,
+            Flashcard.category_id == category_id,
+            Flashcard.id.notin_(bound_ids)
+        ).order_by(Flashcard.id).limit(limit)
+    )
+    return result.scalars().all()
+
+@router.get("/{lesson_id}/initial", response_model=LessonResponse)
+async def get_initial_lesson(
+    lesson_id: int,
+    context: LessonContext = Depends(load_lesson_context),
+    db: AsyncSession = Depends(get_db)
+):
+    lesson, user, category = context.lesson, context.user, context.category
+    user_id = user.id
+    logger.info(f"Received request for initial lesson {lesson_id} by user {user_id}")
+    plan = await get_or_create_plan(db, context)
+    activities = load_activities(plan)
+
+    filled = []  # Slots bound by this request, merged into the locked plan at the end
+    if is_checkpoint_plan(activities):
+        selected = [a for a in activities if a["type"] == "flashcard"][:1]
+        for slot in selected:
+            if slot["data"] is None:
+                flashcard_data = await generate_flashcard(
+                    category=category.name,
+                    target_language=user.learning_language,
+                    category_id=lesson.category_id,
+                    lesson_name=lesson.name,
+                    db=db,
+                    user_id=user_id,
+                    word=slot["word"],
+                    harder=slot["harder"],
+                    is_new_lesson=False
                 )
-            )
-            cached_flashcards = result.scalars().all()
-            logger.info(f"Found {len(cached_flashcards)} cached flashcards for user {user_id}, category {lesson.category_id}")
+                slot["data"] = await attach_image(flashcard_data)
+                filled.append(slot)
+    else:
+        # First set: flashcard-0-0, flashcard-0-1, sentence-0. Slots bound on an earlier visit are
+        # returned as they are. Image lookups start as soon as each new word is known and run on
+        # their own sessions while the sentence is generated, so the lesson takes as long as the
+        # slowest chain. All rows are written in one commit at the end.
+        selected = [a for a in activities if a["id"] in ("flashcard-0-0", "flashcard-0-1", "sentence-0") and not a["completed"]]
+        unbound = [a for a in selected if a["type"] == "flashcard" and a["data"] is None]
+        flashcard_tasks = {}
+        try:
+            words = {a["id"]: a["data"]["word"] for a in activities if a["id"].startswith("flashcard-0-") and a["data"]}
+            if unbound and not plan.is_new_lesson:
+                cached_flashcards = await reusable_flashcards(db, activities, user_id, lesson.category_id, len(unbound))
+                for slot, flashcard in zip(unbound, cached_flashcards):
+                    logger.info(f"Using cached flashcard: {flashcard.word} for {slot['id']}")
+                    flashcard_tasks[slot["id"]] = asyncio.create_task(get_flashcard_data(flashcard))
+                    words[slot["id"]] = flashcard.word
 
-        # Load first set: flashcard-0-0, flashcard-0-1, sentence-0
-        for i in range(2):
-            activity_id = f"flashcard-0-{i}"
-            if activity_id not in completed_activities:
-                flashcard_data = None
-                if not is_new_lesson and i < len(cached_flashcards):
-                    flashcard_data = await get_flashcard_data(cached_flashcards[i])
-                    logger.info(f"Using cached flashcard: {flashcard_data['word']} for {activity_id}")
-                else:
-                    logger.info(f"Generating flashcard for {activity_id}")
-                    flashcard_data = await generate_flashcard(
-                        category=category.name,
-                        target_language=user.learning_language,
-                        category_id=lesson.category_id,
-                        lesson_name=lesson.name,
-                        db=db,
-                        user_id=user_id,
-                        is_new_lesson=is_new_lesson
+            # Every slot without a cached card is filled from a single batched generation call
+            missing = [slot for slot in unbound if slot["id"] not in flashcard_tasks]
+            if missing:
+                logger.info(f"Generating flashcards for {[slot['id'] for slot in missing]}")
+                generated = await generate_flashcards(
+                    category=category.name,
+                    target_language=user.learning_language,
+                    category_id=lesson.category_id,
+                    lesson_name=lesson.name,
+                    db=db,
+                    user_id=user_id,
+                    n=len(missing),
+                    is_new_lesson=plan.is_new_lesson,
+                    commit=False
+                )
+                for slot, flashcard_data in zip(missing, generated):
+                    flashcard_tasks[slot["id"]] = asyncio.create_task(attach_image(flashcard_data))
+                    words[slot["id"]] = flashcard_data["word"]
+
+            sentence_slot = activities[find_activity(activities, "sentence-0")]
+            if sentence_slot in selected and sentence_slot["data"] is None:
+                try:
+                    sentence = await get_scrambled_sentence(
+                        category_name=category.name,
+                        category=category,
+                        user_id=user_id, 
+                        db=db, 
+                        lesson_id=lesson_id,
+                        flashcard_words=",".join(words.values()),
+                        commit=False
                     )
-                    try:
-                        flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
-                    except HTTPException:
-                        flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
-                activities.append({
-                    "id": activity_id,
-                    "type": "flashcard",
-                    "data": flashcard_data,
-                    "completed": False
-                })
+                    logger.info(f"Generated sentence for sentence-0: {sentence}")
+                    sentence_slot["data"] = sentence_data(sentence)
+                    filled.append(sentence_slot)
+                except HTTPException as e:
+                    logger.error(f"Failed to generate sentence for sentence-0: {str(e)}")
+                    # Fallback: Skip sentence but continue with flashcards
+                    logger.warning(f"Skipping sentence-0 due to error, proceeding with flashcards only")
 
-        activity_id = "sentence-0"
-        if activity_id not in completed_activities:
-            flashcard_words = ",".join(fc["data"]["word"] for fc in activities if fc["type"] == "flashcard")
-            try:
-                sentence = await get_scrambled_sentence(
-                    category_name=category.name, 
-                    user_id=user_id, 
-                    db=db, 
-                    lesson_id=lesson_id,
-                    flashcard_words=flashcard_words
-                )
-                logger.info(f"Generated sentence for {activity_id}: {sentence}")
-                activities.append({
-                    "id": activity_id,
-                    "type": "sentence",
-                    "data": {
-                        "sentence_id": sentence["sentence_id"],
-                        "scrambled_words": sentence["scrambled_words"],
-                        "original_sentence": sentence["original_sentence"],
-                        "english_sentence": sentence["english_sentence"],
-                        "hints": sentence["hints"],
-                        "explanation": sentence.get("explanation", "No explanation provided")
-                    },
-                    "completed": False
-                })
-            except HTTPException as e:
-                logger.error(f"Failed to generate sentence for {activity_id}: {str(e)}")
-                # Fallback: Skip sentence but continue with flashcards
-                logger.warning(f"Skipping sentence-0 due to error, proceeding with flashcards only")
+            for slot in unbound:
+                slot["data"] = await flashcard_tasks[slot["id"]]
+                filled.append(slot)
+        finally:
+            # When anything above fails, stop the lookups still running and collect their errors
+            for task in flashcard_tasks.values():
+                task.cancel()
+            await asyncio.gather(*flashcard_tasks.values(), return_exceptions=True)
+
+    stored = {slot["id"]: slot for slot in await bind_slots(db, user_id, lesson_id, filled)}
+    await db.commit()
 
-    logger.info(f"Returning initial activities for lesson {lesson_id}: {[a['id'] for a in activities]}")
-    return {"activities": activities}
+    selected = [stored.get(a["id"], a) for a in selected]
+    selected = [a for a in selected if a["data"] is not None]
+    logger.info(f"Returning initial activities for lesson {lesson_id}: {[a['id'] for a in selected]}")
+    return {"activities": [activity_response(a) for a in selected]}
 
 @router.get("/{lesson_id}/next", response_model=LessonResponse)
 async def get_next_activity(
@@ -222,248 +249,117 @@ async def get_next_activity(
 ):
     logger.info(f"Received request for next activity after {current_activity_id} in lesson {lesson_id} by user {user_id}")
 
-    # Fetch the lesson
-    result = await db.execute(select(Lesson).filter_by(id=lesson_id))
-    lesson = result.scalars().first()
-    if not lesson:
-        logger.error(f"Lesson with ID {lesson_id} not found")
-        raise HTTPException(status_code=404, detail="Lesson not found")
-    logger.info(f"Found lesson: {lesson.name}, category_id: {lesson.category_id}")
+    # Content bound on an earlier call is served straight from the plan
+    plan = await get_lesson_plan(db, user_id, lesson_id)
+    context = None
+    if not plan:
+        context = await fetch_lesson_context(db, lesson_id, user_id)
+        plan = await get_or_create_plan(db, context)
+    activities = load_activities(plan)
+    checkpoint = is_checkpoint_plan(activities)
 
-    # Fetch the user
-    result = await db.execute(select(User).filter_by(id=user_id))
-    user = result.scalars().first()
-    if not user:
-        logger.error(f"User with ID {user_id} not found")
-        raise HTTPException(status_code=404, detail="User not found")
-    logger.info(f"Found user: {user.email}, learning_language: {user.learning_language}")
+    current_index = find_activity(activities, current_activity_id)
+    if current_index == -1 and not checkpoint:
+        logger.error(f"Invalid current_activity_id: {current_activity_id}")
+        raise HTTPException(status_code=400, detail=f"Invalid current activity ID: {current_activity_id}")
+    if current_index == -1 or current_index + 1 >= len(activities):
+        logger.info(f"No more activities after {current_activity_id}")
+        return {"activities": []}
 
-    # Fetch category
-    result = await db.execute(select(Category).filter_by(id=lesson.category_id))
-    category = result.scalars().first()
-    if not category:
-        logger.error(f"Category with ID {lesson.category_id} not found")
-        raise HTTPException(status_code=404, detail="Category not found")
-    logger.info(f"Found category: {category.name}")
+    slot = activities[current_index + 1]
+    if slot["completed"]:
+        logger.info(f"Next activity {slot['id']} already completed")
+        return {"activities": []}
+    if slot["data"] is not None:
+        logger.info(f"Returning planned activity {slot['id']} for lesson {lesson_id}")
+        return {"activities": [activity_response(slot)]}
 
-    # Fetch progress
-    result = await db.execute(select(Progress).filter_by(user_id=user_id, category_id=lesson.category_id))
-    progress = result.scalars().all()
-    completed_activities = {p.activity_id for p in progress if p.completed}
-    logger.info(f"Completed activities for user {user_id}: {completed_activities}")
+    context = context or await fetch_lesson_context(db, lesson_id, user_id)
+    lesson, user, category = context.lesson, context.user, context.category
 
-    # Determine if the lesson is new
-    is_new_lesson = not any(p for p in progress if p.activity_id.startswith("flashcard") or p.activity_id.startswith("sentence"))
-    logger.info(f"Lesson {lesson_id} is {'new' if is_new_lesson else 'revisited'} for user {user_id}")
-
-    activities = []
-    if lesson.name.lower() == "checkpoint":
-        result = await db.execute(
-            select(MistakenActivity).filter_by(user_id=user_id, category_id=lesson.category_id)
+    async def new_flashcard() -> dict:
+        if not checkpoint and not plan.is_new_lesson:
+            cached_flashcards = await reusable_flashcards(db, activities, user_id, lesson.category_id, 1)
+            if cached_flashcards:
+                logger.info(f"Using cached flashcard: {cached_flashcards[0].word} for {slot['id']}")
+                return await get_flashcard_data(cached_flashcards[0])
+        logger.info(f"Generating flashcard for {slot['id']}")
+        flashcard_data = await generate_flashcard(
+            category=category.name,
+            target_language=user.learning_language,
+            category_id=lesson.category_id,
+            lesson_name=lesson.name,
+            db=db,
+            user_id=user_id,
+            word=slot["word"],
+            harder=slot["harder"],
+            is_new_lesson=not checkpoint and plan.is_new_lesson
         )
-        mistaken_activities = result.scalars().all()
-        checkpoint_activities = [(f"review-{ma.activity_id}", ma.activity_type, ma.word) for ma in mistaken_activities]
-        if not mistaken_activities:
-            checkpoint_activities = [
-                ("new-flashcard-0", "flashcard", None),
-                ("new-flashcard-1", "flashcard", None),
-                ("new-sentence-0", "sentence", None)
-            ]
+        return await attach_image(flashcard_data)
 
-        current_index = next((i for i, (aid, _, _) in enumerate(checkpoint_activities) if aid == current_activity_id), -1)
-        if current_index == -1 or current_index + 1 >= len(checkpoint_activities):
-            logger.info(f"No more checkpoint activities after {current_activity_id}")
-            return {"activities": []}
-
-        next_activity_id, next_activity_type, next_word = checkpoint_activities[current_index + 1]
-        if next_activity_id in completed_activities:
-            logger.info(f"Next activity {next_activity_id} already completed")
+    if slot["type"] == "flashcard":
+        slot["data"] = await new_flashcard()
+    elif checkpoint:
+        try:
+            sentence = await get_scrambled_sentence(
+                category_name=category.name,
+                category=category,
+                user_id=user_id, 
+                db=db, 
+                lesson_id=lesson_id,
+                harder=True
+            )
+            logger.info(f"Checkpoint next sentence response: {sentence}")
+            slot["data"] = sentence_data(sentence)
+        except HTTPException as e:
+            logger.error(f"Failed to generate sentence for {slot['id']}: {str(e)}")
             return {"activities": []}
+    else:
+        set_index = int(slot["id"].split('-')[1])
+        flashcard_words = ",".join(
+            a["data"]["word"] for a in activities if a["id"].startswith(f"flashcard-{set_index}-") and a["data"]
+        )
 
-        if next_activity_type == "flashcard":
-            flashcard_data = await generate_flashcard(
-                category=category.name,
-                target_language=user.learning_language,
-                category_id=lesson.category_id,
-                lesson_name=lesson.name,
-                db=db,
-                user_id=user_id,
-                word=next_word,
-                harder=not next_word,
-                is_new_lesson=False
-            )
-            try:
-                flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
-            except Exception as e:
-                logger.warning(f"Failed to get image for word '{flashcard_data['word']}': {str(e)}")
-                flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
-            activities.append({
-                "id": next_activity_id,
-                "type": "flashcard",
-                "data": flashcard_data,
-                "completed": False
-            })
-        else:
+        # Retry sentence generation up to 2 times
+        for attempt in range(2):
             try:
                 sentence = await get_scrambled_sentence(
-                    category_name=category.name, 
+                    category_name=category.name,
+                    category=category,
                     user_id=user_id, 
-                    db=db, 
-                    lesson_id=lesson_id,  # Added lesson_id parameter
-                    harder=True
+                    db=db,
+                    lesson_id=lesson_id,
+                    flashcard_words=flashcard_words if attempt == 0 else None,
+                    harder=False
                 )
-                logger.info(f"Checkpoint next sentence response: {sentence}")
-                activities.append({
-                    "id": next_activity_id,
-                    "type": "sentence",
-                    "data": {
-                        "sentence_id": sentence["sentence_id"],
-                        "scrambled_words": sentence["scrambled_words"],
-                        "original_sentence": sentence["original_sentence"],
-                        "english_sentence": sentence["english_sentence"],
-                        "hints": sentence["hints"],
-                        "explanation": sentence.get("explanation", "No explanation provided")
-                    },
-                    "completed": False
-                })
+                logger.info(f"Generated sentence for {slot['id']}: {sentence}")
+                slot["data"] = sentence_data(sentence)
+                break
             except HTTPException as e:
-                logger.error(f"Failed to generate sentence for {next_activity_id}: {str(e)}")
-                return {"activities": []}
-    else:
-        lesson_activities = []
-        cached_flashcards = []
-        if not is_new_lesson:
-            result = await db.execute(
-                select(Flashcard).filter(
-                    Flashcard.user_id == user_id,
-                    Flashcard.category_id == lesson.category_id
-                )
-            )
-            cached_flashcards = result.scalars().all()
-            logger.info(f"Found {len(cached_flashcards)} cached flashcards for user {user_id}, category {lesson.category_id}")
-
-        for i in range(3):
-            for j in range(2):
-                lesson_activities.append((f"flashcard-{i}-{j}", "flashcard", None))
-            lesson_activities.append((f"sentence-{i}", "sentence", None))
+                logger.warning(f"Sentence generation attempt {attempt + 1} failed for {slot['id']}: {str(e)}")
 
-        current_index = next((i for i, (aid, _, _) in enumerate(lesson_activities) if aid == current_activity_id), -1)
-        if current_index == -1:
-            logger.error(f"Invalid current_activity_id: {current_activity_id}")
-            raise HTTPException(status_code=400, detail=f"Invalid current activity ID: {current_activity_id}")
-        if current_index + 1 >= len(lesson_activities):
-            logger.info(f"No more activities after {current_activity_id}")
-            return {"activities": []}
-
-        next_activity_id, next_activity_type, _ = lesson_activities[current_index + 1]
-        if next_activity_id in completed_activities:
-            logger.info(f"Next activity {next_activity_id} already completed")
-            return {"activities": []}
+        if slot["data"] is None:
+            logger.error(f"All sentence generation attempts failed for {slot['id']}")
+            # Fallback: Bind a flashcard to the slot instead
+            slot["type"] = "flashcard"
+            slot["data"] = await new_flashcard()
+            logger.info(f"Fallback to flashcard for {slot['id']}")
 
-        if next_activity_type == "flashcard":
-            flashcard_data = None
-            set_index, flashcard_in_set = map(int, next_activity_id.split('-')[1:])
-            flashcard_position = set_index * 2 + flashcard_in_set
-            if not is_new_lesson and flashcard_position < len(cached_flashcards):
-                flashcard_data = await get_flashcard_data(cached_flashcards[flashcard_position])
-                logger.info(f"Using cached flashcard: {flashcard_data['word']} for {next_activity_id}")
-            else:
-                logger.info(f"Generating flashcard for {next_activity_id}")
-                flashcard_data = await generate_flashcard(
-                    category=category.name,
-                    target_language=user.learning_language,
-                    category_id=lesson.category_id,
-                    lesson_name=lesson.name,
-                    db=db,
-                    user_id=user_id,
-                    is_new_lesson=is_new_lesson
-                )
-                try:
-                    flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
-                except Exception as e:
-                    logger.warning(f"Failed to get image for word '{flashcard_data['word']}': {str(e)}")
-                    flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
-            activities.append({
-                "id": next_activity_id,
-                "type": "flashcard",
-                "data": flashcard_data,
-                "completed": False
-            })
-        else:
-            set_index = int(next_activity_id.split('-')[1])
-            flashcard_words = ",".join(
-                [fc.word for fc in cached_flashcards[set_index*2:(set_index+1)*2]]
-            ) if cached_flashcards and set_index*2 < len(cached_flashcards) else ""
-            
-            # Retry sentence generation up to 2 times
-            sentence = None
-            for attempt in range(2):
-                try:
-                    sentence = await get_scrambled_sentence(
-                        category_name=category.name, 
-                        user_id=user_id, 
-                        db=db,
-                        lesson_id=lesson_id,  # Added lesson_id parameter
-                        flashcard_words=flashcard_words if attempt == 0 else None,
-                        harder=False
-                    )
-                    logger.info(f"Generated sentence for {next_activity_id}: {sentence}")
-                    break
-                except HTTPException as e:
-                    logger.warning(f"Sentence generation attempt {attempt + 1} failed for {next_activity_id}: {str(e)}")
-            
-            if sentence:
-                activities.append({
-                    "id": next_activity_id,
-                    "type": "sentence",
-                    "data": {
-                        "sentence_id": sentence["sentence_id"],
-                        "scrambled_words": sentence["scrambled_words"],
-                        "original_sentence": sentence["original_sentence"],
-                        "english_sentence": sentence["english_sentence"],
-                        "hints": sentence["hints"],
-                        "explanation": sentence.get("explanation", "No explanation provided")
-                    },
-                    "completed": False
-                })
-            else:
-                logger.error(f"All sentence generation attempts failed for {next_activity_id}")
-                # Fallback: Generate a flashcard
-                flashcard_data = await generate_flashcard(
-                    category=category.name,
-                    target_language=user.learning_language,
-                    category_id=lesson.category_id,
-                    lesson_name=lesson.name,
-                    db=db,
-                    user_id=user_id,
-                    is_new_lesson=is_new_lesson
-                )
-                try:
-                    flashcard_data["pexels_image_url"] = await get_image(flashcard_data["word"])
-                except Exception as e:
-                    logger.warning(f"Failed to get image for word '{flashcard_data['word']}': {str(e)}")
-                    flashcard_data["pexels_image_url"] = "https://placehold.co/600x400"
-                activities.append({
-                    "id": next_activity_id,
-                    "type": "flashcard",
-                    "data": flashcard_data,
-                    "completed": False
-                })
-                logger.info(f"Fallback to flashcard for {next_activity_id}")
-
-    logger.info(f"Returning next activity {next_activity_id} for lesson {lesson_id}")
-    return {"activities": activities}
+    slot, = await bind_slots(db, user_id, lesson_id, [slot])
+    await db.commit()
+    logger.info(f"Returning next activity {slot['id']} for lesson {lesson_id}")
+    return {"activities": [activity_response(slot)]}
 
 @router.post("/{lesson_id}/complete")
 async def complete_activity(lesson_id: int, body: dict, user_id: int = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     logger.info(f"Completing activity for lesson {lesson_id}, user {user_id}")
     
-    result = await db.execute(select(Lesson).filter_by(id=lesson_id))
-    lesson = result.scalars().first()
+    lesson = get_catalog().lesson(lesson_id)
     if not lesson:
         logger.error(f"Lesson with ID {lesson_id} not found")
         raise HTTPException(status_code=404, detail="Lesson not found")
 
+    await record_progress(db, user_id, lesson.category_id, body["activityId"])
     progress = Progress(
         user_id=user_id,
         category_id=lesson.category_id,
@@ -473,6 +369,11 @@ async def complete_activity(lesson_id: int, body: dict, user_id: int = Depends(g
         result=str(body["result"])
     )
     db.add(progress)
+    activity = await mark_activity_completed(db, user_id, lesson_id, body["activityId"])
+    # Wrong answers are graded by the mistake report the client sends alongside
+    flashcard_id = activity_flashcard_id(activity)
+    if flashcard_id and body["result"] == "correct":
+        await record_review(db, user_id, flashcard_id, GOOD)
     await db.commit()
     logger.info(f"Activity {body['activityId']} completed for lesson {lesson_id}")
     return {"status": "success"}
@@ -481,8 +382,7 @@ async def complete_activity(lesson_id: int, body: dict, user_id: int = Depends(g
 async def report_mistake(lesson_id: int, body: dict, user_id: int = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     logger.info(f"Reporting mistake for lesson {lesson_id}, user {user_id}, activity {body['activity_id']}")
     
-    result = await db.execute(select(Lesson).filter_by(id=lesson_id))
-    lesson = result.scalars().first()
+    lesson = get_catalog().lesson(lesson_id)
     if not lesson:
         logger.error(f"Lesson with ID {lesson_id} not found")
         raise HTTPException(status_code=404, detail="Lesson not found")
@@ -496,6 +396,10 @@ async def report_mistake(lesson_id: int, body: dict, user_id: int = Depends(get_
         word=body.get("word")
     )
     db.add(mistake)
+    if body["activity_type"] == "flashcard":
+        flashcard_id = activity_flashcard_id(await find_plan_activity(db, user_id, lesson_id, body["activity_id"]))
+        if flashcard_id:
+            await record_review(db, user_id, flashcard_id, AGAIN)
     await db.commit()
     logger.info(f"Mistake reported for activity {body['activity_id']}")
     return {"status": "success"}
\ No newline at end of file
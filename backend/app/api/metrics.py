@@ -0,0 +1,54 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.database import engine
+from app.services.flashcard_catalog import flashcard_catalog_stats
+from app.services.flashcard_pool import pool_stats
+from app.services.recently_used import RECENTLY_USED_BACKEND, recently_used_stats
+from app.services.sentence_bank import sentence_bank_stats
+from app.utils.llm_cache import llm_cache_stats
+from app.utils.metrics import render_gauges, render_histograms
+from app.utils.openai import get_coalescing_stats, get_output_stats
+from app.utils.pexels import image_cache_stats, image_fetch_stats, pexels_limiter
+from app.utils.security import password_pool_stats
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+def _db_pool_stats() -> dict:
+    pool = engine.pool
+    stats = {}
+    for key, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+        if hasattr(pool, method):
+            stats[key] = getattr(pool, method)()
+    return stats
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request and upstream latency histograms plus cache, pool and limiter state, in Prometheus text format."""
+    lines = render_histograms()
+    lines += render_gauges("languagepal_llm_requests", "OpenAI request coalescing per prompt type", [
+        ({"prompt_type": prompt_type}, stats) for prompt_type, stats in get_coalescing_stats().items()
+    ])
+    lines += render_gauges("languagepal_llm_output", "LLM replies repaired locally, re-asked for missing fields or rejected", [
+        ({"prompt_type": prompt_type}, stats) for prompt_type, stats in get_output_stats().items()
+    ])
+    lines += render_gauges("languagepal_llm_cache", "LLM response cache", [({}, llm_cache_stats())])
+    lines += render_gauges("languagepal_image_cache", "Pexels image URL cache", [({}, image_cache_stats())])
+    lines += render_gauges("languagepal_image_fetches", "Pexels fetch coalescing", [({}, image_fetch_stats())])
+    lines += render_gauges("languagepal_pexels_limiter", "Pexels request budget", [({}, pexels_limiter.stats())])
+    lines += render_gauges("languagepal_password_pool", "Password hashing worker pool", [({}, password_pool_stats())])
+    lines += render_gauges("languagepal_flashcard_pool", "Pre-generated flashcards per pool", [
+        ({"pool": pool}, {"depth": depth}) for pool, depth in pool_stats().items()
+    ])
+    lines += render_gauges("languagepal_flashcard_catalog", "Flashcards assigned from the shared catalog", [
+        ({}, flashcard_catalog_stats())
+    ])
+    lines += render_gauges("languagepal_recently_used", "Recently served sentences per user and lesson", [
+        ({"backend": RECENTLY_USED_BACKEND}, recently_used_stats())
+    ])
+    lines += render_gauges("languagepal_sentence_bank", "Sentence activities served from stored sentences", [
+        ({}, sentence_bank_stats())
+    ])
+    lines += render_gauges("languagepal_db_pool", "Database connection pool", [({}, _db_pool_stats())])
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
@@ -7,20 +7,25 @@ from sqlalchemy import select
 from datetime import datetime
 from app.models.sentence import Sentence, SentenceTranslation
 from app.models.user import User
-from app.models.category import Category
-from app.models.lesson import Lesson
 from app.models.progress import Progress
 from app.models.flashcard import Flashcard
 from app.schemas.sentence import SentenceResponse, SubmitSentenceRequest, SubmitSentenceResponse
 from app.database import get_db
 from app.utils.openai import translate_sentence
 from app.utils.jwt import get_current_user
+from app.services.progress_summary import record_progress
+from app.services.catalog import CatalogCategory, get_catalog
+from app.services.recently_used import get_recently_used
+from app.services.sentence_bank import difficulty_for, find_sentence_id, pick_sentence, store_sentence, store_translation
+from app.api.deps import LessonContext, load_lesson_context
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["sentence"])
 
+SENTENCE_GENERATION_ATTEMPTS = 3  # LLM calls allowed before giving up on a sentence the user hasn't had
+
 # Dependency to get the Request object
 def get_request(request: Request) -> Request:
     """Dependency to provide the Request object."""
@@ -34,9 +39,8 @@ def get_session_state(request: Request = Depends(get_request)):
     return request.state.used_sentence_ids
 
 async def get_user(db: AsyncSession, user_id: int) -> User:
-    """Fetch user by ID, raising 404 if not found."""
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalars().first()
+    """Fetch user by ID, raising 404 if not found; served from the session when already loaded."""
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -58,31 +62,8 @@ async def get_translation(db: AsyncSession, sentence_id: int, language: str, fla
     if translation:
         return translation
 
-    # Fetch category
-    result = await db.execute(select(Category).filter(Category.id == sentence.category_id))
-    category = result.scalars().first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
-    # Prepare prompt with explicit request for English translation
-    sentence_prompt = (
-        f"""
-        Generate a simple sentence in {language} for the category '{category.name}' suitable for language learners.
-        {"Use the words: " + ", ".join(flashcard_words) + "." if flashcard_words else "Choose appropriate words."}
-        Provide the response in JSON format with the following structure:
-        {{
-            "words": ["word1", "word2", ...],
-            "sentence": "Full sentence in {language}",
-            "english_sentence": "English translation",
-            "hints": [
-                {{"text": "Hint text", "usefulness": number}},
-                ...
-            ],
-            "explanation": "Detailed explanation including the English translation"
-        }}
-        """
-    )
-    translation_result = await translate_sentence(sentence_prompt, language)
+    # Translate the stored English sentence so the response cache is keyed on its text
+    translation_result = await translate_sentence(sentence.text, language)
     logger.info(f"Translation result for sentence_id {sentence_id}: {translation_result}")
 
     # Parse and validate result
@@ -98,7 +79,6 @@ async def get_translation(db: AsyncSession, sentence_id: int, language: str, fla
 
     translated_words = [word.strip() for word in translation_result["words"] if word.strip() not in [",", "，"]]
     translated_text = translation_result["sentence"].strip().rstrip(",").rstrip("，")
-    english_text = translation_result["english_sentence"].strip()
 
     # Validate sentence
     if len(translated_words) < 2:
@@ -111,30 +91,23 @@ async def get_translation(db: AsyncSession, sentence_id: int, language: str, fla
     hints = [hint for hint in translation_result["hints"] if isinstance(hint, dict) and "text" in hint]
     explanation = translation_result["explanation"] or "No explanation available"
 
-    # Update Sentence.text with English translation
-    sentence.text = english_text
-    db.add(sentence)
-
-    result = await db.execute(
-        select(SentenceTranslation).filter(
-            SentenceTranslation.sentence_id == sentence_id,
-            SentenceTranslation.language == language
-        )
-    )
-    translation = result.scalars().first()
-    if not translation:
-        translation = SentenceTranslation(
-            sentence_id=sentence_id,
-            language=language,
-            translated_text=translated_text,
-            translated_words=json.dumps(translated_words),
-            hints=json.dumps(hints),
-            explanation=explanation
-        )
-        db.add(translation)
-        await db.commit()
+    translation = await store_translation(db, sentence_id, language, translated_text, translated_words, hints, explanation)
+    await db.commit()
     return translation
 
+def scrambled_response(sentence: Sentence, translation: SentenceTranslation) -> dict:
+    """Sentence payload with the stored translation's words in a fresh random order."""
+    shuffled_words = json.loads(translation.translated_words)
+    random.shuffle(shuffled_words)
+    return {
+        "sentence_id": sentence.id,
+        "scrambled_words": shuffled_words,
+        "original_sentence": translation.translated_text,
+        "english_sentence": sentence.text,
+        "hints": [{"text": hint["text"], "usefulness": hint["usefulness"]} for hint in json.loads(translation.hints or "[]")],
+        "explanation": translation.explanation if translation.explanation else "No explanation available"
+    }
+
 async def get_scrambled_sentence(
     category_name: str,
     user_id: int,
@@ -143,21 +116,19 @@ async def get_scrambled_sentence(
     flashcard_words: str = None,
     sentence_id: int = None,
     harder: bool = False,
-    request: Request = None  # Make request optional
+    request: Request = None,  # Make request optional
+    commit: bool = True,
+    category: CatalogCategory = None
 ):
-    """Generate a new scrambled sentence for the given category and user, unique within the lesson."""
+    """Generate a new scrambled sentence for the given category and user, unique within the lesson.
+
+    With commit=False the rows are only flushed, leaving the caller to commit them with its own changes.
+    """
     logger.info(f"Generating scrambled sentence for category: {category_name}, user: {user_id}, lesson_id: {lesson_id}, sentence_id: {sentence_id}, flashcard_words: {flashcard_words}, harder: {harder}")
     
-    # Use a global dictionary for lesson-scoped session state
-    global_session_state = getattr(get_scrambled_sentence, "_session_state", {})
-    if not global_session_state:
-        get_scrambled_sentence._session_state = global_session_state
-    
-    state_key = f"used_sentence_ids_{lesson_id}"
-    if state_key not in global_session_state:
-        global_session_state[state_key] = []
-    session_state = global_session_state[state_key]
-    
+    # Sentences this user was already served in this lesson
+    recently_used = get_recently_used()
+
     user = await get_user(db, user_id)
     user_language = user.learning_language
 
@@ -166,19 +137,19 @@ async def get_scrambled_sentence(
 
     # Validate flashcard words
     if flashcard_words_list:
+        result = await db.execute(select(Flashcard.word).filter(Flashcard.user_id == user_id, Flashcard.word.in_(flashcard_words_list)))
+        known_words = set(result.scalars().all())
         for word in flashcard_words_list:
-            result = await db.execute(select(Flashcard).filter(Flashcard.word == word))
-            flashcard = result.scalars().first()
-            if not flashcard:
+            if word not in known_words:
                 logger.error(f"Flashcard not found: {word}")
                 raise HTTPException(status_code=404, detail=f"Flashcard not found: {word}")
-            if ' ' in flashcard.word:
+            if ' ' in word:
                 logger.error(f"Flashcard word '{word}' is a phrase")
                 raise HTTPException(status_code=400, detail=f"Flashcard word '{word}' is a phrase, expected single word")
 
-    # Fetch category by name
-    result = await db.execute(select(Category).filter(Category.name == category_name))
-    category = result.scalars().first()
+    # Look the category up by name unless the caller already resolved it
+    if category is None:
+        category = get_catalog().category_by_name(category_name)
     if not category:
         logger.error(f"Category '{category_name}' not found")
         raise HTTPException(status_code=404, detail=f"Category '{category_name}' not found")
@@ -192,126 +163,111 @@ async def get_scrambled_sentence(
             raise HTTPException(status_code=404, detail="Sentence not found")
         
         translation = await get_translation(db, sentence.id, user_language, flashcard_words_list)
-        shuffled_words = json.loads(translation.translated_words)
-        random.shuffle(shuffled_words)
-        response = {
-            "sentence_id": sentence.id,
-            "scrambled_words": shuffled_words,
-            "original_sentence": translation.translated_text,
-            "english_sentence": sentence.text,
-            "hints": [{"text": hint["text"], "usefulness": hint["usefulness"]} for hint in json.loads(translation.hints or "[]")],
-            "explanation": translation.explanation if translation.explanation else "No explanation available"
-        }
+        response = scrambled_response(sentence, translation)
         logger.info(f"Returning scrambled sentence for sentence_id {sentence_id}: {response}")
         return response
 
-    # Generate a new sentence
-    sentence_prompt = (
-        f"""
-        Generate a simple sentence in {user_language} for the category '{category_name}' suitable for language learners.
-        {"Use the words: " + ", ".join(flashcard_words_list) + "." if flashcard_words_list else "Choose appropriate words."}
-        {"Make it slightly more complex." if harder else "Keep it simple."}
-        Ensure the sentence is unique, novel, and significantly different in structure and vocabulary from previously generated ones.
-        Provide the response in JSON format with the following structure:
-        {{
-            "words": ["word1", "word2", ...],
-            "sentence": "Full sentence in {user_language}",
-            "english_sentence": "English translation",
-            "hints": [
-                {{"text": "Hint text", "usefulness": number}},
-                ...
-            ],
-            "explanation": "Detailed explanation including the English translation"
-        }}
-        """
-    )
-    translation_result = await translate_sentence(sentence_prompt, user_language)
-    logger.info(f"New sentence translation result: {translation_result}")
-
-    # Parse and validate result
-    if not isinstance(translation_result, dict):
-        logger.error(f"Invalid translation result: {translation_result}")
-        raise HTTPException(status_code=500, detail="Failed to generate valid translation")
-
-    required_keys = ["words", "sentence", "english_sentence", "hints", "explanation"]
-    missing_keys = [key for key in required_keys if key not in translation_result]
-    if missing_keys:
-        logger.error(f"Missing required keys in translation result: {missing_keys}")
-        raise HTTPException(status_code=500, detail=f"Missing required keys: {missing_keys}")
-
-    translated_text = translation_result["sentence"].strip()
-    english_text = translation_result["english_sentence"].strip()
-    translated_words = [word.strip() for word in translation_result["words"] if word.strip() not in [",", "，"]]
-    hints = [hint for hint in translation_result["hints"] if isinstance(hint, dict) and "text" in hint]
-    explanation = translation_result["explanation"] or "No explanation available"
-
-    # Validate sentence
-    if len(translated_words) < 2:
-        logger.error(f"Sentence too short: {translated_text}")
-        raise HTTPException(status_code=500, detail="Generated sentence is too short")
-    if all(word in ["こんにちは", "おはよう", "こんばんは"] for word in translated_words):
-        logger.error(f"Invalid sentence, contains only greetings: {translated_text}")
-        raise HTTPException(status_code=500, detail="Generated sentence is invalid")
-
-    # Check for duplicate sentence
-    result = await db.execute(
-        select(Sentence).filter(Sentence.text == english_text, Sentence.category_id == category.id)
+    # Serve a stored sentence the user hasn't had in this lesson before asking the LLM for a new one
+    difficulty = difficulty_for(harder)
+    banked = await pick_sentence(
+        db, category.id, user_language, difficulty,
+        exclude_ids=await recently_used.recent(user_id, lesson_id),
+        required_words=flashcard_words_list
     )
-    sentence = result.scalars().first()
-    if sentence and sentence.id not in session_state:
-        logger.info(f"Sentence '{english_text}' already exists, using it")
-    else:
-        sentence = Sentence(
-            text=english_text,
-            category_id=category.id,
-            used_count=0,
-            last_used_at=None
+    if banked:
+        sentence, translation = banked
+        logger.info(f"Serving banked sentence {sentence.id} for category {category.id}, difficulty {difficulty}")
+        await recently_used.add(user_id, lesson_id, sentence.id)
+        sentence.used_count += 1
+        sentence.last_used_at = datetime.utcnow()
+        try:
+            if commit:
+                await db.commit()
+            else:
+                await db.flush()
+        except Exception as e:
+            logger.error(f"Database commit failed: {str(e)}")
+            raise HTTPException(status_code=500, detail="Failed to save sentence data")
+        return scrambled_response(sentence, translation)
+
+    # The bank has nothing left for this slice; generate a new sentence. The LLM can still return one the
+    # bank already holds, so a sentence this user was served in this lesson is rejected and asked for again.
+    rejected_sentences = []
+    for attempt in range(SENTENCE_GENERATION_ATTEMPTS):
+        sentence_prompt = (
+            f"""
+            Generate a simple sentence in {user_language} for the category '{category_name}' suitable for language learners.
+            {"Use the words: " + ", ".join(flashcard_words_list) + "." if flashcard_words_list else "Choose appropriate words."}
+            {"Make it slightly more complex." if harder else "Keep it simple."}
+            Ensure the sentence is unique, novel, and significantly different in structure and vocabulary from previously generated ones.
+            {"Do NOT generate any of these sentences: " + "; ".join(rejected_sentences) + "." if rejected_sentences else ""}
+            Provide the response in JSON format with the following structure:
+            {{
+                "words": ["word1", "word2", ...],
+                "sentence": "Full sentence in {user_language}",
+                "english_sentence": "English translation",
+                "hints": [
+                    {{"text": "Hint text", "usefulness": number}},
+                    ...
+                ],
+                "explanation": "Detailed explanation including the English translation"
+            }}
+            """
         )
-        db.add(sentence)
-        await db.commit()
-        await db.refresh(sentence)
-
-    # Ensure the sentence hasn’t been used in this session
-    if sentence.id in session_state:
-        logger.warning(f"Sentence ID {sentence.id} already used in session, generating another")
-        # Recursively call to generate a new sentence
-        return await get_scrambled_sentence(
-            category_name=category_name,
-            user_id=user_id,
-            db=db,
-            lesson_id=lesson_id,
-            flashcard_words=flashcard_words,
-            harder=harder
-        )
-
-    # Add to session state
-    session_state.append(sentence.id)
-    logger.info(f"Added sentence ID {sentence.id} to session state: {session_state}")
-
-    # Get or create translation
-    translation = await get_translation(db, sentence.id, user_language, flashcard_words_list)
-    shuffled_words = json.loads(translation.translated_words)
-    random.shuffle(shuffled_words)
+        # Every call must produce a new sentence, so this prompt bypasses the response cache
+        translation_result = await translate_sentence(sentence_prompt, user_language, cache=False)
+        logger.info(f"New sentence translation result: {translation_result}")
+
+        # Parse and validate result
+        if not isinstance(translation_result, dict):
+            logger.error(f"Invalid translation result: {translation_result}")
+            raise HTTPException(status_code=500, detail="Failed to generate valid translation")
+
+        required_keys = ["words", "sentence", "english_sentence", "hints", "explanation"]
+        missing_keys = [key for key in required_keys if key not in translation_result]
+        if missing_keys:
+            logger.error(f"Missing required keys in translation result: {missing_keys}")
+            raise HTTPException(status_code=500, detail=f"Missing required keys: {missing_keys}")
+
+        translated_text = translation_result["sentence"].strip()
+        english_text = translation_result["english_sentence"].strip()
+        translated_words = [word.strip() for word in translation_result["words"] if word.strip() not in [",", "，"]]
+        hints = [hint for hint in translation_result["hints"] if isinstance(hint, dict) and "text" in hint]
+        explanation = translation_result["explanation"] or "No explanation available"
+
+        # Validate sentence
+        if len(translated_words) < 2:
+            logger.error(f"Sentence too short: {translated_text}")
+            raise HTTPException(status_code=500, detail="Generated sentence is too short")
+        if all(word in ["こんにちは", "おはよう", "こんばんは"] for word in translated_words):
+            logger.error(f"Invalid sentence, contains only greetings: {translated_text}")
+            raise HTTPException(status_code=500, detail="Generated sentence is invalid")
+
+        existing_id = await find_sentence_id(db, category.id, english_text)
+        if existing_id is None or not await recently_used.contains(user_id, lesson_id, existing_id):
+            break
+        logger.warning(f"Generated sentence '{english_text}' matches sentence {existing_id} already served in this lesson (attempt {attempt + 1})")
+        rejected_sentences.append(english_text)
+    else:
+        raise HTTPException(status_code=500, detail="Failed to generate a new sentence")
 
-    # Update sentence usage
-    sentence.used_count += 1
-    sentence.last_used_at = datetime.utcnow()
-    db.add(sentence)
+    # Upsert on the normalized text, so a sentence the bank already has (with any stored translation) is
+    # reused instead of duplicated; its usage is counted in the same statement
+    stored_id = await store_sentence(db, category.id, english_text, difficulty)
+    translation = await store_translation(db, stored_id, user_language, translated_text, translated_words, hints, explanation)
+    sentence = await db.get(Sentence, stored_id, populate_existing=True)
+    await recently_used.add(user_id, lesson_id, stored_id)
 
     try:
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
     except Exception as e:
         logger.error(f"Database commit failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to save sentence data")
 
-    response = {
-        "sentence_id": sentence.id,
-        "scrambled_words": shuffled_words,
-        "original_sentence": translation.translated_text,
-        "english_sentence": sentence.text,
-        "hints": [{"text": hint["text"], "usefulness": hint["usefulness"]} for hint in json.loads(translation.hints or "[]")],
-        "explanation": translation.explanation if translation.explanation else "No explanation available"
-    }
+    response = scrambled_response(sentence, translation)
     logger.info(f"Returning scrambled sentence: {response}")
     return response
 
@@ -320,23 +276,14 @@ async def get_scrambled_sentence_route(
     lesson_id: int,
     request: Request,  # Move the request parameter up
     flashcard_words: str = None,
-    user_id: int = Depends(get_current_user),
+    context: LessonContext = Depends(load_lesson_context),
     db: AsyncSession = Depends(get_db)
 ):
     """API endpoint to get a scrambled sentence for a lesson."""
-    result = await db.execute(select(Lesson).filter(Lesson.id == lesson_id))
-    lesson = result.scalars().first()
-    if not lesson:
-        raise HTTPException(status_code=404, detail="Lesson not found")
-
-    result = await db.execute(select(Category).filter(Category.id == lesson.category_id))
-    category = result.scalars().first()
-    if not category:
-        raise HTTPException(status_code=404, detail="Category not found")
-
     return await get_scrambled_sentence(
-        category_name=category.name,
-        user_id=user_id,
+        category_name=context.category.name,
+        category=context.category,
+        user_id=context.user.id,
         db=db,
         lesson_id=lesson_id,
         flashcard_words=flashcard_words,
@@ -380,6 +327,7 @@ async def submit_sentence(
         "explanation": translation.explanation,
         "sentence_id": request.sentence_id
     }
+    await record_progress(db, user_id, sentence.category_id, f"sentence-{request.sentence_id}")
     progress = Progress(
         user_id=user_id,
         category_id=sentence.category_id,
@@ -26,6 +26,14 @@ AsyncSessionLocal = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+def dialect_insert(model):
+    """Return an INSERT for the active dialect so callers can use ON CONFLICT clauses."""
+    if engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
 # Dependency for FastAPI routes
 async def get_db():
     async with AsyncSessionLocal() as db:
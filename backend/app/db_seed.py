@@ -1,70 +1,103 @@
+import asyncio
+import logging
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import text
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, engine, dialect_insert
 from app.models.user import User
 from app.models.category import Category
 from app.models.lesson import Lesson
 from app.seed_data import USERS, CATEGORIES
-import logging
+
+ALEMBIC_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
 
 async def seed_categories(db: AsyncSession):
-    """Seed the categories and lessons tables with sample data."""
+    """Upsert the seed categories and add any missing lessons, in bulk."""
     try:
-        result = await db.execute(text("SELECT COUNT(*) FROM categories"))
-        existing_count = result.scalar()
-        if existing_count > 0:
-            logging.info(f"Found {existing_count} existing categories. Skipping seeding.")
-            return
-        for category_data in CATEGORIES:
-            category = Category(
-                name=category_data["name"],
-                chapter=category_data.get("chapter", 1),
-                difficulty=category_data.get("difficulty", "A1")
-            )
-            db.add(category)
-            await db.commit()
-            await db.refresh(category)
-            for lesson_data in category_data.get("lessons", []):
-                lesson = Lesson(
-                    name=lesson_data["name"],
-                    description=lesson_data["description"],
-                    category_id=category.id
-                )
-                db.add(lesson)
+        stmt = dialect_insert(Category).values([
+            {
+                "name": category_data["name"],
+                "chapter": category_data.get("chapter", 1),
+                "difficulty": category_data.get("difficulty", "A1")
+            }
+            for category_data in CATEGORIES
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Category.name],
+            set_={"chapter": stmt.excluded.chapter, "difficulty": stmt.excluded.difficulty}
+        )
+        await db.execute(stmt)
+
+        result = await db.execute(select(Category.name, Category.id))
+        category_ids = dict(result.all())
+        result = await db.execute(select(Lesson.category_id, Lesson.name))
+        existing_lessons = set(result.all())
+
+        # Lessons have no natural unique key, so only the (category, name) pairs not yet present are inserted
+        new_lessons = [
+            {
+                "name": lesson_data["name"],
+                "description": lesson_data["description"],
+                "category_id": category_ids[category_data["name"]]
+            }
+            for category_data in CATEGORIES
+            for lesson_data in category_data.get("lessons", [])
+            if (category_ids[category_data["name"]], lesson_data["name"]) not in existing_lessons
+        ]
+        if new_lessons:
+            await db.execute(dialect_insert(Lesson).values(new_lessons))
         await db.commit()
-        logging.info(f"Successfully seeded {len(CATEGORIES)} categories and their lessons.")
+        logging.info(f"Seeded {len(CATEGORIES)} categories and {len(new_lessons)} new lessons.")
     except Exception as e:
         await db.rollback()
         logging.error(f"Error seeding categories: {str(e)}")
         raise
 
 async def seed_users(db: AsyncSession):
-    """Seed the users table with sample data."""
+    """Insert the seed users that don't exist yet."""
     try:
-        result = await db.execute(text("SELECT COUNT(*) FROM users"))
-        existing_count = result.scalar()
-        if existing_count > 0:
-            logging.info(f"Found {existing_count} existing users. Skipping seeding.")
-            return
-        for user_data in USERS:
-            user = User(
-                username=user_data["username"],
-                email=user_data["email"],
-                hashed_password=user_data["hashed_password"],
-                learning_language=user_data["learning_language"],
-                openai_thread_id=user_data["openai_thread_id"],
-                is_active=user_data["is_active"],
-            )
-            db.add(user)
+        stmt = dialect_insert(User).values([
+            {
+                "username": user_data["username"],
+                "email": user_data["email"],
+                "hashed_password": user_data["hashed_password"],
+                "learning_language": user_data["learning_language"],
+                "openai_thread_id": user_data["openai_thread_id"],
+                "is_active": user_data["is_active"],
+            }
+            for user_data in USERS
+        ]).on_conflict_do_nothing()
+        await db.execute(stmt)
         await db.commit()
-        logging.info(f"Successfully seeded {len(USERS)} users.")
+        logging.info(f"Seeded {len(USERS)} users.")
     except Exception as e:
         await db.rollback()
         logging.error(f"Error seeding users: {str(e)}")
         raise
 
+def _run_migrations(connection):
+    config = Config(ALEMBIC_CONFIG)
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+async def upgrade_database():
+    """Apply any pending Alembic migrations (same as `alembic upgrade head`)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_run_migrations)
+
 async def seed_database():
     """Run all seeding operations."""
     async with AsyncSessionLocal() as db:
         await seed_categories(db)
-        await seed_users(db)
\ No newline at end of file
+        await seed_users(db)
+
+async def main():
+    await upgrade_database()
+    await seed_database()
+    await engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+# Bundled content for the local LLM provider (app/utils/llm_provider.py). Sentences are built
+# from subject x predicate combinations; flashcards come from the word lists with one example
+# template per part of speech. Languages not listed fall back to DEFAULT_LANGUAGE.
+
+DEFAULT_LANGUAGE = "Japanese"
+
+LANGUAGES = {
+    "Japanese": {
+        # (word, english, person) - person picks the predicate and English verb form
+        "particle": "は",
+        "subjects": [
+            ("私", "I", 1),
+            ("彼", "He", 3),
+            ("彼女", "She", 3),
+            ("友達", "My friend", 3),
+            ("先生", "The teacher", 3),
+            ("母", "My mother", 3),
+        ],
+        # (predicate with a 1st-person subject, with a 3rd-person subject or None if the same,
+        #  english verb (1st, 3rd person), english object); words are separated by spaces
+        "predicates": [
+            ("水 を 飲みます", None, ("drink", "drinks"), "water"),
+            ("ご飯 を 食べます", None, ("eat", "eats"), "rice"),
+            ("本 を 読みます", None, ("read", "reads"), "a book"),
+            ("日本語 を 勉強します", None, ("study", "studies"), "Japanese"),
+            ("音楽 を 聞きます", None, ("listen to", "listens to"), "music"),
+            ("映画 を 見ます", None, ("watch", "watches"), "a movie"),
+            ("手紙 を 書きます", None, ("write", "writes"), "a letter"),
+            ("駅 に 行きます", None, ("go to", "goes to"), "the station"),
+            ("コーヒー を 買います", None, ("buy", "buys"), "coffee"),
+            ("友達 に 会います", None, ("meet", "meets"), "a friend"),
+            ("料理 を 作ります", None, ("cook", "cooks"), "a meal"),
+            ("公園 で 走ります", None, ("run in", "runs in"), "the park"),
+        ],
+        "topic_hint": "は marks the subject as the topic of the sentence.",
+        "order_hint": "The verb comes at the end of the sentence.",
+        "words": [
+            ("名前", "name", "noun"), ("水", "water", "noun"), ("本", "book", "noun"), ("猫", "cat", "noun"),
+            ("犬", "dog", "noun"), ("山", "mountain", "noun"), ("川", "river", "noun"), ("空", "sky", "noun"),
+            ("花", "flower", "noun"), ("車", "car", "noun"), ("駅", "station", "noun"), ("家", "house", "noun"),
+            ("海", "sea", "noun"), ("雨", "rain", "noun"), ("雪", "snow", "noun"), ("朝", "morning", "noun"),
+            ("夜", "night", "noun"), ("店", "shop", "noun"), ("学校", "school", "noun"), ("先生", "teacher", "noun"),
+            ("学生", "student", "noun"), ("友達", "friend", "noun"), ("家族", "family", "noun"), ("仕事", "work", "noun"),
+            ("電話", "telephone", "noun"), ("時計", "clock", "noun"), ("部屋", "room", "noun"), ("町", "town", "noun"),
+            ("国", "country", "noun"), ("言葉", "word", "noun"), ("音楽", "music", "noun"), ("映画", "movie", "noun"),
+            ("料理", "cooking", "noun"), ("天気", "weather", "noun"), ("お茶", "tea", "noun"), ("パン", "bread", "noun"),
+            ("食べる", "eat", "verb"), ("飲む", "drink", "verb"), ("読む", "read", "verb"), ("書く", "write", "verb"),
+            ("話す", "speak", "verb"), ("聞く", "listen", "verb"), ("見る", "watch", "verb"), ("行く", "go", "verb"),
+            ("来る", "come", "verb"), ("買う", "buy", "verb"), ("寝る", "sleep", "verb"), ("働く", "work", "verb"),
+            ("大きい", "big", "adjective"), ("小さい", "small", "adjective"), ("新しい", "new", "adjective"),
+            ("古い", "old", "adjective"), ("高い", "expensive", "adjective"), ("安い", "cheap", "adjective"),
+            ("暑い", "hot", "adjective"), ("寒い", "cold", "adjective"), ("楽しい", "fun", "adjective"),
+            ("難しい", "difficult", "adjective"), ("優しい", "kind", "adjective"), ("静か", "quiet", "adjective"),
+        ],
+        "examples": {
+            "noun": ("これは{word}です。", "This is {english}."),
+            "verb": ("毎日{word}。", "I {english} every day."),
+            "adjective": ("とても{word}です。", "It is very {english}."),
+        },
+        "definition": "「{english}」という意味の言葉",
+        "chat": [
+            ("こんにちは！はじめまして！", "Hello! Nice to meet you!"),
+            ("お元気ですか？", "How are you?"),
+            ("それはいいですね。", "That sounds good."),
+            ("もう少し教えてください。", "Please tell me a little more."),
+            ("なるほど、わかりました。", "I see, I understand."),
+        ],
+        "farewell": ("ありがとうございました。またね！", "Thank you very much. See you!"),
+    },
+    "Spanish": {
+        "subjects": [
+            ("Yo", "I", 1),
+            ("Él", "He", 3),
+            ("Ella", "She", 3),
+            ("Ana", "Ana", 3),
+            ("Pablo", "Pablo", 3),
+            ("Carlos", "Carlos", 3),
+        ],
+        "predicates": [
+            ("bebo agua", "bebe agua", ("drink", "drinks"), "water"),
+            ("como pan", "come pan", ("eat", "eats"), "bread"),
+            ("leo un libro", "lee un libro", ("read", "reads"), "a book"),
+            ("estudio español", "estudia español", ("study", "studies"), "Spanish"),
+            ("escucho música", "escucha música", ("listen to", "listens to"), "music"),
+            ("veo una película", "ve una película", ("watch", "watches"), "a movie"),
+            ("escribo una carta", "escribe una carta", ("write", "writes"), "a letter"),
+            ("compro café", "compra café", ("buy", "buys"), "coffee"),
+            ("cocino la cena", "cocina la cena", ("cook", "cooks"), "dinner"),
+            ("visito el museo", "visita el museo", ("visit", "visits"), "the museum"),
+        ],
+        "topic_hint": "Spanish often drops the subject pronoun, but here it comes first.",
+        "order_hint": "The verb follows the subject.",
+        "words": [
+            ("agua", "water", "noun"), ("libro", "book", "noun"), ("gato", "cat", "noun"), ("perro", "dog", "noun"),
+            ("casa", "house", "noun"), ("escuela", "school", "noun"), ("amigo", "friend", "noun"), ("familia", "family", "noun"),
+            ("trabajo", "work", "noun"), ("ciudad", "city", "noun"), ("tienda", "shop", "noun"), ("mañana", "morning", "noun"),
+            ("noche", "night", "noun"), ("comida", "food", "noun"), ("pan", "bread", "noun"), ("café", "coffee", "noun"),
+            ("música", "music", "noun"), ("película", "movie", "noun"), ("tiempo", "weather", "noun"), ("nombre", "name", "noun"),
+            ("comer", "eat", "verb"), ("beber", "drink", "verb"), ("leer", "read", "verb"), ("escribir", "write", "verb"),
+            ("hablar", "speak", "verb"), ("escuchar", "listen", "verb"), ("viajar", "travel", "verb"), ("comprar", "buy", "verb"),
+            ("dormir", "sleep", "verb"), ("trabajar", "work", "verb"),
+            ("grande", "big", "adjective"), ("pequeño", "small", "adjective"), ("nuevo", "new", "adjective"),
+            ("viejo", "old", "adjective"), ("caro", "expensive", "adjective"), ("barato", "cheap", "adjective"),
+            ("feliz", "happy", "adjective"), ("difícil", "difficult", "adjective"), ("fácil", "easy", "adjective"),
+            ("tranquilo", "quiet", "adjective"),
+        ],
+        "examples": {
+            "noun": ("Necesito {word}.", "I need {english}."),
+            "verb": ("Quiero {word}.", "I want to {english}."),
+            "adjective": ("Es muy {word}.", "It is very {english}."),
+        },
+        "definition": "Palabra que significa «{english}»",
+        "chat": [
+            ("¡Hola! ¡Mucho gusto!", "Hello! Nice to meet you!"),
+            ("¿Cómo estás?", "How are you?"),
+            ("¡Qué bien!", "That's great!"),
+            ("Cuéntame un poco más.", "Tell me a little more."),
+            ("Entiendo, gracias.", "I understand, thanks."),
+        ],
+        "farewell": ("Muchas gracias. ¡Hasta luego!", "Thank you very much. See you later!"),
+    },
+    "French": {
+        "subjects": [
+            ("Je", "I", 1),
+            ("Il", "He", 3),
+            ("Elle", "She", 3),
+            ("Marie", "Marie", 3),
+            ("Paul", "Paul", 3),
+            ("Léa", "Léa", 3),
+        ],
+        "predicates": [
+            ("bois du thé", "boit du thé", ("drink", "drinks"), "tea"),
+            ("mange du pain", "mange du pain", ("eat", "eats"), "bread"),
+            ("lis un livre", "lit un livre", ("read", "reads"), "a book"),
+            ("regarde un film", "regarde un film", ("watch", "watches"), "a movie"),
+            ("écris une lettre", "écrit une lettre", ("write", "writes"), "a letter"),
+            ("achète du café", "achète du café", ("buy", "buys"), "coffee"),
+            ("visite le musée", "visite le musée", ("visit", "visits"), "the museum"),
+            ("prépare le dîner", "prépare le dîner", ("cook", "cooks"), "dinner"),
+            ("cherche la gare", "cherche la gare", ("look for", "looks for"), "the station"),
+            ("aime la musique", "aime la musique", ("like", "likes"), "music"),
+        ],
+        "topic_hint": "The subject pronoun always comes first in French.",
+        "order_hint": "The verb follows the subject.",
+        "words": [
+            ("livre", "book", "noun"), ("chat", "cat", "noun"), ("chien", "dog", "noun"), ("maison", "house", "noun"),
+            ("ville", "city", "noun"), ("famille", "family", "noun"), ("travail", "work", "noun"), ("pain", "bread", "noun"),
+            ("café", "coffee", "noun"), ("thé", "tea", "noun"), ("musique", "music", "noun"), ("film", "movie", "noun"),
+            ("gare", "station", "noun"), ("matin", "morning", "noun"), ("nuit", "night", "noun"), ("nom", "name", "noun"),
+            ("magasin", "shop", "noun"), ("temps", "weather", "noun"), ("voiture", "car", "noun"), ("jardin", "garden", "noun"),
+            ("manger", "eat", "verb"), ("boire", "drink", "verb"), ("lire", "read", "verb"), ("écrire", "write", "verb"),
+            ("parler", "speak", "verb"), ("écouter", "listen", "verb"), ("voyager", "travel", "verb"), ("acheter", "buy", "verb"),
+            ("dormir", "sleep", "verb"), ("travailler", "work", "verb"),
+            ("grand", "big", "adjective"), ("petit", "small", "adjective"), ("nouveau", "new", "adjective"),
+            ("vieux", "old", "adjective"), ("cher", "expensive", "adjective"), ("content", "happy", "adjective"),
+            ("difficile", "difficult", "adjective"), ("facile", "easy", "adjective"), ("calme", "quiet", "adjective"),
+            ("gentil", "kind", "adjective"),
+        ],
+        "examples": {
+            "noun": ("Le mot du jour est {word}.", "The word of the day is {english}."),
+            "verb": ("Je veux {word}.", "I want to {english}."),
+            "adjective": ("C'est très {word}.", "It is very {english}."),
+        },
+        "definition": "Mot qui signifie « {english} »",
+        "chat": [
+            ("Bonjour ! Enchanté !", "Hello! Nice to meet you!"),
+            ("Comment ça va ?", "How are you?"),
+            ("C'est super !", "That's great!"),
+            ("Dis-m'en un peu plus.", "Tell me a little more."),
+            ("Je comprends, merci.", "I understand, thanks."),
+        ],
+        "farewell": ("Merci beaucoup. À bientôt !", "Thank you very much. See you soon!"),
+    },
+}
+
+SITUATIONS = [
+    "You are practicing '{lesson}' with a friendly local in a {category} setting",
+    "You meet a classmate and talk about '{lesson}' ({category})",
+    "A shop assistant helps you with '{lesson}' ({category})",
+    "You are chatting with a new neighbour about '{lesson}' ({category})",
+]
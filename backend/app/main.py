@@ -2,26 +2,44 @@ from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
-from app.database import engine, Base, get_db
-from app.db_seed import seed_database
-from app.api import auth, sentence, flashcard, dialogue, category, dashboard, pexels, lesson
+from app.database import get_db, engine
+from app.db_seed import upgrade_database, seed_database
+from app.utils.http_clients import init_clients, close_clients
+from app.utils.llm_cache import purge_expired_responses
+from app.utils.security import shutdown_password_pool
+from app.utils.metrics import instrument_engine, server_timing_middleware
+from app.services.catalog import reload_catalog
+from app.services.flashcard_pool import start_pool_worker, stop_pool_worker
+from app.services.recently_used import get_recently_used
+from app.api import auth, sentence, flashcard, dialogue, category, dashboard, pexels, lesson, metrics
 
+import os
 import logging
 from app.logging_config import configure_logging
 
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "0") == "1"
+
 # Apply logging configuration
 configure_logging()
 logging.info("Logging configured, starting application")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logging.info("Initializing database...")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logging.info("Seeding database...")
-    await seed_database()
-    logging.info("Database initialization and seeding completed.")
+    # Migrations and seed data are applied once per deploy with `python -m app.db_seed`, not per worker
+    if DB_INIT_ON_STARTUP:
+        logging.info("Initializing and seeding database...")
+        await upgrade_database()
+        await seed_database()
+        logging.info("Database initialization and seeding completed.")
+    await reload_catalog()
+    await purge_expired_responses()
+    await get_recently_used().purge_expired()
+    await init_clients()
+    start_pool_worker()
     yield
+    await stop_pool_worker()
+    await close_clients()
+    shutdown_password_pool()
 
 app = FastAPI(
     title="LanguagePal API",
@@ -35,8 +53,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-request database/OpenAI/Pexels timings in the Server-Timing header and at /metrics
+instrument_engine(engine)
+app.middleware("http")(server_timing_middleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(category.router, prefix="/api/category", tags=["Category"])
@@ -46,6 +69,7 @@ app.include_router(dialogue.router, prefix="/api/dialogue", tags=["Simulated Dia
 app.include_router(dashboard.router, prefix="", tags=["Dashboard"])
 app.include_router(pexels.router, prefix="/api/pexels", tags=["Pexels"])
 app.include_router(lesson.router, prefix="/api/lesson", tags=["Lesson"])
+app.include_router(metrics.router, prefix="", tags=["Metrics"])
 
 @app.get("/")
 async def read_root():
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class CategoryProgress(Base):
+    __tablename__ = "category_progress"
+    __table_args__ = (UniqueConstraint("user_id", "category_id", name="uq_category_progress_user_category"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    completed_lesson_ids = Column(Text, nullable=False, default="[]")  # JSON-encoded list of lesson ids
+    activities_completed = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
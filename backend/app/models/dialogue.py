@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Dialogue(Base):
     __tablename__ = "dialogues"
+    __table_args__ = (Index("ix_dialogues_category_lesson", "category_id", "lesson_id"),)
     id = Column(Integer, primary_key=True, index=True)
     situation = Column(String, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"))
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
+from sqlalchemy.ext.associationproxy import association_proxy
 from app.database import Base
 import json
 
-class Flashcard(Base):
-    __tablename__ = "flashcards"
+class FlashcardCatalogEntry(Base):
+    """Flashcard content shared by every learner of a language and category."""
+    __tablename__ = "flashcard_catalog"
+    __table_args__ = (
+        UniqueConstraint("language", "category_id", "word", name="uq_flashcard_catalog_language_category_word"),
+    )
     id = Column(Integer, primary_key=True, index=True)
+    language = Column(String, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"))
     word = Column(String, nullable=False)
     translation = Column(String, nullable=False)
     type = Column(String, nullable=False)
@@ -14,13 +21,34 @@ class Flashcard(Base):
     english_definition = Column(String, nullable=False)
     example_sentence = Column(String, nullable=False)
     english_sentence = Column(String, nullable=False)
+    options = Column(String, nullable=True)  # JSON-encoded list of options
+    lesson_name = Column(String, nullable=True)  # Lesson the card was generated for; NULL for migrated cards
+    difficulty = Column(Integer, default=1, server_default="1", nullable=False)  # 1 = basic, 2 = harder
+
+class Flashcard(Base):
+    """A catalog card assigned to a user; its id is what lesson plans and FlashcardHistory refer to."""
+    __tablename__ = "flashcards"
+    __table_args__ = (Index("ix_flashcards_user_category_word", "user_id", "category_id", "word"),)
+    id = Column(Integer, primary_key=True, index=True)
+    catalog_id = Column(Integer, ForeignKey("flashcard_catalog.id"), nullable=False)
+    word = Column(String, nullable=False)  # Copied from the catalog for the per-user word lookups
     category_id = Column(Integer, ForeignKey("categories.id"))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     used_count = Column(Integer, default=0)
-    options = Column(String, nullable=True)  # JSON-encoded list of options
+    # Joined eagerly: async sessions can't lazy-load, and every reader of a card wants its content
+    entry = relationship("FlashcardCatalogEntry", lazy="joined", innerjoin=True)
     category = relationship("Category", back_populates="flashcards")
     user = relationship("User", back_populates="flashcards")
 
+    translation = association_proxy("entry", "translation")
+    type = association_proxy("entry", "type")
+    english_equivalents = association_proxy("entry", "english_equivalents")
+    definition = association_proxy("entry", "definition")
+    english_definition = association_proxy("entry", "english_definition")
+    example_sentence = association_proxy("entry", "example_sentence")
+    english_sentence = association_proxy("entry", "english_sentence")
+    options = association_proxy("entry", "options")
+
     def to_dict(self):
         return {
             "flashcard_id": self.id,
@@ -33,4 +61,4 @@ class Flashcard(Base):
             "example_sentence": self.example_sentence,
             "english_sentence": self.english_sentence,
             "options": json.loads(self.options) if self.options else []
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ImageCache(Base):
+    __tablename__ = "image_cache"
+    query = Column(String, primary_key=True)  # Normalized search query
+    image_url = Column(String, nullable=False)
+    fetched_at = Column(DateTime, default=func.now(), nullable=False)
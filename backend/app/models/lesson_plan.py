@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, Boolean, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LessonPlan(Base):
+    __tablename__ = "lesson_plans"
+    __table_args__ = (UniqueConstraint("user_id", "lesson_id", name="uq_lesson_plans_user_lesson"),)
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False)
+    is_new_lesson = Column(Boolean, default=False, nullable=False)
+    activities = Column(Text, nullable=False)  # JSON-encoded ordered list of activity slots
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+    key = Column(String(64), primary_key=True)  # sha256 of (model, messages, temperature, max_tokens)
+    prompt_type = Column(String, nullable=False)
+    response = Column(Text, nullable=False)  # JSON-encoded parsed response
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,12 +1,15 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, DateTime
+from sqlalchemy.sql import func
 from app.database import Base
 
 class MistakenActivity(Base):
     __tablename__ = "mistaken_activities"
+    __table_args__ = (Index("ix_mistaken_activities_user_category", "user_id", "category_id"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     lesson_id = Column(Integer, ForeignKey("lessons.id"))
     category_id = Column(Integer, ForeignKey("categories.id"))
     activity_id = Column(String, index=True)
     activity_type = Column(String)  # "flashcard" or "sentence"
-    word = Column(String, nullable=True)  # For flashcard mistakes
\ No newline at end of file
+    word = Column(String, nullable=True)  # For flashcard mistakes
+    created_at = Column(DateTime, default=func.now(), server_default=func.now(), nullable=False)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from app.database import Base
+
+class RecentlyUsedItem(Base):
+    __tablename__ = "recently_used_items"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    lesson_id = Column(Integer, ForeignKey("lessons.id"), primary_key=True)
+    item_id = Column(Integer, primary_key=True)  # Sentence served in this lesson
+    used_at = Column(DateTime, nullable=False, index=True)
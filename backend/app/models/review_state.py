@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
+from app.database import Base
+
+class FlashcardReviewState(Base):
+    """SM-2 scheduling state of one of a user's flashcards; cards enter it on their first review."""
+    __tablename__ = "flashcard_review_states"
+    __table_args__ = (Index("ix_flashcard_review_states_user_due", "user_id", "due_at"),)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    flashcard_id = Column(Integer, ForeignKey("flashcards.id", ondelete="CASCADE"), primary_key=True)
+    ease = Column(Float, default=2.5, nullable=False)
+    interval_days = Column(Integer, default=0, nullable=False)
+    repetitions = Column(Integer, default=0, nullable=False)  # Successful reviews in a row
+    lapses = Column(Integer, default=0, nullable=False)
+    due_at = Column(DateTime, nullable=False)
+    reviewed_at = Column(DateTime, nullable=False)
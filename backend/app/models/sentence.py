@@ -1,19 +1,29 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Sentence(Base):
     __tablename__ = "sentences"
+    __table_args__ = (
+        UniqueConstraint("category_id", "text_hash", name="uq_sentences_category_text_hash"),
+        Index("ix_sentences_category_difficulty_last_used", "category_id", "difficulty", "last_used_at"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     text = Column(String, nullable=False)
+    # sha256 of the normalized text (app.services.sentence_bank); NULL only on duplicates that predate it
+    text_hash = Column(String(64), nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"))
     used_count = Column(Integer, default=0)
-    last_used_at = Column(DateTime, nullable=True)
+    # Never-used sentences carry the epoch rather than NULL, so the plain ascending index serves
+    # the bank's least-recently-used ORDER BY on every backend
+    last_used_at = Column(DateTime, nullable=False, server_default="1970-01-01 00:00:00")
+    difficulty = Column(Integer, default=1, server_default="1", nullable=False)  # 1 = basic, 2 = harder
     category = relationship("Category", back_populates="sentences")
     translations = relationship("SentenceTranslation", back_populates="sentence")
 
 class SentenceTranslation(Base):
     __tablename__ = "sentence_translations"
+    __table_args__ = (UniqueConstraint("sentence_id", "language", name="uq_sentence_translations_sentence_language"),)
     id = Column(Integer, primary_key=True, index=True)
     sentence_id = Column(Integer, ForeignKey("sentences.id"))
     language = Column(String, nullable=False)
@@ -14,5 +14,6 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     last_login = Column(DateTime, nullable=True)
+    progress_version = Column(Integer, default=0, server_default="0", nullable=False)  # Bumped on every Progress insert
     progress = relationship("Progress", back_populates="user")
     flashcards = relationship("Flashcard", back_populates="user")
\ No newline at end of file
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 
 class FlashcardResponse(BaseModel):
     flashcard_id: int
@@ -18,3 +19,22 @@ class FlashcardResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class DueFlashcard(BaseModel):
+    flashcard_id: int
+    word: str
+    translation: str
+    type: str
+    english_equivalents: List[str]
+    definition: str
+    english_definition: str
+    example_sentence: str
+    english_sentence: str
+    options: List[dict] = []
+    due_at: datetime
+    interval_days: int
+    ease: float
+    repetitions: int
+
+class DueFlashcardsResponse(BaseModel):
+    flashcards: List[DueFlashcard]
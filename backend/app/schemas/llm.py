@@ -0,0 +1,84 @@
+from pydantic import BaseModel, field_validator, model_validator
+from typing import List
+
+# Expected shape of each JSON prompt's reply (see app/utils/openai.py). The before-validators
+# accept common near-misses so they don't cost another round trip.
+
+class LLMOutput(BaseModel):
+    class Config:
+        str_strip_whitespace = True
+        coerce_numbers_to_str = True
+
+class Hint(LLMOutput):
+    text: str
+    usefulness: int
+
+class SentenceOutput(LLMOutput):
+    words: List[str]
+    sentence: str
+    english_sentence: str
+    hints: List[Hint]
+    explanation: str
+
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_word_list(cls, data):
+        # A bare array of words is a partial answer; the remaining fields get re-asked
+        return {"words": data} if isinstance(data, list) else data
+
+class FlashcardOption(LLMOutput):
+    id: str
+    option_text: str
+
+class FlashcardOutput(LLMOutput):
+    word: str
+    translation: str
+    type: str
+    english_equivalents: List[str]
+    definition: str
+    english_definition: str
+    example_sentence: str
+    english_sentence: str
+    options: List[FlashcardOption]
+
+    @field_validator("english_equivalents", mode="before")
+    @classmethod
+    def listify(cls, value):
+        return [value] if isinstance(value, str) else value
+
+    @field_validator("word")
+    @classmethod
+    def single_word(cls, value: str) -> str:
+        if len(value.split()) > 1:
+            raise ValueError("Flashcard word must be a single word")
+        return value
+
+class FlashcardBatchOutput(LLMOutput):
+    # Elements are validated one by one so a single bad card doesn't sink the batch
+    flashcards: List[dict]
+
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_card_list(cls, data):
+        return {"flashcards": data} if isinstance(data, list) else data
+
+class SituationOutput(LLMOutput):
+    situation: str
+
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_text(cls, data):
+        return {"situation": data} if isinstance(data, str) else data
+
+class ChatOutput(LLMOutput):
+    speaker: str = "AI"
+    text: str
+
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_text(cls, data):
+        return {"text": data} if isinstance(data, str) else data
+
+class EvaluationOutput(LLMOutput):
+    satisfactory: bool
+    feedback: str
@@ -1,12 +1,11 @@
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Passwords are stored pre-hashed so importing this module does no bcrypt work.
+# Regenerate with: python -c "from app.utils.security import pwd_context; print(pwd_context.hash('...'))"
 
 USERS = [
     {
         "username": "admin",
         "email": "admin@example.com",
-        "hashed_password": pwd_context.hash("admin"),
+        "hashed_password": "$2b$12$P2.qTZagzA2e9usvMTpsLODQNaXAMjCfsXodkbPYhZnfVZcjjQWuy",  # "admin"
         "learning_language": "Japanese",
         "openai_thread_id": None,
         "is_active": True,
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from sqlalchemy import select
+from app.database import AsyncSessionLocal
+from app.models.category import Category
+from app.models.lesson import Lesson
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CatalogLesson:
+    id: int
+    name: str
+    description: str | None
+    category_id: int
+
+@dataclass(frozen=True)
+class CatalogCategory:
+    id: int
+    name: str
+    chapter: int
+    difficulty: str
+    lessons: tuple[CatalogLesson, ...]
+
+class Catalog:
+    """Read-only snapshot of categories and lessons with precomputed lookups.
+
+    Instances are never mutated; ``reload_catalog`` builds a new one and swaps it in, so a
+    request keeps a consistent view even if a reload happens while it runs.
+    """
+
+    def __init__(self, categories: list[CatalogCategory]):
+        self.categories = tuple(sorted(categories, key=lambda c: c.id))
+        self._by_id = MappingProxyType({c.id: c for c in self.categories})
+        self._by_name = MappingProxyType({c.name: c for c in self.categories})
+        self._lessons = MappingProxyType({l.id: l for c in self.categories for l in c.lessons})
+        chapters = {}
+        for category in self.categories:
+            chapters.setdefault(category.chapter, []).append(category)
+        self.chapters = tuple((chapter, tuple(cats)) for chapter, cats in sorted(chapters.items()))
+        self.version = hashlib.sha256(
+            json.dumps([[c.id, c.name, c.chapter, c.difficulty, [[l.id, l.name, l.description] for l in c.lessons]]
+                        for c in self.categories]).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def category(self, category_id: int) -> CatalogCategory | None:
+        return self._by_id.get(category_id)
+
+    def category_by_name(self, name: str) -> CatalogCategory | None:
+        return self._by_name.get(name)
+
+    def lesson(self, lesson_id: int) -> CatalogLesson | None:
+        return self._lessons.get(lesson_id)
+
+_catalog: Catalog | None = None
+
+async def reload_catalog() -> Catalog:
+    """Rebuild the catalog from the database and make it current."""
+    global _catalog
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Category, Lesson)
+            .outerjoin(Lesson, Lesson.category_id == Category.id)
+            .order_by(Category.id, Lesson.id)
+        )
+        rows = result.all()
+
+    categories, lessons = {}, {}
+    for category, lesson in rows:
+        categories[category.id] = category
+        lessons.setdefault(category.id, [])
+        if lesson:
+            lessons[category.id].append(CatalogLesson(lesson.id, lesson.name, lesson.description, category.id))
+    _catalog = Catalog([
+        CatalogCategory(c.id, c.name, c.chapter, c.difficulty, tuple(lessons[c.id]))
+        for c in categories.values()
+    ])
+    logger.info(f"Catalog loaded: {len(_catalog.categories)} categories, version {_catalog.version}")
+    return _catalog
+
+def get_catalog() -> Catalog:
+    if _catalog is None:
+        raise RuntimeError("Catalog not loaded; call reload_catalog() at startup")
+    return _catalog
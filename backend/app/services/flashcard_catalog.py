@@ -0,0 +1,120 @@
+import json
+import logging
+from sqlalchemy import select, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import dialect_insert
+from app.models.flashcard import Flashcard, FlashcardCatalogEntry
+
+logger = logging.getLogger(__name__)
+
+# Flashcard content is generated once per (language, category, word) and assigned to every learner
+# who hasn't had the word yet; the LLM is only needed when the catalog has nothing new for the user.
+
+DEFAULT_LANGUAGE = "Japanese"  # Users without a learning language are taught Japanese
+
+_stats = {"hits": 0, "misses": 0, "stored": 0}
+
+async def reusable_entries(
+    db: AsyncSession,
+    language: str,
+    category_id: int,
+    lesson_name: str,
+    difficulty: int,
+    excluded_words: list[str],
+    limit: int
+) -> list[FlashcardCatalogEntry]:
+    """Up to limit catalog cards whose word is not in excluded_words, preferring ones made for this lesson."""
+    query = (
+        select(FlashcardCatalogEntry)
+        .filter(
+            FlashcardCatalogEntry.language == (language or DEFAULT_LANGUAGE),
+            FlashcardCatalogEntry.category_id == category_id,
+            FlashcardCatalogEntry.difficulty == difficulty
+        )
+        .order_by(case((FlashcardCatalogEntry.lesson_name == lesson_name, 0), else_=1), FlashcardCatalogEntry.id)
+        .limit(limit)
+    )
+    if excluded_words:
+        query = query.filter(FlashcardCatalogEntry.word.not_in(excluded_words))
+    entries = list((await db.execute(query)).scalars().all())
+    _stats["hits"] += len(entries)
+    _stats["misses"] += limit - len(entries)
+    return entries
+
+async def store_entries(
+    db: AsyncSession, language: str, category_id: int, lesson_name: str, difficulty: int, cards: list[dict]
+) -> list[FlashcardCatalogEntry]:
+    """Add validated flashcard content to the catalog; returns the stored entry for each card, in order.
+
+    A word the catalog already has keeps its existing content, so concurrent generations agree.
+    """
+    if not cards:
+        return []
+    language = language or DEFAULT_LANGUAGE
+    await db.execute(
+        dialect_insert(FlashcardCatalogEntry).values([
+            {
+                "language": language,
+                "category_id": category_id,
+                "word": card["word"],
+                "translation": card["translation"],
+                "type": card["type"],
+                "english_equivalents": json.dumps(card["english_equivalents"]),
+                "definition": card["definition"],
+                "english_definition": card["english_definition"],
+                "example_sentence": card["example_sentence"],
+                "english_sentence": card["english_sentence"],
+                "options": json.dumps(card["options"]),
+                "lesson_name": lesson_name,
+                "difficulty": difficulty,
+            }
+            for card in cards
+        ]).on_conflict_do_nothing(
+            index_elements=[FlashcardCatalogEntry.language, FlashcardCatalogEntry.category_id, FlashcardCatalogEntry.word]
+        )
+    )
+    words = [card["word"] for card in cards]
+    result = await db.execute(
+        select(FlashcardCatalogEntry).filter(
+            FlashcardCatalogEntry.language == language,
+            FlashcardCatalogEntry.category_id == category_id,
+            FlashcardCatalogEntry.word.in_(words)
+        )
+    )
+    by_word = {entry.word: entry for entry in result.scalars().all()}
+    _stats["stored"] += len(cards)
+    return [by_word[word] for word in words]
+
+async def catalog_words(
+    db: AsyncSession, language: str, category_id: int, difficulty: int, lesson_name: str, limit: int
+) -> list[str]:
+    """The lesson's words most recently added to the catalog for the slice, newest first."""
+    result = await db.execute(
+        select(FlashcardCatalogEntry.word).filter(
+            FlashcardCatalogEntry.language == (language or DEFAULT_LANGUAGE),
+            FlashcardCatalogEntry.category_id == category_id,
+            FlashcardCatalogEntry.difficulty == difficulty,
+            FlashcardCatalogEntry.lesson_name == lesson_name
+        ).order_by(FlashcardCatalogEntry.id.desc()).limit(limit)
+    )
+    return list(result.scalars().all())
+
+def assign(db: AsyncSession, user_id: int, entries: list[FlashcardCatalogEntry]) -> list[Flashcard]:
+    """Add a card per entry to the user's set; the caller flushes or commits."""
+    flashcards = [
+        Flashcard(
+            catalog_id=entry.id,
+            entry=entry,
+            word=entry.word,
+            category_id=entry.category_id,
+            user_id=user_id,
+            used_count=1
+        )
+        for entry in entries
+    ]
+    db.add_all(flashcards)
+    return flashcards
+
+def flashcard_catalog_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {**_stats, "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0}
@@ -0,0 +1,135 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from dotenv import load_dotenv
+from app.database import AsyncSessionLocal
+from app.utils import openai as llm
+from app.utils.llm_provider import llm_available
+from app.services.catalog import get_catalog
+from app.services.flashcard_catalog import catalog_words
+from app.services.sentence_bank import difficulty_for
+
+load_dotenv()
+FLASHCARD_POOL_ENABLED = os.getenv("FLASHCARD_POOL_ENABLED", "1") == "1"
+FLASHCARD_POOL_DEPTH = int(os.getenv("FLASHCARD_POOL_DEPTH", 6))
+FLASHCARD_POOL_REFILL_INTERVAL = float(os.getenv("FLASHCARD_POOL_REFILL_INTERVAL", 10))
+FLASHCARD_POOL_REFILL_BATCH = int(os.getenv("FLASHCARD_POOL_REFILL_BATCH", 2))
+FLASHCARD_POOL_MAX_SKIPS = int(os.getenv("FLASHCARD_POOL_MAX_SKIPS", 3))  # Evict a card after this many users already had it
+FLASHCARD_POOL_KNOWN_WORDS = int(os.getenv("FLASHCARD_POOL_KNOWN_WORDS", 40))  # Catalog words a refill prompt asks the LLM to avoid
+
+logger = logging.getLogger(__name__)
+
+# Ready-to-assign flashcard content keyed by (language, category, lesson, difficulty). A pool is
+# created the first time a lesson asks for a card and is kept topped up by the refill worker.
+_pools: dict[tuple, deque] = {}
+_skips: dict[tuple, int] = {}  # (pool key, word) -> times take_flashcard passed the card over
+_refill_needed = asyncio.Event()
+_worker: asyncio.Task | None = None
+
+def _pool_key(language: str, category: str, lesson_name: str, harder: bool) -> tuple:
+    return (language, category, lesson_name, "A2" if harder else "A1")
+
+def take_flashcard(language: str, category: str, lesson_name: str, harder: bool, excluded_words: set) -> dict | None:
+    """Pop a pooled card whose word the user doesn't already have, or return None.
+
+    Cards passed over FLASHCARD_POOL_MAX_SKIPS times are evicted so they stop holding pool slots.
+    """
+    if not FLASHCARD_POOL_ENABLED:
+        return None
+    key = _pool_key(language, category, lesson_name, harder)
+    pool = _pools.setdefault(key, deque())
+    _refill_needed.set()
+    for flashcard_data in list(pool):
+        skip_key = (key, flashcard_data["word"])
+        if flashcard_data["word"] not in excluded_words:
+            pool.remove(flashcard_data)
+            _skips.pop(skip_key, None)
+            return flashcard_data
+        _skips[skip_key] = _skips.get(skip_key, 0) + 1
+        if _skips[skip_key] >= FLASHCARD_POOL_MAX_SKIPS:
+            pool.remove(flashcard_data)
+            del _skips[skip_key]
+            logger.info(f"Evicted pooled flashcard '{flashcard_data['word']}' from {key}")
+    return None
+
+def return_flashcards(language: str, category: str, lesson_name: str, harder: bool, cards: list[dict]):
+    """Put taken cards back at the front of their pool, e.g. when the assignment they were taken for failed."""
+    if not FLASHCARD_POOL_ENABLED or not cards:
+        return
+    pool = _pools.setdefault(_pool_key(language, category, lesson_name, harder), deque())
+    # A refill may have generated one of the words again while the card was out of the pool
+    pooled_words = {card["word"] for card in pool}
+    pool.extendleft(reversed([card for card in cards if card["word"] not in pooled_words]))
+
+async def _known_words(key: tuple) -> list[str]:
+    """The lesson's newest catalog words, which the pool need not generate.
+
+    Capped at FLASHCARD_POOL_KNOWN_WORDS so the refill prompt stays bounded as the catalog grows; an older
+    word the LLM repeats is still deduplicated by the catalog when the card is stored.
+    """
+    language, category, lesson_name, difficulty = key
+    category_obj = get_catalog().category_by_name(category)
+    if not category_obj:
+        return []
+    async with AsyncSessionLocal() as db:
+        return await catalog_words(
+            db, language, category_obj.id, difficulty_for(difficulty == "A2"), lesson_name, FLASHCARD_POOL_KNOWN_WORDS
+        )
+
+async def _refill_pool(key: tuple, pool: deque):
+    language, category, lesson_name, difficulty = key
+    try:
+        excluded_words = [card["word"] for card in pool] + await _known_words(key)
+        flashcards = await llm.request_flashcard_batch(
+            category=category,
+            target_language=language,
+            lesson_name=lesson_name,
+            n=min(FLASHCARD_POOL_DEPTH - len(pool), FLASHCARD_POOL_REFILL_BATCH),
+            excluded_words=excluded_words,
+            harder=difficulty == "A2"
+        )
+    except Exception as e:
+        logger.warning(f"Flashcard pool refill failed for {key}: {str(e)}")
+        return
+    # The pool may have been drained while the request was in flight; words are still distinct.
+    pool.extend(flashcards)
+
+async def refill_pools():
+    """Top up every pool that has fallen below FLASHCARD_POOL_DEPTH."""
+    for key, pool in list(_pools.items()):
+        if len(pool) < FLASHCARD_POOL_DEPTH:
+            await _refill_pool(key, pool)
+
+async def _run_worker():
+    while True:
+        try:
+            await asyncio.wait_for(_refill_needed.wait(), timeout=FLASHCARD_POOL_REFILL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _refill_needed.clear()
+        try:
+            await refill_pools()
+        except Exception as e:
+            logger.error(f"Flashcard pool worker error: {str(e)}")
+
+def start_pool_worker():
+    """Start the background refill worker (no-op without an OpenAI client)."""
+    global _worker
+    if not FLASHCARD_POOL_ENABLED or not llm_available() or _worker:
+        return
+    _worker = asyncio.create_task(_run_worker())
+    logger.info(f"Flashcard pool worker started (depth={FLASHCARD_POOL_DEPTH}, batch={FLASHCARD_POOL_REFILL_BATCH})")
+
+async def stop_pool_worker():
+    global _worker
+    if _worker:
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+        _worker = None
+
+def pool_stats() -> dict:
+    return {" / ".join(key): len(pool) for key, pool in _pools.items()}
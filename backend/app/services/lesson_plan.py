@@ -0,0 +1,149 @@
+import json
+import logging
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import dialect_insert
+from app.models.lesson_plan import LessonPlan
+
+logger = logging.getLogger(__name__)
+
+# A plan fixes the ordered activity slots of a lesson for one user. Each slot is a dict with
+# id, type, word (checkpoint reviews), harder, data (content bound on first use) and completed.
+
+def regular_activities() -> list[dict]:
+    activities = []
+    for i in range(3):
+        for j in range(2):
+            activities.append(_slot(f"flashcard-{i}-{j}", "flashcard"))
+        activities.append(_slot(f"sentence-{i}", "sentence"))
+    return activities
+
+def checkpoint_activities(mistaken_activities: list) -> list[dict]:
+    if not mistaken_activities:
+        return [
+            _slot("new-flashcard-0", "flashcard", harder=True),
+            _slot("new-flashcard-1", "flashcard", harder=True),
+            _slot("new-sentence-0", "sentence", harder=True)
+        ]
+    return [_slot(f"review-{ma.activity_id}", ma.activity_type, word=ma.word) for ma in mistaken_activities]
+
+def is_checkpoint_plan(activities: list[dict]) -> bool:
+    return any(activity["id"].startswith(("review-", "new-")) for activity in activities)
+
+def _slot(activity_id: str, activity_type: str, word: str = None, harder: bool = False) -> dict:
+    return {"id": activity_id, "type": activity_type, "word": word, "harder": harder, "data": None, "completed": False}
+
+async def get_lesson_plan(db: AsyncSession, user_id: int, lesson_id: int) -> LessonPlan | None:
+    result = await db.execute(
+        select(LessonPlan).filter(LessonPlan.user_id == user_id, LessonPlan.lesson_id == lesson_id)
+    )
+    return result.scalars().first()
+
+async def create_lesson_plan(
+    db: AsyncSession,
+    user_id: int,
+    lesson_id: int,
+    activities: list[dict],
+    completed_activities: set,
+    is_new_lesson: bool
+) -> LessonPlan:
+    """Persist a plan for the lesson, or return the one a concurrent request created first."""
+    for activity in activities:
+        activity["completed"] = activity["id"] in completed_activities
+    stmt = dialect_insert(LessonPlan).values(
+        user_id=user_id,
+        lesson_id=lesson_id,
+        is_new_lesson=is_new_lesson,
+        activities=json.dumps(activities)
+    ).on_conflict_do_nothing(index_elements=[LessonPlan.user_id, LessonPlan.lesson_id])
+    await db.execute(stmt)
+    logger.info(f"Created lesson plan for user {user_id}, lesson {lesson_id}: {[a['id'] for a in activities]}")
+    return await get_lesson_plan(db, user_id, lesson_id)
+
+async def rebuild_lesson_plan(db: AsyncSession, user_id: int, lesson_id: int, activities: list[dict]) -> LessonPlan:
+    """Replace the plan's slots with a fresh, uncompleted layout; the caller commits."""
+    plan = await lock_lesson_plan(db, user_id, lesson_id)
+    for activity in activities:
+        activity["completed"] = False
+    save_activities(plan, activities)
+    plan.created_at = func.now()
+    logger.info(f"Rebuilt lesson plan for user {user_id}, lesson {lesson_id}: {[a['id'] for a in activities]}")
+    return plan
+
+async def lock_lesson_plan(db: AsyncSession, user_id: int, lesson_id: int) -> LessonPlan | None:
+    """Re-read the user's plan and lock its row until the caller commits (SQLite serializes writers instead).
+
+    Every writer goes through here, so slow requests don't write back a stale activities list.
+    Changes already made in this session are flushed first so the re-read keeps them.
+    """
+    await db.flush()
+    result = await db.execute(
+        select(LessonPlan)
+        .filter(LessonPlan.user_id == user_id, LessonPlan.lesson_id == lesson_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def bind_slots(db: AsyncSession, user_id: int, lesson_id: int, slots: list[dict]) -> list[dict]:
+    """Store content bound to slots outside the lock, leaving every other slot as it is now; the caller commits.
+
+    A slot a concurrent request bound first keeps that content. Returns the stored version of each slot.
+    """
+    plan = await lock_lesson_plan(db, user_id, lesson_id)
+    if not plan or not slots:
+        return slots
+    activities = load_activities(plan)
+    stored = []
+    for slot in slots:
+        index = find_activity(activities, slot["id"])
+        if index == -1:
+            # The plan was rebuilt meanwhile; serve the content without storing it
+            stored.append(slot)
+            continue
+        if activities[index]["data"] is None:
+            activities[index]["type"] = slot["type"]
+            activities[index]["data"] = slot["data"]
+        stored.append(activities[index])
+    save_activities(plan, activities)
+    return stored
+
+def load_activities(plan: LessonPlan) -> list[dict]:
+    return json.loads(plan.activities)
+
+def save_activities(plan: LessonPlan, activities: list[dict]):
+    plan.activities = json.dumps(activities)
+
+def find_activity(activities: list[dict], activity_id: str) -> int:
+    return next((i for i, activity in enumerate(activities) if activity["id"] == activity_id), -1)
+
+def activity_response(activity: dict) -> dict:
+    return {"id": activity["id"], "type": activity["type"], "data": activity["data"], "completed": False}
+
+def activity_flashcard_id(activity: dict | None) -> int | None:
+    """The card bound to a flashcard slot, if any."""
+    if activity and activity["type"] == "flashcard" and activity["data"]:
+        return activity["data"].get("flashcard_id")
+    return None
+
+async def find_plan_activity(db: AsyncSession, user_id: int, lesson_id: int, activity_id: str) -> dict | None:
+    plan = await get_lesson_plan(db, user_id, lesson_id)
+    if not plan:
+        return None
+    activities = load_activities(plan)
+    index = find_activity(activities, activity_id)
+    return activities[index] if index != -1 else None
+
+async def mark_activity_completed(db: AsyncSession, user_id: int, lesson_id: int, activity_id: str) -> dict | None:
+    """Flag a slot of the user's plan as completed and return it; the caller commits."""
+    plan = await lock_lesson_plan(db, user_id, lesson_id)
+    if not plan:
+        return None
+    activities = load_activities(plan)
+    index = find_activity(activities, activity_id)
+    if index == -1:
+        return None
+    if not activities[index]["completed"]:
+        activities[index]["completed"] = True
+        save_activities(plan, activities)
+    return activities[index]
@@ -0,0 +1,115 @@
+import json
+import logging
+from sqlalchemy import exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import dialect_insert
+from app.models.category_progress import CategoryProgress
+from app.models.progress import Progress
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Per-user, per-category rollup of Progress so the dashboard reads one row per category
+# instead of scanning the progress history. Writers keep it current in their own transaction.
+
+def _lesson_id(activity_id: str) -> str | None:
+    return activity_id.split("lesson-")[1] if activity_id.startswith("lesson-") else None
+
+async def _summarize(db: AsyncSession, user_id: int, category_ids: list[int] = None) -> dict[int, dict]:
+    """Rebuild summaries from the stored Progress rows, keyed by category id."""
+    query = select(Progress.category_id, Progress.activity_id).filter(
+        Progress.user_id == user_id,
+        Progress.completed == True
+    )
+    if category_ids is not None:
+        query = query.filter(Progress.category_id.in_(category_ids))
+    result = await db.execute(query)
+
+    summaries = {}
+    for category_id, activity_id in result.all():
+        summary = summaries.setdefault(category_id, {"lesson_ids": set(), "activities_completed": 0})
+        summary["activities_completed"] += 1
+        lesson_id = _lesson_id(activity_id)
+        if lesson_id:
+            summary["lesson_ids"].add(lesson_id)
+    return summaries
+
+async def _insert_summaries(db: AsyncSession, user_id: int, summaries: dict[int, dict]):
+    if not summaries:
+        return
+    stmt = dialect_insert(CategoryProgress).values([
+        {
+            "user_id": user_id,
+            "category_id": category_id,
+            "completed_lesson_ids": json.dumps(sorted(summary["lesson_ids"])),
+            "activities_completed": summary["activities_completed"]
+        }
+        for category_id, summary in summaries.items()
+    ]).on_conflict_do_nothing(index_elements=[CategoryProgress.user_id, CategoryProgress.category_id])
+    await db.execute(stmt)
+
+async def record_progress(db: AsyncSession, user_id: int, category_id: int, activity_id: str):
+    """Fold a completed activity into the user's category summary and bump the user's
+    progress_version, which versions their dashboard ETag; the caller commits.
+
+    Call this before adding the Progress row, so the first summary for a category is
+    seeded from the history that already exists.
+    """
+    await db.execute(
+        update(User).where(User.id == user_id).values(progress_version=User.progress_version + 1)
+    )
+    result = await db.execute(
+        select(CategoryProgress).filter(
+            CategoryProgress.user_id == user_id,
+            CategoryProgress.category_id == category_id
+        ).with_for_update()
+    )
+    summary = result.scalars().first()
+    if not summary:
+        seed = await _summarize(db, user_id, [category_id])
+        await _insert_summaries(db, user_id, {category_id: seed.get(category_id, {"lesson_ids": set(), "activities_completed": 0})})
+        result = await db.execute(
+            select(CategoryProgress).filter(
+                CategoryProgress.user_id == user_id,
+                CategoryProgress.category_id == category_id
+            ).with_for_update()
+        )
+        summary = result.scalars().first()
+
+    summary.activities_completed += 1
+    lesson_id = _lesson_id(activity_id)
+    if lesson_id:
+        lesson_ids = set(json.loads(summary.completed_lesson_ids))
+        if lesson_id not in lesson_ids:
+            summary.completed_lesson_ids = json.dumps(sorted(lesson_ids | {lesson_id}))
+
+async def get_progress_summaries(db: AsyncSession, user_id: int) -> dict[int, CategoryProgress]:
+    """Return the user's summaries by category, backfilling any category that has completed
+    Progress but no summary yet (history from before the rollup, or a category only seeded
+    by record_progress for its siblings)."""
+    result = await db.execute(
+        select(Progress.category_id).distinct().filter(
+            Progress.user_id == user_id,
+            Progress.completed == True,
+            ~exists().where(
+                CategoryProgress.user_id == user_id,
+                CategoryProgress.category_id == Progress.category_id
+            )
+        )
+    )
+    missing = [category_id for category_id in result.scalars().all() if category_id is not None]
+    if missing:
+        backfill = await _summarize(db, user_id, missing)
+        logger.info(f"Backfilling progress summaries for user {user_id}: categories {sorted(backfill)}")
+        await _insert_summaries(db, user_id, backfill)
+        await db.commit()
+
+    result = await db.execute(select(CategoryProgress).filter(CategoryProgress.user_id == user_id))
+    return {summary.category_id: summary for summary in result.scalars().all()}
+
+async def get_progress_version(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(select(User.progress_version).filter(User.id == user_id))
+    return result.scalar() or 0
+
+def completed_lesson_ids(summary: CategoryProgress | None) -> set[str]:
+    return set(json.loads(summary.completed_lesson_ids)) if summary else set()
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import select, delete, or_
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models.recently_used import RecentlyUsedItem
+
+load_dotenv()
+RECENTLY_USED_BACKEND = os.getenv("RECENTLY_USED_BACKEND", "memory")  # "memory" (per worker) or "database" (shared)
+RECENTLY_USED_TTL_SECONDS = int(os.getenv("RECENTLY_USED_TTL_SECONDS", 6 * 3600))
+RECENTLY_USED_MAX_ITEMS = int(os.getenv("RECENTLY_USED_MAX_ITEMS", 50))  # Per (user, lesson)
+RECENTLY_USED_MAX_KEYS = int(os.getenv("RECENTLY_USED_MAX_KEYS", 10000))  # Memory backend only
+
+logger = logging.getLogger(__name__)
+
+class RecentlyUsedStore(ABC):
+    """Sentence ids recently served to a user within a lesson, capped per lesson and expiring after a TTL."""
+
+    def __init__(self, ttl: int, max_items: int):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+
+    async def contains(self, user_id: int, lesson_id: int, item_id: int) -> bool:
+        found = await self._contains(user_id, lesson_id, item_id)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    @abstractmethod
+    async def _contains(self, user_id: int, lesson_id: int, item_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def recent(self, user_id: int, lesson_id: int) -> set[int]:
+        """Every live item for the (user, lesson)."""
+
+    @abstractmethod
+    async def add(self, user_id: int, lesson_id: int, item_id: int):
+        ...
+
+    async def purge_expired(self):
+        pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class MemoryRecentlyUsed(RecentlyUsedStore):
+    """Per-worker store; (user, lesson) keys are evicted least recently used first beyond max_keys."""
+
+    def __init__(self, ttl: int, max_items: int, max_keys: int):
+        super().__init__(ttl, max_items)
+        self.max_keys = max_keys
+        self._keys: OrderedDict = OrderedDict()  # (user_id, lesson_id) -> OrderedDict(item_id -> used at), oldest first
+
+    def _live_items(self, key: tuple) -> OrderedDict | None:
+        items = self._keys.get(key)
+        if items is None:
+            return None
+        cutoff = time.monotonic() - self.ttl
+        while items and next(iter(items.values())) <= cutoff:
+            items.popitem(last=False)
+        if not items:
+            del self._keys[key]
+            return None
+        return items
+
+    async def _contains(self, user_id: int, lesson_id: int, item_id: int) -> bool:
+        items = self._live_items((user_id, lesson_id))
+        return items is not None and item_id in items
+
+    async def recent(self, user_id: int, lesson_id: int) -> set[int]:
+        items = self._live_items((user_id, lesson_id))
+        return set(items) if items else set()
+
+    async def add(self, user_id: int, lesson_id: int, item_id: int):
+        key = (user_id, lesson_id)
+        items = self._live_items(key)
+        if items is None:
+            items = self._keys[key] = OrderedDict()
+        items[item_id] = time.monotonic()
+        items.move_to_end(item_id)
+        self._keys.move_to_end(key)
+        while len(items) > self.max_items:
+            items.popitem(last=False)
+        while len(self._keys) > self.max_keys:
+            self._keys.popitem(last=False)
+
+    def stats(self) -> dict:
+        items = sum(len(entries) for entries in self._keys.values())
+        # Containers plus one int and one float per item; keys and ids are small ints shared with the interpreter
+        approx_bytes = sys.getsizeof(self._keys) + sum(
+            sys.getsizeof(key) + sys.getsizeof(entries) + len(entries) * sys.getsizeof(0.0)
+            for key, entries in self._keys.items()
+        )
+        return {**super().stats(), "keys": len(self._keys), "items": items, "approx_bytes": approx_bytes}
+
+class DatabaseRecentlyUsed(RecentlyUsedStore):
+    """Store shared by every worker through the recently_used_items table; failures read as not used."""
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl)
+
+    async def _contains(self, user_id: int, lesson_id: int, item_id: int) -> bool:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(RecentlyUsedItem.item_id).filter(
+                        RecentlyUsedItem.user_id == user_id,
+                        RecentlyUsedItem.lesson_id == lesson_id,
+                        RecentlyUsedItem.item_id == item_id,
+                        RecentlyUsedItem.used_at > self._cutoff()
+                    )
+                )
+                return result.first() is not None
+        except Exception as e:
+            logger.warning(f"Recently-used lookup failed: {str(e)}")
+            return False
+
+    async def recent(self, user_id: int, lesson_id: int) -> set[int]:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(RecentlyUsedItem.item_id).filter(
+                        RecentlyUsedItem.user_id == user_id,
+                        RecentlyUsedItem.lesson_id == lesson_id,
+                        RecentlyUsedItem.used_at > self._cutoff()
+                    )
+                )
+                return set(result.scalars().all())
+        except Exception as e:
+            logger.warning(f"Recently-used lookup failed: {str(e)}")
+            return set()
+
+    async def add(self, user_id: int, lesson_id: int, item_id: int):
+        now = datetime.utcnow()
+        upsert = dialect_insert(RecentlyUsedItem).values(
+            user_id=user_id, lesson_id=lesson_id, item_id=item_id, used_at=now
+        ).on_conflict_do_update(
+            index_elements=[RecentlyUsedItem.user_id, RecentlyUsedItem.lesson_id, RecentlyUsedItem.item_id],
+            set_={"used_at": now}
+        )
+        newest = select(RecentlyUsedItem.item_id).filter(
+            RecentlyUsedItem.user_id == user_id,
+            RecentlyUsedItem.lesson_id == lesson_id
+        ).order_by(RecentlyUsedItem.used_at.desc()).limit(self.max_items)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(upsert)
+                # Trim this lesson to the newest max_items live entries
+                await db.execute(
+                    delete(RecentlyUsedItem).where(
+                        RecentlyUsedItem.user_id == user_id,
+                        RecentlyUsedItem.lesson_id == lesson_id,
+                        or_(
+                            RecentlyUsedItem.used_at <= self._cutoff(),
+                            RecentlyUsedItem.item_id.not_in(newest.scalar_subquery())
+                        )
+                    ).execution_options(synchronize_session=False)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Failed to record recently-used item for user {user_id}, lesson {lesson_id}: {str(e)}")
+
+    async def purge_expired(self):
+        """Delete expired rows for every user."""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(delete(RecentlyUsedItem).where(RecentlyUsedItem.used_at <= self._cutoff()))
+                await db.commit()
+            logger.info(f"Purged {result.rowcount} expired recently-used entries")
+        except Exception as e:
+            logger.warning(f"Failed to purge recently-used entries: {str(e)}")
+
+if RECENTLY_USED_BACKEND == "memory":
+    _store = MemoryRecentlyUsed(RECENTLY_USED_TTL_SECONDS, RECENTLY_USED_MAX_ITEMS, RECENTLY_USED_MAX_KEYS)
+elif RECENTLY_USED_BACKEND == "database":
+    _store = DatabaseRecentlyUsed(RECENTLY_USED_TTL_SECONDS, RECENTLY_USED_MAX_ITEMS)
+else:
+    raise ValueError(f"RECENTLY_USED_BACKEND must be 'memory' or 'database', got '{RECENTLY_USED_BACKEND}'")
+
+def get_recently_used() -> RecentlyUsedStore:
+    return _store
+
+def recently_used_stats() -> dict:
+    return _store.stats()
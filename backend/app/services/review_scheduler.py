@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import dialect_insert
+from app.models.flashcard import Flashcard
+from app.models.review_state import FlashcardReviewState
+
+logger = logging.getLogger(__name__)
+
+# SM-2 (SuperMemo 2) review grades: 0-5, where anything below 3 is a lapse. The lesson endpoints
+# only know right or wrong, so they grade with GOOD and AGAIN.
+GOOD = 4
+AGAIN = 1
+
+MIN_EASE = 1.3
+INITIAL_EASE = 2.5
+
+def schedule(state: FlashcardReviewState, grade: int, now: datetime):
+    """Apply one SM-2 review to state in place."""
+    if grade < 3:
+        state.repetitions = 0
+        state.interval_days = 1
+        state.lapses += 1
+    else:
+        state.repetitions += 1
+        if state.repetitions == 1:
+            state.interval_days = 1
+        elif state.repetitions == 2:
+            state.interval_days = 6
+        else:
+            state.interval_days = round(state.interval_days * state.ease)
+    state.ease = max(MIN_EASE, state.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    state.due_at = now + timedelta(days=state.interval_days)
+    state.reviewed_at = now
+
+async def record_review(db: AsyncSession, user_id: int, flashcard_id: int, grade: int) -> FlashcardReviewState:
+    """Grade a review of the user's card and reschedule it; the caller commits."""
+    now = datetime.utcnow()
+    # Create the state row first so concurrent first reviews don't collide on the primary key
+    await db.execute(
+        dialect_insert(FlashcardReviewState).values(
+            user_id=user_id, flashcard_id=flashcard_id, ease=INITIAL_EASE, interval_days=0,
+            repetitions=0, lapses=0, due_at=now, reviewed_at=now
+        ).on_conflict_do_nothing(index_elements=[FlashcardReviewState.user_id, FlashcardReviewState.flashcard_id])
+    )
+    state = await db.get(FlashcardReviewState, (user_id, flashcard_id))
+    schedule(state, grade, now)
+    logger.info(
+        f"Reviewed flashcard {flashcard_id} for user {user_id}: grade {grade}, next in {state.interval_days} days"
+    )
+    return state
+
+def due_flashcards_query(user_id: int, limit: int, now: datetime) -> Select:
+    """The user's cards due by now, most overdue first; a range scan of ix_flashcard_review_states_user_due."""
+    return (
+        select(FlashcardReviewState, Flashcard)
+        .join(Flashcard, Flashcard.id == FlashcardReviewState.flashcard_id)
+        .filter(FlashcardReviewState.user_id == user_id, FlashcardReviewState.due_at <= now)
+        .order_by(FlashcardReviewState.due_at)
+        .limit(limit)
+    )
+
+async def due_flashcards(
+    db: AsyncSession, user_id: int, limit: int, now: datetime = None
+) -> list[tuple[Flashcard, FlashcardReviewState]]:
+    result = await db.execute(due_flashcards_query(user_id, limit, now or datetime.utcnow()))
+    return [(flashcard, state) for state, flashcard in result.all()]
@@ -0,0 +1,123 @@
+import json
+import hashlib
+import logging
+import unicodedata
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import dialect_insert
+from app.models.sentence import Sentence, SentenceTranslation
+
+logger = logging.getLogger(__name__)
+
+# Sentences are generated once and then served to every learner of the same category, language and
+# difficulty; the LLM is only needed when a slice has nothing left that the user hasn't just seen.
+
+BASIC = 1
+HARDER = 2
+
+# misses: the slice had nothing unseen; word_misses: nothing unseen practised the requested words,
+# so the pick fell back to the whole slice (and then counts as a hit or a miss as well)
+_stats = {"hits": 0, "misses": 0, "word_misses": 0}
+
+def difficulty_for(harder: bool) -> int:
+    return HARDER if harder else BASIC
+
+def normalize_sentence_text(text: str) -> str:
+    """Case, width, punctuation and whitespace folded away, so trivially different sentences compare equal."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(char for char in text if not unicodedata.category(char).startswith("P"))
+    return " ".join(text.split())
+
+def sentence_text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_sentence_text(text).encode("utf-8")).hexdigest()
+
+async def find_sentence_id(db: AsyncSession, category_id: int, text: str) -> int | None:
+    """Id of the stored sentence with the same normalized text, if the bank has one."""
+    result = await db.execute(
+        select(Sentence.id).filter(Sentence.category_id == category_id, Sentence.text_hash == sentence_text_hash(text))
+    )
+    return result.scalar()
+
+async def store_sentence(db: AsyncSession, category_id: int, text: str, difficulty: int) -> int:
+    """Insert a sentence, or count a use of the one already stored with the same normalized text; returns its id."""
+    now = datetime.utcnow()
+    stmt = dialect_insert(Sentence).values(
+        text=text, text_hash=sentence_text_hash(text), category_id=category_id,
+        difficulty=difficulty, used_count=1, last_used_at=now
+    ).on_conflict_do_update(
+        index_elements=[Sentence.category_id, Sentence.text_hash],
+        set_={"used_count": func.coalesce(Sentence.used_count, 0) + 1, "last_used_at": now}
+    ).returning(Sentence.id)
+    return (await db.execute(stmt)).scalar_one()
+
+async def store_translation(
+    db: AsyncSession, sentence_id: int, language: str, translated_text: str, translated_words: list, hints: list, explanation: str
+) -> SentenceTranslation:
+    """Insert a translation unless a concurrent request already stored one; returns the stored row."""
+    await db.execute(
+        dialect_insert(SentenceTranslation).values(
+            sentence_id=sentence_id,
+            language=language,
+            translated_text=translated_text,
+            translated_words=json.dumps(translated_words),
+            hints=json.dumps(hints),
+            explanation=explanation
+        ).on_conflict_do_nothing(index_elements=[SentenceTranslation.sentence_id, SentenceTranslation.language])
+    )
+    result = await db.execute(
+        select(SentenceTranslation).filter(
+            SentenceTranslation.sentence_id == sentence_id,
+            SentenceTranslation.language == language
+        )
+    )
+    return result.scalars().one()
+
+async def pick_sentence(
+    db: AsyncSession,
+    category_id: int,
+    language: str,
+    difficulty: int,
+    exclude_ids: set[int],
+    required_words: list[str] = ()
+) -> tuple[Sentence, SentenceTranslation] | None:
+    """Least recently used stored sentence in the slice with a translation into language, or None when the slice is dry.
+
+    ``required_words`` (flashcard words the sentence should practise) are preferred: a sentence whose stored
+    word list has them all is served first, otherwise any unseen sentence in the slice.
+    """
+    query = (
+        select(Sentence, SentenceTranslation)
+        .join(SentenceTranslation, SentenceTranslation.sentence_id == Sentence.id)
+        .filter(
+            Sentence.category_id == category_id,
+            Sentence.difficulty == difficulty,
+            SentenceTranslation.language == language
+        )
+        .order_by(Sentence.last_used_at, Sentence.id)
+        .limit(1)
+    )
+    if exclude_ids:
+        query = query.filter(Sentence.id.not_in(exclude_ids))
+
+    row = None
+    if required_words:
+        word_query = query
+        for word in required_words:
+            # translated_words is a JSON list, so match the word as an encoded element
+            word_query = word_query.filter(SentenceTranslation.translated_words.contains(json.dumps(word), autoescape=True))
+        row = (await db.execute(word_query)).first()
+        if row is None:
+            _stats["word_misses"] += 1
+    if row is None:
+        row = (await db.execute(query)).first()
+
+    if row is None:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return row[0], row[1]
+
+def sentence_bank_stats() -> dict:
+    lookups = _stats["hits"] + _stats["misses"]
+    return {**_stats, "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else 0.0}
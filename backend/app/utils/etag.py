@@ -0,0 +1,23 @@
+from fastapi import Request, Response
+
+# Browsers must revalidate, and shared caches must not store per-user responses.
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from version components."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """Return a 304 response if the client's If-None-Match already matches ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: a tag matches with or without the W/ prefix
+    if "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,86 @@
+import os
+import logging
+import importlib.util
+import httpx
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"  # Any OpenAI-compatible endpoint
+PEXELS_API_URL = os.getenv("PEXELS_API_URL", "https://api.pexels.com/v1")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0") == "1"  # Requires the optional h2 package
+PEXELS_TIMEOUT = float(os.getenv("PEXELS_TIMEOUT", 10))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 60))
+
+logger = logging.getLogger(__name__)
+
+# Application-scoped upstream clients, opened in the lifespan hook and reused by every request.
+_clients: dict = {}
+
+def _http2_supported() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the h2 package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+def _build_http_client(timeout: float, **kwargs) -> httpx.AsyncClient:
+    """Create a pooled keep-alive client with the given read/write timeout."""
+    return httpx.AsyncClient(
+        http2=_http2_supported(),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT),
+        **kwargs
+    )
+
+def get_pexels_client() -> httpx.AsyncClient:
+    """Return the shared Pexels client, creating it on first use."""
+    client = _clients.get("pexels")
+    if client is None or client.is_closed:
+        client = _build_http_client(PEXELS_TIMEOUT, base_url=PEXELS_API_URL)
+        _clients["pexels"] = client
+    return client
+
+def get_openai_client() -> AsyncOpenAI | None:
+    """Return the shared OpenAI client, or None when no API key is configured."""
+    if not OPENAI_API_KEY:
+        return None
+    client = _clients.get("openai")
+    if client is None or client.is_closed():
+        client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            max_retries=0,
+            timeout=OPENAI_TIMEOUT,
+            http_client=_build_http_client(OPENAI_TIMEOUT)
+        )
+        _clients["openai"] = client
+    return client
+
+async def init_clients():
+    """Open the upstream connection pools."""
+    get_pexels_client()
+    get_openai_client()
+    logger.info(f"HTTP clients initialized: {sorted(_clients)}")
+
+async def close_clients():
+    """Close every upstream client and release pooled connections."""
+    for name, client in list(_clients.items()):
+        try:
+            if isinstance(client, AsyncOpenAI):
+                await client.close()
+            else:
+                await client.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close {name} client: {str(e)}")
+    _clients.clear()
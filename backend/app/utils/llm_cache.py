@@ -0,0 +1,94 @@
+import os
+import json
+import logging
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from sqlalchemy import select, delete
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models.llm_cache import LLMResponseCache
+from app.utils.cache import TTLCache
+
+load_dotenv()
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 4096))
+
+logger = logging.getLogger(__name__)
+
+# Seconds a parsed response stays valid, per prompt type. 0 disables caching for that type
+# (flashcards and chat replies must vary; evaluations depend on the whole conversation).
+DEFAULT_TTLS = {
+    "sentence": 30 * 24 * 3600,
+    "translation": 30 * 24 * 3600,
+    "situation": 7 * 24 * 3600,
+    "evaluation": 0,
+    "flashcard": 0,
+    "chat": 0,
+}
+
+# Bounded per-worker tier in front of the shared llm_response_cache table.
+_memory = TTLCache(maxsize=LLM_CACHE_SIZE)
+_db_hits = 0
+
+def cache_ttl(prompt_type: str) -> int:
+    """TTL for a prompt type, overridable with LLM_CACHE_TTL_<TYPE> in the environment."""
+    return int(os.getenv(f"LLM_CACHE_TTL_{prompt_type.upper()}", DEFAULT_TTLS.get(prompt_type, 0)))
+
+async def get_cached_response(key: str):
+    """Return a cached parsed response, or None on a miss."""
+    global _db_hits
+    value = _memory.get(key)
+    if value is not None:
+        return value
+
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(LLMResponseCache).filter(
+                    LLMResponseCache.key == key,
+                    LLMResponseCache.expires_at > datetime.utcnow()
+                )
+            )
+            entry = result.scalars().first()
+    except Exception as e:
+        logger.warning(f"LLM cache lookup failed: {str(e)}")
+        return None
+    if not entry:
+        return None
+
+    value = json.loads(entry.response)
+    _memory.set(key, value, ttl=(entry.expires_at - datetime.utcnow()).total_seconds())
+    _db_hits += 1
+    return value
+
+async def store_response(key: str, prompt_type: str, value, ttl: int):
+    """Write a parsed response to both cache tiers."""
+    _memory.set(key, value, ttl=ttl)
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    encoded = json.dumps(value, ensure_ascii=False)
+    stmt = dialect_insert(LLMResponseCache).values(
+        key=key, prompt_type=prompt_type, response=encoded, created_at=now, expires_at=expires_at
+    ).on_conflict_do_update(
+        index_elements=[LLMResponseCache.key],
+        set_={"response": encoded, "created_at": now, "expires_at": expires_at}
+    )
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to persist LLM cache entry for {prompt_type}: {str(e)}")
+
+async def purge_expired_responses():
+    """Delete expired rows from the shared cache table."""
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(LLMResponseCache).where(LLMResponseCache.expires_at <= datetime.utcnow())
+            )
+            await db.commit()
+        logger.info(f"Purged {result.rowcount} expired LLM cache entries")
+    except Exception as e:
+        logger.warning(f"Failed to purge LLM cache: {str(e)}")
+
+def llm_cache_stats() -> dict:
+    return {**_memory.stats(), "db_hits": _db_hits}
@@ -0,0 +1,54 @@
+import re
+import json
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+_OPEN_FENCE = re.compile(r"^```(?:json)?\s*")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+def _first_value(text: str) -> str:
+    """Cut text down to its first JSON value, closing strings and brackets left open by truncation."""
+    stack = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                return text[:i + 1]
+    return text + ('"' if in_string else "") + "".join(reversed(stack))
+
+def repair_json(raw_output: str) -> tuple[object, bool]:
+    """Parse a model reply as JSON, fixing near misses locally.
+
+    Handles code fences, prose around the object, trailing commas and output truncated by
+    max_tokens. Returns (value, repaired); text with no JSON in it comes back as the stripped
+    string so schemas can accept plain-text replies. Raises ValueError for JSON that can't be
+    recovered.
+    """
+    text = raw_output.strip()
+    fenced = _FENCE.search(text)
+    text = fenced.group(1) if fenced else _OPEN_FENCE.sub("", text)
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError:
+        pass
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text, False
+    candidate = _TRAILING_COMMA.sub(r"\1", _first_value(text[min(starts):]))
+    try:
+        return json.loads(candidate), True
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Unrecoverable JSON in model output: {str(e)}")
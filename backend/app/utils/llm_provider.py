@@ -0,0 +1,217 @@
+import os
+import json
+import random
+import asyncio
+import hashlib
+import itertools
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dotenv import load_dotenv
+from app import llm_corpus
+from app.utils.http_clients import get_openai_client
+
+load_dotenv()
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+LLM_FALLBACK_PROVIDER = os.getenv("LLM_FALLBACK_PROVIDER", "")  # e.g. "local" to keep serving during an OpenAI outage
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+LOCAL_LLM_LATENCY_MS = float(os.getenv("LOCAL_LLM_LATENCY_MS", 0))
+LOCAL_LLM_JITTER_MS = float(os.getenv("LOCAL_LLM_JITTER_MS", 0))
+
+class LLMProvider(ABC):
+    """A text-generation backend; ``complete`` returns the raw model output for one chat request.
+
+    ``params`` holds the structured inputs the prompt was built from, for providers that do not
+    read prompts. ``json_mode`` asks for a single JSON object where the backend can enforce it.
+    """
+    name = ""
+    model = ""
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    async def complete(self, prompt_type: str, messages: list, max_tokens: int, temperature: float, params: dict, json_mode: bool = False) -> str:
+        ...
+
+class OpenAIProvider(LLMProvider):
+    name = "openai"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def available(self) -> bool:
+        return get_openai_client() is not None
+
+    async def complete(self, prompt_type: str, messages: list, max_tokens: int, temperature: float, params: dict, json_mode: bool = False) -> str:
+        client = get_openai_client()
+        if client is None:
+            raise RuntimeError("OpenAI API key not configured")
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **({"response_format": {"type": "json_object"}} if json_mode else {})
+        )
+        return response.choices[0].message.content
+
+def _stable_index(*parts) -> int:
+    return int(hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()[:8], 16)
+
+class LocalProvider(LLMProvider):
+    """Deterministic offline provider serving content from app/llm_corpus.py, with simulated latency.
+
+    Output is JSON shaped like the OpenAI responses, so callers run their usual parsing. Known
+    English sentences are translated from the corpus; any other sentence request gets the next
+    sentence of the language's cycle.
+    """
+    name = "local"
+    model = "local-corpus"
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(0)
+        self._sentence_cycle = defaultdict(itertools.count)
+        self._sentences = {language: self._build_sentences(corpus) for language, corpus in llm_corpus.LANGUAGES.items()}
+        self._by_english = {
+            language: {sentence["english_sentence"]: sentence for sentence in sentences}
+            for language, sentences in self._sentences.items()
+        }
+
+    async def complete(self, prompt_type: str, messages: list, max_tokens: int, temperature: float, params: dict, json_mode: bool = False) -> str:
+        if self.latency_ms or self.jitter_ms:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+        handler = getattr(self, f"_{prompt_type}", None)
+        if handler is None:
+            raise ValueError(f"Local provider has no content for prompt type '{prompt_type}'")
+        result = handler(params)
+        return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False)
+
+    @staticmethod
+    def _language(language: str) -> str:
+        return language if language in llm_corpus.LANGUAGES else llm_corpus.DEFAULT_LANGUAGE
+
+    @staticmethod
+    def _build_sentences(corpus: dict) -> list[dict]:
+        sentences = []
+        for first_person, third_person, (verb_first, verb_third), english_object in corpus["predicates"]:
+            for subject, english_subject, person in corpus["subjects"]:
+                predicate = first_person if person == 1 else (third_person or first_person)
+                verb = verb_first if person == 1 else verb_third
+                words = subject.split() + ([corpus["particle"]] if corpus.get("particle") else []) + predicate.split()
+                english = f"{english_subject} {verb} {english_object}"
+                sentences.append({
+                    "words": words,
+                    "sentence": " ".join(words),
+                    "english_sentence": english,
+                    "hints": [
+                        {"text": f"The sentence starts with the subject, {subject}.", "usefulness": 3},
+                        {"text": corpus["order_hint"], "usefulness": 2},
+                        {"text": corpus["topic_hint"], "usefulness": 1},
+                    ],
+                    "explanation": (
+                        f"This sentence translates to '{english}'.\n"
+                        f"- **{subject}**: {english_subject}\n"
+                        f"- **{predicate}**: {verb} {english_object}"
+                    ),
+                })
+        return sentences
+
+    def _sentence(self, params: dict) -> dict:
+        language = self._language(params.get("target_language"))
+        known = self._by_english[language].get(params.get("text", "").strip())
+        if known:
+            return known
+        sentences = self._sentences[language]
+        return sentences[next(self._sentence_cycle[language]) % len(sentences)]
+
+    def _flashcard_entry(self, corpus: dict, index: int) -> dict:
+        words = corpus["words"]
+        word, english, word_type = words[index]
+        example, english_example = corpus["examples"][word_type]
+        distractors = [words[(index + step) % len(words)][1] for step in (7, 13, 19)]
+        options = [english] + distractors
+        rotation = _stable_index(word) % len(options)
+        options = options[rotation:] + options[:rotation]
+        return {
+            "word": word,
+            "translation": english,
+            "type": word_type,
+            "english_equivalents": [english],
+            "definition": corpus["definition"].format(english=english),
+            "english_definition": f"The word for '{english}'",
+            "example_sentence": example.format(word=word),
+            "english_sentence": english_example.format(english=english),
+            "options": [{"id": str(i + 1), "option_text": text} for i, text in enumerate(options)],
+        }
+
+    def _flashcard(self, params: dict) -> dict:
+        corpus = llm_corpus.LANGUAGES[self._language(params.get("target_language"))]
+        excluded = set(params.get("excluded_words", ()))
+        # Each lesson walks the word list from its own starting point
+        start = _stable_index(params.get("category"), params.get("lesson_name"), params.get("harder"))
+        order = [(start + i) % len(corpus["words"]) for i in range(len(corpus["words"]))]
+        available = [i for i in order if corpus["words"][i][0] not in excluded] or order
+        if "n" not in params:
+            return self._flashcard_entry(corpus, available[0])
+        return {"flashcards": [self._flashcard_entry(corpus, i) for i in available[:params["n"]]]}
+
+    def _situation(self, params: dict) -> dict:
+        lesson, category = params.get("lesson", ""), params.get("category", "")
+        template = llm_corpus.SITUATIONS[_stable_index(lesson, category) % len(llm_corpus.SITUATIONS)]
+        return {"situation": template.format(lesson=lesson, category=category.lower())}
+
+    def _chat(self, params: dict) -> dict:
+        corpus = llm_corpus.LANGUAGES[self._language(params.get("target_language"))]
+        conversation = params.get("conversation", [])
+        if len(conversation) >= 5:
+            return {"speaker": "AI", "text": corpus["farewell"][0]}
+        ai_turns = sum(1 for message in conversation if message.get("speaker") != "user")
+        return {"speaker": "AI", "text": corpus["chat"][ai_turns % len(corpus["chat"])][0]}
+
+    def _translation(self, params: dict) -> str:
+        message = params.get("message", "").strip()
+        for corpus in llm_corpus.LANGUAGES.values():
+            for text, english in corpus["chat"] + [corpus["farewell"]]:
+                if message == text:
+                    return english
+        return message
+
+    def _evaluation(self, params: dict) -> dict:
+        user_messages = [m.get("text", "").strip() for m in params.get("conversation", []) if m.get("speaker") == "user"]
+        if user_messages and all(user_messages):
+            return {"satisfactory": True, "feedback": "Nice work keeping the conversation going! Try adding a question of your own next time."}
+        return {"satisfactory": False, "feedback": "Try answering every message so the conversation can continue."}
+
+_FACTORIES = {
+    "openai": lambda: OpenAIProvider(OPENAI_MODEL),
+    "local": lambda: LocalProvider(LOCAL_LLM_LATENCY_MS, LOCAL_LLM_JITTER_MS),
+}
+for _setting, _value in (("LLM_PROVIDER", LLM_PROVIDER), ("LLM_FALLBACK_PROVIDER", LLM_FALLBACK_PROVIDER)):
+    if _value and _value not in _FACTORIES:
+        raise ValueError(f"{_setting} must be one of {sorted(_FACTORIES)}, got '{_value}'")
+
+_providers: dict[str, LLMProvider] = {}
+
+def get_provider(name: str) -> LLMProvider:
+    provider = _providers.get(name)
+    if provider is None:
+        provider = _providers[name] = _FACTORIES[name]()
+    return provider
+
+def get_llm_provider() -> LLMProvider:
+    """The provider selected by LLM_PROVIDER."""
+    return get_provider(LLM_PROVIDER)
+
+def get_fallback_provider() -> LLMProvider | None:
+    """The provider to fail over to when the primary one errors, if LLM_FALLBACK_PROVIDER is set."""
+    if not LLM_FALLBACK_PROVIDER or LLM_FALLBACK_PROVIDER == LLM_PROVIDER:
+        return None
+    return get_provider(LLM_FALLBACK_PROVIDER)
+
+def llm_available() -> bool:
+    """Whether generation can run at all (a configured primary or fallback provider)."""
+    fallback = get_fallback_provider()
+    return get_llm_provider().available() or (fallback is not None and fallback.available())
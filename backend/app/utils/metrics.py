@@ -0,0 +1,134 @@
+import time
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from fastapi import Request
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class Histogram:
+    """In-process histogram rendered in the Prometheus text exposition format."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, dict] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+        series["buckets"][bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, series in sorted(self._series.items()):
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series["buckets"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {series['sum']}")
+            lines.append(f"{self.name}_count{_labels(labels)} {series['count']}")
+        return lines
+
+def render_gauges(prefix: str, documentation: str, samples: list[tuple[dict, dict]]) -> list[str]:
+    """Render each numeric key of the given stats dicts as a `<prefix>_<key>` gauge."""
+    by_key: dict[str, list] = {}
+    for labels, stats in samples:
+        for key, value in stats.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                by_key.setdefault(key, []).append((labels, value))
+    lines = []
+    for key, values in by_key.items():
+        name = f"{prefix}_{key}"
+        lines += [f"# HELP {name} {documentation} ({key})", f"# TYPE {name} gauge"]
+        lines += [f"{name}{_labels(labels)} {value}" for labels, value in values]
+    return lines
+
+request_duration = Histogram(
+    "languagepal_request_duration_seconds", "Time to serve an API request", ("method", "endpoint", "status")
+)
+upstream_duration = Histogram(
+    "languagepal_upstream_duration_seconds", "Time spent in one database query, OpenAI call or image lookup",
+    ("upstream", "prompt_type")
+)
+request_upstream_calls = Histogram(
+    "languagepal_request_upstream_calls", "Upstream calls made while serving one request",
+    ("endpoint", "upstream"), buckets=COUNT_BUCKETS
+)
+
+# Per-request {upstream: [seconds, calls]}; tasks spawned by the request share the same dict.
+_request_timings: ContextVar[dict | None] = ContextVar("request_timings", default=None)
+
+def record(upstream: str, seconds: float, prompt_type: str = "") -> None:
+    """Add one upstream call to the histograms and to the current request's timings."""
+    upstream_duration.observe(seconds, upstream, prompt_type)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(upstream, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+@asynccontextmanager
+async def timed(upstream: str, prompt_type: str = ""):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(upstream, time.perf_counter() - start, prompt_type)
+
+def instrument_engine(engine) -> None:
+    """Time every statement the engine sends to the database, including ORM flushes."""
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record("db", time.perf_counter() - context._metrics_start)
+
+def server_timing_header(timings: dict, total: float) -> str:
+    entries = [
+        f'{upstream};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+        for upstream, (seconds, calls) in sorted(timings.items())
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+async def server_timing_middleware(request: Request, call_next):
+    """Collect upstream timings for the request, return them in Server-Timing and record histograms."""
+    timings = {}
+    token = _request_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _request_timings.reset(token)
+    total = time.perf_counter() - start
+
+    # Label by route template so /api/lesson/{lesson_id}/next is one series, not one per lesson.
+    route = request.scope.get("route")
+    endpoint = route.path if route else "unmatched"
+    request_duration.observe(total, request.method, endpoint, str(response.status_code))
+    for upstream, (_, calls) in timings.items():
+        request_upstream_calls.observe(calls, endpoint, upstream)
+    response.headers["Server-Timing"] = server_timing_header(timings, total)
+    return response
+
+def render_histograms() -> list[str]:
+    return request_duration.render() + upstream_duration.render() + request_upstream_calls.render()
@@ -1,13 +1,26 @@
-import os
 import json
+import asyncio
 import re
-from openai import AsyncOpenAI, OpenAIError
-from dotenv import load_dotenv
+import hashlib
+import copy
+from collections import defaultdict
+from openai import OpenAIError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models.flashcard import Flashcard
-from app.models.category import Category
 from fastapi import HTTPException
+from app.utils.llm_provider import LLMProvider, get_fallback_provider, get_llm_provider, llm_available
+from app.utils.cache import SingleFlight
+from app.utils.llm_cache import cache_ttl, get_cached_response, store_response
+from app.utils.llm_output import repair_json
+from app.schemas.llm import (
+    ChatOutput, EvaluationOutput, FlashcardBatchOutput, FlashcardOutput, SentenceOutput, SituationOutput
+)
+from app.utils.metrics import timed
+from app.services import flashcard_pool, flashcard_catalog
+from app.services.sentence_bank import difficulty_for
+from app.services.catalog import get_catalog
 import logging
 
 # Suppress SQLAlchemy logs
@@ -16,12 +29,128 @@ for logger_name in ['sqlalchemy', 'sqlalchemy.engine', 'sqlalchemy.orm', 'sqlalc
 
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = AsyncOpenAI(api_key=api_key, max_retries=0) if api_key else None
+# One SingleFlight per prompt type so collapsed-call counts can be reported separately.
+_inflight = defaultdict(SingleFlight)
+# Per prompt type: replies fixed locally, replies that needed a re-ask for missing fields, replies rejected.
+_output_stats = defaultdict(lambda: {"repaired": 0, "reasked": 0, "invalid": 0})
 
-async def translate_sentence(sentence: str, target_language: str) -> dict:
-    if not client:
+def _request_key(model: str, prompt_type: str, messages: list, temperature: float, max_tokens: int) -> str:
+    """Hash a chat request after collapsing insignificant whitespace in the prompt text."""
+    normalized = [{"role": m["role"], "content": " ".join(m["content"].split())} for m in messages]
+    payload = json.dumps([prompt_type, model, normalized, temperature, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+async def _generate(
+    provider: LLMProvider, prompt_type: str, messages: list, max_tokens: int, temperature: float, params: dict, json_mode: bool = False
+) -> tuple[str, bool]:
+    """Ask the provider for a completion, failing over to LLM_FALLBACK_PROVIDER when it errors.
+
+    Returns the raw output and whether it came from the fallback.
+    """
+    try:
+        async with timed(provider.name, prompt_type):
+            return await provider.complete(prompt_type, messages, max_tokens, temperature, params, json_mode=json_mode), False
+    except Exception as e:
+        fallback = get_fallback_provider()
+        if fallback is None:
+            raise
+        logger.warning(f"{provider.name} failed for {prompt_type} ({str(e)}), falling back to {fallback.name}")
+        async with timed(fallback.name, prompt_type):
+            return await fallback.complete(prompt_type, messages, max_tokens, temperature, params, json_mode=json_mode), True
+
+async def _validate_output(
+    schema, raw_output: str, provider: LLMProvider, prompt_type: str, messages: list, max_tokens: int, temperature: float, params: dict
+) -> tuple[dict, bool]:
+    """Validate a reply against its schema, repairing it locally and re-asking once for just the missing fields.
+
+    Returns the validated fields and whether the re-ask was answered by the fallback provider. Raises
+    ValueError (ValidationError included) when the reply can't be used.
+    """
+    stats = _output_stats[prompt_type]
+    try:
+        data, repaired = repair_json(raw_output)
+        stats["repaired"] += repaired
+        return schema.model_validate(data).model_dump(), False
+    except ValidationError as e:
+        errors = e.errors()
+        if any(error["type"] != "missing" or len(error["loc"]) != 1 for error in errors):
+            stats["invalid"] += 1
+            raise
+    except ValueError:
+        stats["invalid"] += 1
+        raise
+
+    missing = [error["loc"][0] for error in errors]
+    stats["reasked"] += 1
+    logger.info(f"Re-asking {prompt_type} for missing fields: {', '.join(missing)}")
+    follow_up = messages + [
+        {"role": "assistant", "content": raw_output},
+        {"role": "user", "content": f"Your reply is missing {', '.join(missing)}. Return a JSON object with only these fields."}
+    ]
+    extra_output, from_fallback = await _generate(provider, prompt_type, follow_up, max_tokens, temperature, params, json_mode=True)
+    extra, _ = repair_json(extra_output)
+    if not isinstance(extra, dict):
+        stats["invalid"] += 1
+        raise ValueError(f"Re-ask for {prompt_type} did not return a JSON object")
+    # The error input is the partial object after the schema's own before-validators ran
+    merged = {**errors[0]["input"], **{field: extra[field] for field in missing if field in extra}}
+    try:
+        return schema.model_validate(merged).model_dump(), from_fallback
+    except ValidationError:
+        stats["invalid"] += 1
+        raise
+
+async def _complete(
+    prompt_type: str, messages: list, max_tokens: int, temperature: float, parse=None, cache: bool = True, params: dict = None, schema=None
+):
+    """Run a chat completion through the response cache, sharing one upstream call among identical concurrent requests.
+
+    Pass ``cache=False`` for prompts that must produce a different answer on every call. ``params`` are the
+    structured inputs behind the prompt, used by providers that do not read prompts (see app/utils/llm_provider.py).
+    With a ``schema`` (app/schemas/llm.py) the model is asked for JSON and ``parse`` receives the validated
+    fields as a dict; without one it receives the raw text.
+    """
+    provider = get_llm_provider()
+    key = _request_key(provider.model, prompt_type, messages, temperature, max_tokens)
+    ttl = cache_ttl(prompt_type) if cache else 0
+    if ttl:
+        cached = await get_cached_response(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+    async def call():
+        raw_output, from_fallback = await _generate(
+            provider, prompt_type, messages, max_tokens, temperature, params or {}, json_mode=schema is not None
+        )
+        result = raw_output.strip()
+        if schema:
+            result, reask_fallback = await _validate_output(
+                schema, result, provider, prompt_type, messages, max_tokens, temperature, params or {}
+            )
+            from_fallback = from_fallback or reask_fallback
+        if parse:
+            result = parse(result)
+        # Fallback answers only cover an outage; don't let them outlive it in the cache
+        if ttl and not from_fallback:
+            await store_response(key, prompt_type, result, ttl)
+        return result
+
+    flight = _inflight[prompt_type]
+    if key in flight:
+        logger.info(f"Coalescing {prompt_type} request onto in-flight call ({flight.collapsed + 1} collapsed so far)")
+    # Callers get their own copy since coalesced and cached requests share one parsed result.
+    return copy.deepcopy(await flight.do(key, call))
+
+def get_coalescing_stats() -> dict:
+    """Per prompt type: total calls, calls collapsed onto an in-flight request, and in-flight requests."""
+    return {prompt_type: flight.stats() for prompt_type, flight in _inflight.items()}
+
+def get_output_stats() -> dict:
+    """Per prompt type: replies repaired locally, re-asked for missing fields, and rejected as invalid."""
+    return {prompt_type: dict(stats) for prompt_type, stats in _output_stats.items()}
+
+async def translate_sentence(sentence: str, target_language: str, cache: bool = True) -> dict:
+    if not llm_available():
         return {
             "words": ["OpenAI API key not provided"],
             "sentence": "Translation disabled",
@@ -30,9 +159,37 @@ async def translate_sentence(sentence: str, target_language: str) -> dict:
             "english_sentence": "Translation disabled"  # Added for consistency
         }
     
+    def parse(result: dict) -> dict:
+        words = [word for word in result["words"] if word not in [",", "，", "?", ".", "!", "¿", "¡"]]
+        translated = result["sentence"].rstrip(",").rstrip("，")
+        english_sentence = result["english_sentence"]
+
+        parsed_hints = [
+            hint for hint in result["hints"]
+            if hint["text"] and not any(p in hint["text"].lower() for p in ["question mark", "comma", "punctuation"])
+        ]
+        parsed_hints.sort(key=lambda x: x["usefulness"], reverse=True)
+        explanation = result["explanation"]
+        
+        explanation = re.sub(r'^\d+\.\s+', '- ', explanation, flags=re.MULTILINE)
+        explanation = re.sub(
+            r'- \*\*[?.!¿¡]+\*\*:[^\n]*\n?',
+            '',
+            explanation,
+            flags=re.MULTILINE
+        ).strip()
+
+        return {
+            "words": words,
+            "sentence": translated,
+            "english_sentence": english_sentence,
+            "hints": parsed_hints,
+            "explanation": explanation
+        }
+
     try:
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await _complete(
+            "sentence",
             messages=[
                 {
                     "role": "system",
@@ -66,70 +223,15 @@ async def translate_sentence(sentence: str, target_language: str) -> dict:
                 {"role": "user", "content": sentence}
             ],
             max_tokens=600,
-            temperature=0.5
+            temperature=0.5,
+            parse=parse,
+            cache=cache,
+            params={"text": sentence, "target_language": target_language},
+            schema=SentenceOutput
         )
-        raw_output = response.choices[0].message.content.strip()
-
-        if raw_output.startswith("```json") and raw_output.endswith("```"):
-            raw_output = raw_output[7:-3].strip()
-        
-        result = json.loads(raw_output)
-        
-        if isinstance(result, list):
-            words = [word.strip() for word in result if word.strip() not in [",", "，"]]
-            sentence = " ".join(words).strip()
-            return {
-                "words": words,
-                "sentence": sentence,
-                "english_sentence": "Invalid response format",  # Added
-                "hints": [],
-                "explanation": "Invalid response format"
-            }
-        
-        if not isinstance(result, dict) or not all(key in result for key in ["words", "sentence", "english_sentence", "hints", "explanation"]):
-            return {
-                "words": ["Invalid response format"],
-                "sentence": "Translation error",
-                "english_sentence": "Translation error",  # Added
-                "hints": [],
-                "explanation": "Translation error"
-            }
-        
-        words = [word.strip() for word in result.get("words", []) if word.strip() not in [",", "，", "?", ".", "!", "¿", "¡"]]
-        sentence = result.get("sentence", " ".join(words)).strip().rstrip(",").rstrip("，")
-        english_sentence = result.get("english_sentence", "Translation not provided").strip()
-        hints = result.get("hints", [])
-        
-        parsed_hints = []
-        for hint in hints:
-            if isinstance(hint, dict) and "text" in hint and "usefulness" in hint:
-                text = hint["text"]
-                usefulness = hint["usefulness"]
-                if isinstance(text, str) and isinstance(usefulness, (int, float)) and text.strip():
-                    if not any(p in text.lower() for p in ["question mark", "comma", "punctuation"]):
-                        parsed_hints.append({"text": text.strip(), "usefulness": int(usefulness)})
-            
-        parsed_hints.sort(key=lambda x: x["usefulness"], reverse=True)
-        explanation = result.get("explanation", "")
-        
-        explanation = re.sub(r'^\d+\.\s+', '- ', explanation, flags=re.MULTILINE)
-        explanation = re.sub(
-            r'- \*\*[?.!¿¡]+\*\*:[^\n]*\n?',
-            '',
-            explanation,
-            flags=re.MULTILINE
-        ).strip()
-
-        return {
-            "words": words,
-            "sentence": sentence,
-            "english_sentence": english_sentence,
-            "hints": parsed_hints,
-            "explanation": explanation
-        }
-    except json.JSONDecodeError:
+    except ValueError:
         return {
-            "words": ["Translation error: JSON decode error"],
+            "words": ["Translation error: invalid response format"],
             "sentence": "Translation error",
             "english_sentence": "Translation error",
             "hints": [],
@@ -144,6 +246,177 @@ async def translate_sentence(sentence: str, target_language: str) -> dict:
             "explanation": "Translation error"
         }
         
+FLASHCARD_FORMAT = (
+    "- word: the selected word (e.g., '名前')\n"
+    "- translation: its English meaning\n"
+    "- type: part of speech (noun, verb, etc.)\n"
+    "- english_equivalents: list of English synonyms\n"
+    "- definition: short definition in the target language\n"
+    "- english_definition: short English definition\n"
+    "- example_sentence: a simple sentence using the word in the target language\n"
+    "- english_sentence: translation of the sentence\n"
+    "- options: 4 multiple-choice options (1 correct, 3 incorrect but related to the topic)\n\n"
+)
+
+FLASHCARD_EXAMPLE = (
+    "{\n"
+    "  \"word\": \"名前\",\n"
+    "  \"translation\": \"name\",\n"
+    "  \"type\": \"noun\",\n"
+    "  \"english_equivalents\": [\"name\", \"title\"],\n"
+    "  \"definition\": \"人を識別する語\",\n"
+    "  \"english_definition\": \"Word identifying a person\",\n"
+    "  \"example_sentence\": \"私の名前は田中です。\",\n"
+    "  \"english_sentence\": \"My name is Tanaka.\",\n"
+    "  \"options\": [\n"
+    "    {\"id\": \"1\", \"option_text\": \"name\"},\n"
+    "    {\"id\": \"2\", \"option_text\": \"age\"},\n"
+    "    {\"id\": \"3\", \"option_text\": \"job\"},\n"
+    "    {\"id\": \"4\", \"option_text\": \"city\"}\n"
+    "  ]\n"
+    "}"
+)
+
+def _flashcard_instructions(excluded_words: list, harder: bool, is_new_lesson: bool) -> str:
+    difficulty_instruction = (
+        "Use a slightly advanced word (A2 level)." if harder else
+        "Use a basic word (A1 level)."
+    )
+    excluded_instruction = (
+        f"**CRITICAL**: Do NOT use any of these words: {', '.join(excluded_words)}. "
+        "Ensure the generated word is completely new and not in the excluded list."
+        if excluded_words else ""
+    )
+    new_lesson_instruction = (
+        "Choose a word that is uncommon but suitable for beginners." if is_new_lesson else ""
+    )
+    return f"{excluded_instruction} {difficulty_instruction} {new_lesson_instruction} "
+
+async def request_flashcard_content(
+    category: str,
+    target_language: str,
+    lesson_name: str,
+    excluded_words: list = (),
+    harder: bool = False,
+    is_new_lesson: bool = False
+) -> dict:
+    """Ask the model for one flashcard and validate it, raising ValueError on unusable output."""
+    prompt = (
+        f"Create a flashcard for a single word in {target_language} for the category '{category}' and lesson '{lesson_name}'. "
+        f"{_flashcard_instructions(list(excluded_words), harder, is_new_lesson)}"
+        "The word must be a single standalone word — not a phrase. If the language supports it (e.g., Japanese), it may be a single kanji or kana. "
+        "Return a JSON object with the following fields:\n"
+        f"{FLASHCARD_FORMAT}"
+        "Example:\n"
+        "```json\n"
+        f"{FLASHCARD_EXAMPLE}\n"
+        "```"
+    )
+    return await _complete(
+        "flashcard",
+        messages=[
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Generate a flashcard for {category} and lesson {lesson_name}."}
+        ],
+        max_tokens=600,
+        temperature=0.7,
+        params={
+            "category": category, "target_language": target_language, "lesson_name": lesson_name,
+            "excluded_words": list(excluded_words), "harder": harder
+        },
+        schema=FlashcardOutput
+    )
+
+async def request_flashcard_batch(
+    category: str,
+    target_language: str,
+    lesson_name: str,
+    n: int,
+    excluded_words: list = (),
+    harder: bool = False,
+    is_new_lesson: bool = False
+) -> list[dict]:
+    """Ask for n flashcards in one response; returns the valid ones with new, distinct words."""
+    excluded_words = list(excluded_words)
+    prompt = (
+        f"Create {n} flashcards for {n} distinct single words in {target_language} for the category '{category}' and lesson '{lesson_name}'. "
+        f"{_flashcard_instructions(excluded_words, harder, is_new_lesson)}"
+        "Each word must be a single standalone word — not a phrase — and no two flashcards may use the same word. "
+        "If the language supports it (e.g., Japanese), a word may be a single kanji or kana. "
+        "Return a JSON object with a 'flashcards' array; each element has the following fields:\n"
+        f"{FLASHCARD_FORMAT}"
+        "Example element:\n"
+        "```json\n"
+        f"{FLASHCARD_EXAMPLE}\n"
+        "```"
+    )
+    result = await _complete(
+        "flashcard",
+        messages=[
+            {"role": "system", "content": prompt},
+            {"role": "user", "content": f"Generate {n} flashcards for {category} and lesson {lesson_name}."}
+        ],
+        max_tokens=500 * n,
+        temperature=0.7,
+        params={
+            "category": category, "target_language": target_language, "lesson_name": lesson_name,
+            "excluded_words": excluded_words, "harder": harder, "n": n
+        },
+        schema=FlashcardBatchOutput
+    )
+
+    seen = set(excluded_words)
+    flashcards = []
+    for item in result["flashcards"]:
+        try:
+            flashcard_data = FlashcardOutput.model_validate(item).model_dump()
+        except ValidationError as e:
+            logger.warning(f"Dropping invalid flashcard in batch: {e.error_count()} validation errors, first: {e.errors()[0]['msg']}")
+            continue
+        if flashcard_data["word"] in seen:
+            logger.warning(f"Dropping duplicate word '{flashcard_data['word']}' in batch")
+            continue
+        seen.add(flashcard_data["word"])
+        flashcards.append(flashcard_data)
+    return flashcards[:n]
+
+def _flashcard_data(flashcard: Flashcard) -> dict:
+    return {
+        "flashcard_id": flashcard.id,
+        "word": flashcard.word,
+        "translation": flashcard.translation,
+        "type": flashcard.type,
+        "english_equivalents": json.loads(flashcard.english_equivalents),
+        "definition": flashcard.definition,
+        "english_definition": flashcard.english_definition,
+        "example_sentence": flashcard.example_sentence,
+        "english_sentence": flashcard.english_sentence,
+        "options": json.loads(flashcard.options) if flashcard.options else [
+            {"id": "1", "option_text": flashcard.translation},
+            {"id": "2", "option_text": "age"},
+            {"id": "3", "option_text": "job"},
+            {"id": "4", "option_text": "city"}
+        ]
+    }
+
+async def save_flashcard(
+    db: AsyncSession, flashcard_data: dict, category: str, user_id: int, lesson_name: str, target_language: str, harder: bool
+) -> dict:
+    """Add validated flashcard content to the shared catalog and assign the card to the user."""
+    category_obj = get_catalog().category_by_name(category)
+    if not category_obj:
+        logger.error(f"Category not found: {category}")
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    entries = await flashcard_catalog.store_entries(
+        db, target_language, category_obj.id, lesson_name, difficulty_for(harder), [flashcard_data]
+    )
+    flashcard, = flashcard_catalog.assign(db, user_id, entries)
+    await db.commit()
+
+    logger.info(f"Generated flashcard: {flashcard.word} for lesson: {lesson_name}")
+    return _flashcard_data(flashcard)
+
 async def generate_flashcard(
     category: str,
     target_language: str,
@@ -156,9 +429,9 @@ async def generate_flashcard(
     max_retries: int = 5,
     is_new_lesson: bool = False
 ) -> dict:
-    if not client:
-        logger.error("No OpenAI client available")
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    if not llm_available():
+        logger.error("No LLM provider available")
+        raise HTTPException(status_code=500, detail="LLM provider not configured")
 
     # Check for cached flashcard
     if word:
@@ -175,23 +448,7 @@ async def generate_flashcard(
                 logger.error(f"Cached flashcard word '{cached_flashcard.word}' is a phrase")
                 raise HTTPException(status_code=500, detail="Cached flashcard contains a phrase")
             logger.info(f"Using cached flashcard: {word}, user: {user_id}, lesson: {lesson_name}")
-            return {
-                "flashcard_id": cached_flashcard.id,
-                "word": cached_flashcard.word,
-                "translation": cached_flashcard.translation,
-                "type": cached_flashcard.type,
-                "english_equivalents": json.loads(cached_flashcard.english_equivalents),
-                "definition": cached_flashcard.definition,
-                "english_definition": cached_flashcard.english_definition,
-                "example_sentence": cached_flashcard.example_sentence,
-                "english_sentence": cached_flashcard.english_sentence,
-                "options": json.loads(cached_flashcard.options) if cached_flashcard.options else [
-                    {"id": "1", "option_text": cached_flashcard.translation},
-                    {"id": "2", "option_text": "age"},
-                    {"id": "3", "option_text": "job"},
-                    {"id": "4", "option_text": "city"}
-                ]
-            }
+            return _flashcard_data(cached_flashcard)
 
     # Fetch user's existing flashcards to avoid duplicates
     result = await db.execute(
@@ -203,6 +460,22 @@ async def generate_flashcard(
     excluded_words = [row[0] for row in result.fetchall()]
     logger.info(f"Excluded words for user {user_id}, category {category_id}: {excluded_words}")
 
+    # Reuse a catalog card another learner already generated, when there is one the user hasn't had
+    entries = await flashcard_catalog.reusable_entries(
+        db, target_language, category_id, lesson_name, difficulty_for(harder), excluded_words, 1
+    )
+    if entries:
+        flashcard, = flashcard_catalog.assign(db, user_id, entries)
+        await db.commit()
+        logger.info(f"Using catalog flashcard: {flashcard.word}, user: {user_id}, lesson: {lesson_name}")
+        return _flashcard_data(flashcard)
+
+    # Serve a pre-generated card when the pool for this lesson has one the user hasn't seen
+    pooled = flashcard_pool.take_flashcard(target_language, category, lesson_name, harder, set(excluded_words))
+    if pooled:
+        logger.info(f"Using pooled flashcard: {pooled['word']}, user: {user_id}, lesson: {lesson_name}")
+        return await save_flashcard(db, pooled, category, user_id, lesson_name, target_language, harder)
+
     # Track words generated during retries
     failed_words = set()
 
@@ -210,144 +483,23 @@ async def generate_flashcard(
     while attempts < max_retries:
         try:
             logger.info(f"Generating flashcard: category={category}, lesson={lesson_name}, target_language={target_language}, harder={harder}, attempt={attempts + 1}")
-            
-            difficulty_instruction = (
-                "Use a slightly advanced word (A2 level)." if harder else
-                "Use a basic word (A1 level)."
-            )
-            excluded_instruction = (
-                f"**CRITICAL**: Do NOT use any of these words: {', '.join(excluded_words + list(failed_words))}. "
-                "Ensure the generated word is completely new and not in the excluded list."
-                if (excluded_words or failed_words) else ""
-            )
-            new_lesson_instruction = (
-                "Choose a word that is uncommon but suitable for beginners." if is_new_lesson else ""
-            )
-
-            prompt = (
-                f"Create a flashcard for a single word in {target_language} for the category '{category}' and lesson '{lesson_name}'. "
-                f"{excluded_instruction} {difficulty_instruction} {new_lesson_instruction} "
-                "The word must be a single standalone word — not a phrase. If the language supports it (e.g., Japanese), it may be a single kanji or kana. "
-                "Return a JSON object with the following fields:\n"
-                "- word: the selected word (e.g., '名前')\n"
-                "- translation: its English meaning\n"
-                "- type: part of speech (noun, verb, etc.)\n"
-                "- english_equivalents: list of English synonyms\n"
-                "- definition: short definition in the target language\n"
-                "- english_definition: short English definition\n"
-                "- example_sentence: a simple sentence using the word in the target language\n"
-                "- english_sentence: translation of the sentence\n"
-                "- options: 4 multiple-choice options (1 correct, 3 incorrect but related to the topic)\n\n"
-                "Example:\n"
-                "```json\n"
-                "{\n"
-                "  \"word\": \"名前\",\n"
-                "  \"translation\": \"name\",\n"
-                "  \"type\": \"noun\",\n"
-                "  \"english_equivalents\": [\"name\", \"title\"],\n"
-                "  \"definition\": \"人を識別する語\",\n"
-                "  \"english_definition\": \"Word identifying a person\",\n"
-                "  \"example_sentence\": \"私の名前は田中です。\",\n"
-                "  \"english_sentence\": \"My name is Tanaka.\",\n"
-                "  \"options\": [\n"
-                "    {\"id\": \"1\", \"option_text\": \"name\"},\n"
-                "    {\"id\": \"2\", \"option_text\": \"age\"},\n"
-                "    {\"id\": \"3\", \"option_text\": \"job\"},\n"
-                "    {\"id\": \"4\", \"option_text\": \"city\"}\n"
-                "  ]\n"
-                "}\n"
-                "```"
-            )
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": prompt},
-                    {"role": "user", "content": f"Generate a flashcard for {category} and lesson {lesson_name}."}
-                ],
-                max_tokens=600,
-                temperature=0.7
+            flashcard_data = await request_flashcard_content(
+                category=category,
+                target_language=target_language,
+                lesson_name=lesson_name,
+                excluded_words=excluded_words + list(failed_words),
+                harder=harder,
+                is_new_lesson=is_new_lesson
             )
-            raw_output = response.choices[0].message.content.strip()
-
-            if raw_output.startswith("```json") and raw_output.endswith("```"):
-                raw_output = raw_output[7:-3].strip()
-            
-            result = json.loads(raw_output)
-            
-            if not isinstance(result, dict) or not all(
-                key in result
-                for key in [
-                    "word",
-                    "translation",
-                    "type",
-                    "english_equivalents",
-                    "definition",
-                    "english_definition",
-                    "example_sentence",
-                    "english_sentence",
-                    "options"
-                ]
-            ):
-                logger.error(f"Invalid flashcard format: {raw_output}")
-                raise ValueError("Invalid flashcard response format")
-
-            word = result["word"].strip()
-            if ' ' in word or len(word.split()) > 1:
-                logger.error(f"Generated word '{word}' is a phrase")
-                raise ValueError("Flashcard word must be a single word")
 
+            word = flashcard_data["word"]
             if word in excluded_words or word in failed_words:
                 logger.warning(f"Generated word '{word}' already used by user {user_id}, retrying")
                 failed_words.add(word)
                 attempts += 1
                 continue
 
-            flashcard_data = {
-                "word": word,
-                "translation": result["translation"].strip(),
-                "type": result["type"].strip(),
-                "english_equivalents": result["english_equivalents"],
-                "definition": result["definition"].strip(),
-                "english_definition": result["english_definition"].strip(),
-                "example_sentence": result["example_sentence"].strip(),
-                "english_sentence": result["english_sentence"].strip(),
-                "options": [
-                    {"id": opt["id"], "option_text": opt["option_text"].strip()}
-                    for opt in result["options"]
-                ]
-            }
-
-            result = await db.execute(
-                select(Category).filter(Category.name == category)
-            )
-            category_obj = result.scalars().first()
-            if not category_obj:
-                logger.error(f"Category not found: {category}")
-                raise HTTPException(status_code=404, detail="Category not found")
-            
-            flashcard = Flashcard(
-                word=flashcard_data["word"],
-                translation=flashcard_data["translation"],
-                type=flashcard_data["type"],
-                english_equivalents=json.dumps(flashcard_data["english_equivalents"]),
-                definition=flashcard_data["definition"],
-                english_definition=flashcard_data["english_definition"],
-                example_sentence=flashcard_data["example_sentence"],
-                english_sentence=flashcard_data["english_sentence"],
-                category_id=category_obj.id,
-                user_id=user_id,
-                used_count=1,
-                options=json.dumps(flashcard_data["options"])
-            )
-            db.add(flashcard)
-            await db.commit()
-            await db.refresh(flashcard)
-            flashcard_data["flashcard_id"] = flashcard.id
-            flashcard_data["english_equivalents"] = json.loads(flashcard.english_equivalents)
-            flashcard_data["options"] = json.loads(flashcard.options)
-
-            logger.info(f"Generated flashcard: {flashcard_data['word']} for lesson: {lesson_name}")
-            return flashcard_data
+            return await save_flashcard(db, flashcard_data, category, user_id, lesson_name, target_language, harder)
         except (ValueError, json.JSONDecodeError) as e:
             logger.error(f"Flashcard attempt {attempts + 1} failed: {str(e)}")
             attempts += 1
@@ -384,15 +536,104 @@ async def generate_flashcard(
 
     raise HTTPException(status_code=500, detail="Failed to generate unique flashcard after retries")
 
+async def generate_flashcards(
+    category: str,
+    target_language: str,
+    category_id: int,
+    lesson_name: str,
+    db: AsyncSession,
+    user_id: int,
+    n: int,
+    harder: bool = False,
+    max_retries: int = 3,
+    is_new_lesson: bool = False,
+    commit: bool = True
+) -> list[dict]:
+    """Assign n cards new to the user: catalog cards first, then pooled ones, then one LLM call for
+    the rest, re-asking only for failed slots.
+
+    With commit=False the rows are only flushed, leaving the caller to commit them with its own changes.
+    """
+    if n <= 0:
+        return []
+    if not llm_available():
+        logger.error("No LLM provider available")
+        raise HTTPException(status_code=500, detail="LLM provider not configured")
+
+    result = await db.execute(
+        select(Flashcard.word).filter(
+            Flashcard.user_id == user_id,
+            Flashcard.category_id == category_id
+        )
+    )
+    excluded_words = [row[0] for row in result.fetchall()]
+
+    entries = await flashcard_catalog.reusable_entries(
+        db, target_language, category_id, lesson_name, difficulty_for(harder), excluded_words, n
+    )
+    excluded_words += [entry.word for entry in entries]
+    needed = n - len(entries)
+
+    flashcards = []
+    while len(flashcards) < needed:
+        pooled = flashcard_pool.take_flashcard(
+            target_language, category, lesson_name, harder,
+            set(excluded_words) | {card["word"] for card in flashcards}
+        )
+        if not pooled:
+            break
+        flashcards.append(pooled)
+
+    pooled = list(flashcards)
+    try:
+        attempts = 0
+        while len(flashcards) < needed and attempts < max_retries:
+            missing = needed - len(flashcards)
+            logger.info(f"Generating {missing} flashcards: category={category}, lesson={lesson_name}, target_language={target_language}, harder={harder}, attempt={attempts + 1}")
+            try:
+                flashcards += await request_flashcard_batch(
+                    category=category,
+                    target_language=target_language,
+                    lesson_name=lesson_name,
+                    n=missing,
+                    excluded_words=excluded_words + [card["word"] for card in flashcards],
+                    harder=harder,
+                    is_new_lesson=is_new_lesson
+                )
+            except (ValueError, json.JSONDecodeError) as e:
+                logger.error(f"Flashcard batch attempt {attempts + 1} failed: {str(e)}")
+            except OpenAIError as e:
+                logger.error(f"OpenAI error: {str(e)}")
+                raise HTTPException(status_code=500, detail="Failed to generate flashcards")
+            attempts += 1
+
+        if len(flashcards) < needed:
+            raise HTTPException(status_code=500, detail="Failed to generate unique flashcards after retries")
+    except (Exception, asyncio.CancelledError):
+        # The pooled cards were never assigned; give them back rather than lose them with the failed batch
+        flashcard_pool.return_flashcards(target_language, category, lesson_name, harder, pooled)
+        raise
+
+    entries += await flashcard_catalog.store_entries(
+        db, target_language, category_id, lesson_name, difficulty_for(harder), flashcards
+    )
+    rows = flashcard_catalog.assign(db, user_id, entries)
+    if commit:
+        await db.commit()
+    else:
+        await db.flush()
+    logger.info(f"Assigned flashcards: {[row.word for row in rows]} for lesson: {lesson_name} ({len(flashcards)} generated)")
+    return [_flashcard_data(row) for row in rows]
+
 async def generate_situation(category: str, lesson: str, target_language: str) -> dict:
-    if not client:
+    if not llm_available():
         return {
             "situation": f"Practice {lesson} in a {category} context."
         }
     
     try:
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await _complete(
+            "situation",
             messages=[
                 {
                     "role": "system",
@@ -412,22 +653,13 @@ async def generate_situation(category: str, lesson: str, target_language: str) -
                 {"role": "user", "content": f"Generate a situation for {lesson} in {category}."}
             ],
             max_tokens=100,
-            temperature=0.5
+            temperature=0.5,
+            params={"category": category, "lesson": lesson, "target_language": target_language},
+            schema=SituationOutput
         )
-        raw_output = response.choices[0].message.content.strip()
-
-        if raw_output.startswith("```json") and raw_output.endswith("```"):
-            raw_output = raw_output[7:-3].strip()
-        
-        result = json.loads(raw_output)
-        
-        if not isinstance(result, dict) or "situation" not in result:
-            return {
-                "situation": "Error occurred"
-            }
-        
+    except ValueError:
         return {
-            "situation": result["situation"].strip()
+            "situation": "Error occurred"
         }
     except Exception as e:
         return {
@@ -435,7 +667,7 @@ async def generate_situation(category: str, lesson: str, target_language: str) -
         }
 
 async def chat_message(situation: str, conversation: list, target_language: str, user_id: int) -> dict:
-    if not client:
+    if not llm_available():
         return {
             "speaker": "AI",
             "text": "Hello!"
@@ -466,28 +698,18 @@ async def chat_message(situation: str, conversation: list, target_language: str,
             role = "user" if msg["speaker"] == "user" else "assistant"
             messages.append({"role": role, "content": msg["text"]})
 
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini", # Fixed typo: 'gmt-4o-mini' to 'gpt-4o-mini'
+        return await _complete(
+            "chat",
             messages=messages,
             max_tokens=100,
-            temperature=0.5
+            temperature=0.5,
+            params={"situation": situation, "conversation": conversation, "target_language": target_language},
+            schema=ChatOutput
         )
-        raw_output = response.choices[0].message.content.strip()
-
-        if raw_output.startswith("```json") and raw_output.endswith("```"):
-            raw_output = raw_output[7:-3].strip()
-        
-        result = json.loads(raw_output)
-        
-        if not isinstance(result, dict) or not all(key in result for key in ["speaker", "text"]):
-            return {
-                "speaker": "AI",
-                "text": "Error occurred"
-            }
-        
+    except ValueError:
         return {
-            "speaker": result["speaker"].strip(),
-            "text": result["text"].strip()
+            "speaker": "AI",
+            "text": "Error occurred"
         }
     except Exception as e:
         return {
@@ -496,12 +718,12 @@ async def chat_message(situation: str, conversation: list, target_language: str,
         }
 
 async def translate_message(message: str, from_language: str, to_language: str) -> str:
-    if not client:
+    if not llm_available():
         return "Translation disabled"
     
     try:
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await _complete(
+            "translation",
             messages=[
                 {
                     "role": "system",
@@ -513,15 +735,14 @@ async def translate_message(message: str, from_language: str, to_language: str)
                 {"role": "user", "content": message}
             ],
             max_tokens=100,
-            temperature=0.5
+            temperature=0.5,
+            params={"message": message, "from_language": from_language, "to_language": to_language}
         )
-        translation = response.choices[0].message.content.strip()
-        return translation
     except Exception as e:
         return f"Error: {str(e)}"
 
 async def evaluate_conversation(conversation: list, target_language: str) -> dict:
-    if not client:
+    if not llm_available():
         return {
             "satisfactory": False,
             "feedback": "Evaluation disabled"
@@ -529,8 +750,8 @@ async def evaluate_conversation(conversation: list, target_language: str) -> dic
     
     try:
         conversation_text = "\n".join([f"{msg['speaker']}: {msg['text']}" for msg in conversation])
-        response = await client.chat.completions.create(
-            model="gpt-4o-mini",
+        return await _complete(
+            "evaluation",
             messages=[
                 {
                     "role": "system",
@@ -552,27 +773,17 @@ async def evaluate_conversation(conversation: list, target_language: str) -> dic
                 {"role": "user", "content": conversation_text}
             ],
             max_tokens=200,
-            temperature=0.5
+            temperature=0.5,
+            params={"conversation": conversation, "target_language": target_language},
+            schema=EvaluationOutput
         )
-        raw_output = response.choices[0].message.content.strip()
-
-        if raw_output.startswith("```json") and raw_output.endswith("```"):
-            raw_output = raw_output[7:-3].strip()
-        
-        result = json.loads(raw_output)
-        
-        if not isinstance(result, dict) or not all(key in result for key in ["satisfactory", "feedback"]):
-            return {
-                "satisfactory": False,
-                "feedback": "Invalid evaluation format"
-            }
-        
+    except ValueError:
         return {
-            "satisfactory": result["satisfactory"],
-            "feedback": result["feedback"].strip()
+            "satisfactory": False,
+            "feedback": "Invalid evaluation format"
         }
     except Exception as e:
         return {
             "satisfactory": False,
             "feedback": f"Error: {str(e)}"
-        }
\ No newline at end of file
+        }
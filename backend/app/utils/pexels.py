@@ -1,43 +1,127 @@
 import httpx
 import os
 import logging
+from datetime import datetime
 from dotenv import load_dotenv
-from functools import lru_cache
-from time import sleep
+from sqlalchemy import select
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models.image_cache import ImageCache
+from app.utils.cache import TTLCache, SingleFlight
+from app.utils.http_clients import get_pexels_client
+from app.utils.metrics import timed
+from app.utils.rate_limit import TokenBucket
 
 load_dotenv()
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
+PEXELS_CACHE_TTL_SECONDS = int(os.getenv("PEXELS_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+PEXELS_CACHE_SIZE = int(os.getenv("PEXELS_CACHE_SIZE", 2048))
+PEXELS_REQUESTS_PER_HOUR = float(os.getenv("PEXELS_REQUESTS_PER_HOUR", 200))
+PEXELS_BURST = float(os.getenv("PEXELS_BURST", 10))
+PEXELS_MAX_QUEUE_WAIT = float(os.getenv("PEXELS_MAX_QUEUE_WAIT", 2))
+PLACEHOLDER_IMAGE_URL = "https://placehold.co/600x400"
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@lru_cache(maxsize=100)
+# In-process tier in front of the image_cache table; concurrent misses share one fetch.
+_image_cache = TTLCache(maxsize=PEXELS_CACHE_SIZE, ttl=PEXELS_CACHE_TTL_SECONDS)
+_image_fetches = SingleFlight()
+# Requests queue on the event loop for a token; when the budget is gone we serve the placeholder.
+pexels_limiter = TokenBucket("Pexels", PEXELS_REQUESTS_PER_HOUR / 3600, PEXELS_BURST, PEXELS_MAX_QUEUE_WAIT)
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so equivalent lookups share a cache entry."""
+    return " ".join(query.split()).lower()
+
 async def get_image(query: str) -> str:
     """Fetch a medium-sized image URL from Pexels for the given query, with caching."""
+    key = normalize_query(query)
+    if not key:
+        return PLACEHOLDER_IMAGE_URL
+
+    image_url = _image_cache.get(key)
+    if image_url is not None:
+        return image_url
+    async with timed("pexels"):
+        return await _image_fetches.do(key, lambda: _load_image(key))
+
+def image_cache_stats() -> dict:
+    return _image_cache.stats()
+
+def image_fetch_stats() -> dict:
+    return _image_fetches.stats()
+
+async def _load_image(key: str) -> str:
+    """Resolve a cache miss from the image_cache table, falling back to Pexels."""
+    image_url, ttl = await _read_stored_image(key)
+    if image_url:
+        _image_cache.set(key, image_url, ttl=ttl)
+        return image_url
+
+    image_url = await _fetch_image(key)
+    # Placeholders are not cached so a later lookup can still find a real image.
+    if image_url != PLACEHOLDER_IMAGE_URL:
+        _image_cache.set(key, image_url)
+        await _store_image(key, image_url)
+    return image_url
+
+async def _read_stored_image(key: str) -> tuple[str | None, float]:
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(ImageCache).filter(ImageCache.query == key))
+            entry = result.scalars().first()
+    except Exception as e:
+        logger.warning(f"Image cache lookup failed for query '{key}': {str(e)}")
+        return None, 0
+    if not entry:
+        return None, 0
+    remaining = PEXELS_CACHE_TTL_SECONDS - (datetime.utcnow() - entry.fetched_at).total_seconds()
+    if remaining <= 0:
+        return None, 0
+    return entry.image_url, remaining
+
+async def _store_image(key: str, image_url: str) -> None:
+    now = datetime.utcnow()
+    stmt = dialect_insert(ImageCache).values(query=key, image_url=image_url, fetched_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ImageCache.query],
+        set_={"image_url": image_url, "fetched_at": now}
+    )
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to persist image cache entry for query '{key}': {str(e)}")
+
+async def _fetch_image(query: str) -> str:
     if not PEXELS_API_KEY:
         logger.error("Pexels API key not configured")
-        return "https://placehold.co/600x400"
-    
-    url = f"https://api.pexels.com/v1/search?query={query}&per_page=1"
+        return PLACEHOLDER_IMAGE_URL
+
+    params = {"query": query, "per_page": 1}
     headers = {"Authorization": PEXELS_API_KEY}
-    
-    async with httpx.AsyncClient() as client:
-        for attempt in range(3):
-            try:
-                response = await client.get(url, headers=headers, timeout=10.0)
-                if response.status_code == 429:
-                    logger.warning(f"Pexels rate limit exceeded for query '{query}', retrying in {attempt + 1}s")
-                    sleep(attempt + 1)
-                    continue
-                response.raise_for_status()
-                data = response.json()
-                photos = data.get("photos", [])
-                if not photos:
-                    logger.warning(f"No images found for query: {query}")
-                    return "https://placehold.co/600x400"
-                image_url = photos[0]["src"]["medium"]
-                logger.info(f"Returning image URL for query '{query}': {image_url}")
-                return image_url
-            except (httpx.HTTPStatusError, httpx.RequestError, KeyError) as e:
-                logger.error(f"Pexels API error for query '{query}': {str(e)}")
-                return "https://placehold.co/600x400"
\ No newline at end of file
+
+    if not await pexels_limiter.acquire():
+        logger.warning(f"Pexels request budget exhausted, returning placeholder for query '{query}'")
+        return PLACEHOLDER_IMAGE_URL
+
+    client = get_pexels_client()
+    try:
+        response = await client.get("/search", params=params, headers=headers)
+        pexels_limiter.update_from_headers(response.headers, throttled=response.status_code == 429)
+        if response.status_code == 429:
+            logger.warning(f"Pexels rate limit exceeded for query '{query}', returning placeholder")
+            return PLACEHOLDER_IMAGE_URL
+        response.raise_for_status()
+        data = response.json()
+        photos = data.get("photos", [])
+        if not photos:
+            logger.warning(f"No images found for query: {query}")
+            return PLACEHOLDER_IMAGE_URL
+        image_url = photos[0]["src"]["medium"]
+        logger.info(f"Returning image URL for query '{query}': {image_url}")
+        return image_url
+    except (httpx.HTTPStatusError, httpx.RequestError, KeyError) as e:
+        logger.error(f"Pexels API error for query '{query}': {str(e)}")
+        return PLACEHOLDER_IMAGE_URL
@@ -0,0 +1,82 @@
+import asyncio
+import time
+import logging
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Non-blocking token bucket that also honours an upstream's advertised quota.
+
+    Callers that arrive while the bucket is empty reserve a future token and wait for it
+    on the event loop. If that wait would exceed ``max_wait``, or the upstream has told us
+    its quota is used up, ``acquire`` returns False at once so the caller can degrade.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, max_wait: float):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0  # Wall-clock time, as upstream reset headers are epoch seconds
+        self.granted = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> bool:
+        if time.time() < self._blocked_until:
+            self.rejected += 1
+            return False
+
+        self._refill()
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if wait > self.max_wait:
+            self.rejected += 1
+            return False
+
+        # Reserve the token before awaiting so queued callers are served in arrival order.
+        self._tokens -= 1
+        self.granted += 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+    def block_for(self, seconds: float):
+        """Reject all requests for the given number of seconds."""
+        self._blocked_until = max(self._blocked_until, time.time() + seconds)
+        logger.warning(f"{self.name} requests paused for {seconds:.0f}s")
+
+    def update_from_headers(self, headers: Mapping[str, str], throttled: bool = False, default_retry: float = 60.0):
+        """Sync the bucket with X-Ratelimit-* / Retry-After headers; ``throttled`` marks a 429."""
+        remaining = _parse_float(headers.get("x-ratelimit-remaining"))
+        reset = _parse_float(headers.get("x-ratelimit-reset"))
+        retry_after = _parse_float(headers.get("retry-after"))
+
+        if retry_after is not None:
+            self.block_for(retry_after)
+        elif throttled or (remaining is not None and remaining <= 0):
+            self.block_for(reset - time.time() if reset and reset > time.time() else default_retry)
+        elif remaining is not None:
+            self._refill()
+            self._tokens = min(self._tokens, remaining)
+
+    def stats(self) -> dict:
+        self._refill()
+        return {
+            "tokens": round(self._tokens, 2),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "blocked_for": max(0.0, round(self._blocked_until - time.time(), 1)),
+        }
+
+def _parse_float(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
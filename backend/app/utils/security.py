@@ -0,0 +1,74 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from dotenv import load_dotenv
+
+load_dotenv()
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps it off the event loop.
+# The semaphore caps hashes in flight at the pool size; callers beyond that wait (up to
+# PASSWORD_HASH_QUEUE_TIMEOUT) and anything past PASSWORD_HASH_MAX_PENDING is turned away.
+_executor: ThreadPoolExecutor | None = None
+_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+_stats = {"in_flight": 0, "queued": 0, "completed": 0, "rejected": 0}
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+def _overloaded() -> HTTPException:
+    _stats["rejected"] += 1
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+async def _run(fn, *args):
+    if _stats["queued"] + _stats["in_flight"] >= PASSWORD_HASH_MAX_PENDING:
+        logger.warning(f"Password hashing queue full ({PASSWORD_HASH_MAX_PENDING}), rejecting request")
+        raise _overloaded()
+
+    _stats["queued"] += 1
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Waited {PASSWORD_HASH_QUEUE_TIMEOUT}s for a password hashing slot, rejecting request")
+        raise _overloaded()
+    finally:
+        _stats["queued"] -= 1
+
+    _stats["in_flight"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _stats["in_flight"] -= 1
+        _stats["completed"] += 1
+        _slots.release()
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run(pwd_context.verify, password, hashed_password)
+
+def password_pool_stats() -> dict:
+    return {"workers": PASSWORD_HASH_WORKERS, "max_pending": PASSWORD_HASH_MAX_PENDING, **_stats}
+
+def shutdown_password_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
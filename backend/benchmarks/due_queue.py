@@ -0,0 +1,140 @@
+"""Measure /api/flashcard/due query latency as a user's scheduled cards grow to 100k.
+
+Migrates a new SQLite database, gives one user per size that many cards in review (half of
+them overdue) and times the due-queue query for each:
+
+    DATABASE_URL=sqlite+aiosqlite:////tmp/due_queue.db \\
+        python benchmarks/due_queue.py --sizes 1000 10000 100000 --limit 20 --runs 200
+
+The query is a range scan of ix_flashcard_review_states_user_due that stops after --limit rows,
+so the medians should stay flat across sizes. Exits non-zero if SQLite plans a full scan or a
+temporary sort for it. Run from the backend directory after
+`pip install -r benchmarks/requirements.txt`, which adds the aiosqlite driver.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import DATABASE_URL
+from app.db_seed import ALEMBIC_CONFIG
+from app.services.review_scheduler import due_flashcards, due_flashcards_query
+
+CATALOG_ROWS = 1000
+BATCH = 10000
+
+def _migrate(connection):
+    config = Config(ALEMBIC_CONFIG)
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+async def _fill(conn, sizes: list[int], now: datetime):
+    await conn.execute(text("INSERT INTO categories (id, name, chapter, difficulty) VALUES (1, 'Bench', 1, 'A1')"))
+    await conn.execute(
+        text(
+            "INSERT INTO flashcard_catalog (id, language, category_id, word, translation, type, english_equivalents, "
+            "definition, english_definition, example_sentence, english_sentence, options, difficulty) "
+            "VALUES (:id, 'Japanese', 1, :word, 'translation', 'noun', '[]', '', '', '', '', '[]', 1)"
+        ),
+        [{"id": i, "word": f"word{i}"} for i in range(1, CATALOG_ROWS + 1)]
+    )
+    flashcard_id = 0
+    for user_id, size in enumerate(sizes, start=1):
+        await conn.execute(
+            text("INSERT INTO users (id, username, email, hashed_password, learning_language, is_active, created_at, progress_version) "
+                 "VALUES (:id, :name, :email, 'x', 'Japanese', 1, :now, 0)"),
+            {"id": user_id, "name": f"user{user_id}", "email": f"user{user_id}@example.com", "now": now}
+        )
+        for start in range(0, size, BATCH):
+            ids = range(flashcard_id + start + 1, flashcard_id + min(start + BATCH, size) + 1)
+            await conn.execute(
+                text("INSERT INTO flashcards (id, catalog_id, word, category_id, user_id, used_count) "
+                     "VALUES (:id, :catalog_id, :word, 1, :user_id, 1)"),
+                [{"id": i, "catalog_id": i % CATALOG_ROWS + 1, "word": f"word{i % CATALOG_ROWS + 1}", "user_id": user_id} for i in ids]
+            )
+            # Due times spread over 30 days either side of now, in shuffled order
+            await conn.execute(
+                text("INSERT INTO flashcard_review_states (user_id, flashcard_id, ease, interval_days, repetitions, lapses, due_at, reviewed_at) "
+                     "VALUES (:user_id, :flashcard_id, 2.5, 6, 2, 0, :due_at, :now)"),
+                [
+                    {"user_id": user_id, "flashcard_id": i, "now": now,
+                     "due_at": now + timedelta(minutes=(i * 7919) % (60 * 24 * 60) - 60 * 24 * 30)}
+                    for i in ids
+                ]
+            )
+        flashcard_id += size
+    await conn.execute(text("ANALYZE"))
+
+def _plan_problems(plan: list[str]) -> list[str]:
+    problems = []
+    if not any("ix_flashcard_review_states_user_due" in step for step in plan):
+        problems.append("ix_flashcard_review_states_user_due not used")
+    if any(step.startswith("SCAN flashcard_review_states") for step in plan):
+        problems.append("full scan of flashcard_review_states")
+    if any("TEMP B-TREE" in step for step in plan):
+        problems.append("temporary sort")
+    return problems
+
+async def run(sizes: list[int], limit: int, runs: int) -> bool:
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "sqlite" or not url.database or os.path.exists(url.database):
+        raise SystemExit("due_queue.py needs DATABASE_URL to name a SQLite file that doesn't exist yet")
+    engine = create_async_engine(url)
+    now = datetime.utcnow()
+    async with engine.begin() as conn:
+        await conn.run_sync(_migrate)
+    start = time.perf_counter()
+    async with engine.begin() as conn:
+        await _fill(conn, sizes, now)
+    print(f"Loaded {sum(sizes)} scheduled cards in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    results = {}
+    async with AsyncSession(engine) as db:
+        for user_id, size in enumerate(sizes, start=1):
+            await due_flashcards(db, user_id, limit, now)  # Warm the page cache
+            timings = []
+            for _ in range(runs):
+                db.expunge_all()
+                began = time.perf_counter()
+                due = await due_flashcards(db, user_id, limit, now)
+                timings.append((time.perf_counter() - began) * 1000)
+            timings.sort()
+            results[size] = {
+                "returned": len(due),
+                "median_ms": round(statistics.median(timings), 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+            }
+
+    async with engine.connect() as conn:
+        statement = due_flashcards_query(1, limit, now).compile(conn.sync_connection)
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", tuple(statement.params[name] for name in statement.positiontup)
+        )
+        plan = [row[-1] for row in result]
+    await engine.dispose()
+
+    problems = _plan_problems(plan)
+    print(json.dumps({"limit": limit, "runs": runs, "cards_per_user": results, "plan": plan, "problems": problems}, indent=2))
+    return not problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="scheduled cards per user")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args.sizes, args.limit, args.runs)) else 1)
+
+if __name__ == "__main__":
+    main()
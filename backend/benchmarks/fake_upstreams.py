@@ -0,0 +1,172 @@
+"""Local stand-ins for the OpenAI chat completions API and the Pexels search API.
+
+Responses are shaped like the real ones for every prompt in app/utils/openai.py, so the API runs
+its normal parsing and validation paths. Latency, jitter and error rate are configurable per
+upstream:
+
+    python benchmarks/fake_upstreams.py --openai-port 9101 --pexels-port 9102 \\
+        --openai-latency-ms 400 --openai-jitter-ms 150 --openai-error-rate 0.01
+
+Point the API at them with OPENAI_BASE_URL=http://127.0.0.1:9101/v1 and
+PEXELS_API_URL=http://127.0.0.1:9102/v1 (any non-empty API keys). benchmarks/load_test.py
+starts them automatically.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+class Upstream:
+    """Latency and failure profile for one fake upstream."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, error_rate: float):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+
+    async def delay(self) -> bool:
+        """Sleep for one simulated round trip; returns False when this request should fail."""
+        self.requests += 1
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, latency) / 1000)
+        if random.random() < self.error_rate:
+            self.errors += 1
+            return False
+        return True
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors}
+
+_counter = itertools.count(1)
+
+def _flashcard(word: str) -> dict:
+    return {
+        "word": word,
+        "translation": f"meaning of {word}",
+        "type": "noun",
+        "english_equivalents": [f"meaning of {word}"],
+        "definition": f"{word}の定義",
+        "english_definition": f"Definition of {word}",
+        "example_sentence": f"これは{word}です。",
+        "english_sentence": f"This is {word}.",
+        "options": [
+            {"id": "1", "option_text": f"meaning of {word}"},
+            {"id": "2", "option_text": "age"},
+            {"id": "3", "option_text": "job"},
+            {"id": "4", "option_text": "city"},
+        ],
+    }
+
+def _sentence() -> dict:
+    n = next(_counter)
+    words = ["私", "は", f"学生{n}", "です"]
+    return {
+        "words": words,
+        "sentence": " ".join(words),
+        "english_sentence": f"I am student number {n}",
+        "hints": [
+            {"text": "The sentence starts with the subject.", "usefulness": 3},
+            {"text": "です comes last.", "usefulness": 2},
+            {"text": "は marks the topic.", "usefulness": 1},
+        ],
+        "explanation": f"This sentence translates to 'I am student number {n}'.\n- **私**: I\n- **は**: topic marker",
+    }
+
+def completion_content(messages: list) -> str:
+    """Produce a plausible model reply for each prompt type the API sends."""
+    system = messages[0]["content"] if messages else ""
+    if "'flashcards' array" in system:
+        n = int(re.search(r"Create (\d+) flashcards", system).group(1))
+        return json.dumps({"flashcards": [_flashcard(f"単語{next(_counter)}") for _ in range(n)]}, ensure_ascii=False)
+    if "Create a flashcard" in system:
+        return json.dumps(_flashcard(f"単語{next(_counter)}"), ensure_ascii=False)
+    if "Generate a brief situation" in system:
+        return json.dumps({"situation": "You are greeting a new colleague"})
+    if "Evaluate the following conversation" in system:
+        return json.dumps({"satisfactory": True, "feedback": "Great job using polite greetings!"})
+    if "engaging in a conversation" in system:
+        return json.dumps({"speaker": "AI", "text": "こんにちは！はじめまして！"}, ensure_ascii=False)
+    if "Translate the message" in system:
+        return "Hello! Nice to meet you!"
+    if "Translate '" in system:
+        return "```json\n" + json.dumps(_sentence(), ensure_ascii=False) + "\n```"
+    return "OK"
+
+def create_openai_app(upstream: Upstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if not await upstream.delay():
+            return JSONResponse(status_code=500, content={"error": {"message": "Simulated upstream error", "type": "server_error"}})
+        content = completion_content(body.get("messages", []))
+        return {
+            "id": f"chatcmpl-fake-{next(_counter)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return upstream.stats()
+
+    return app
+
+def create_pexels_app(upstream: Upstream) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/v1/search")
+    async def search(query: str, per_page: int = 1):
+        if not await upstream.delay():
+            return JSONResponse(status_code=500, content={"error": "Simulated upstream error"})
+        slug = re.sub(r"\W+", "-", query.lower()).strip("-") or "image"
+        return {
+            "page": 1,
+            "per_page": per_page,
+            "photos": [{"id": 1, "src": {"medium": f"https://images.example.com/{slug}.jpeg"}}],
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return upstream.stats()
+
+    return app
+
+async def serve(host: str, openai_port: int, pexels_port: int, openai: Upstream, pexels: Upstream):
+    servers = [
+        uvicorn.Server(uvicorn.Config(create_openai_app(openai), host=host, port=openai_port, log_level="warning")),
+        uvicorn.Server(uvicorn.Config(create_pexels_app(pexels), host=host, port=pexels_port, log_level="warning")),
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--openai-port", type=int, default=9101)
+    parser.add_argument("--pexels-port", type=int, default=9102)
+    for name, latency, jitter in (("openai", 400, 150), ("pexels", 80, 30)):
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=latency)
+        parser.add_argument(f"--{name}-jitter-ms", type=float, default=jitter)
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None, help="seed the latency/error RNG for repeatable runs")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    openai = Upstream(args.openai_latency_ms, args.openai_jitter_ms, args.openai_error_rate)
+    pexels = Upstream(args.pexels_latency_ms, args.pexels_jitter_ms, args.pexels_error_rate)
+    asyncio.run(serve(args.host, args.openai_port, args.pexels_port, openai, pexels))
+
+if __name__ == "__main__":
+    main()
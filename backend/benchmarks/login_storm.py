@@ -0,0 +1,105 @@
+"""Measure login latency and the latency of unrelated requests during a login storm.
+
+Run against a live server, e.g.:
+
+    uvicorn app.main:app --port 8000
+    python benchmarks/login_storm.py --url http://localhost:8000 --logins 200 --concurrency 50
+
+Non-auth latency is sampled from GET / (no DB, no bcrypt). If bcrypt ran on the event loop,
+those probes would queue behind every hash; with the worker pool they should stay flat.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+import httpx
+
+def percentiles(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(0.50) * 1000, 1),
+        "p95_ms": round(pick(0.95) * 1000, 1),
+        "p99_ms": round(pick(0.99) * 1000, 1),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+    }
+
+async def register(client: httpx.AsyncClient, username: str, password: str):
+    response = await client.post("/auth/register", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": password,
+        "learning_language": "Japanese",
+    })
+    response.raise_for_status()
+
+async def login_storm(client: httpx.AsyncClient, users: list[str], password: str, total: int, concurrency: int) -> dict:
+    latencies, statuses = [], {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", data={"username": users[i % len(users)], "password": password})
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return {"latency": percentiles(latencies), "statuses": statuses}
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=10, help="Accounts to create and log in as")
+    parser.add_argument("--logins", type=int, default=200, help="Total login requests")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at once")
+    parser.add_argument("--probe-interval", type=float, default=0.01, help="Seconds between GET / probes")
+    args = parser.parse_args()
+
+    password = "bench-password"
+    users = [f"bench-{uuid.uuid4().hex[:8]}" for _ in range(args.users)]
+    limits = httpx.Limits(max_connections=args.concurrency + 10)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        for username in users:
+            await register(client, username, password)
+
+        baseline_stop = asyncio.Event()
+        baseline_task = asyncio.create_task(probe(client, baseline_stop, args.probe_interval))
+        await asyncio.sleep(2)
+        baseline_stop.set()
+        baseline = await baseline_task
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop, args.probe_interval))
+        start = time.perf_counter()
+        storm = await login_storm(client, users, password, args.logins, args.concurrency)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        during = await probe_task
+
+    print(json.dumps({
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "logins_per_s": round(args.logins / elapsed, 1),
+        "login": storm,
+        "non_auth_idle": percentiles(baseline),
+        "non_auth_during_storm": percentiles(during),
+    }, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Measure cold-start time of the API: module import plus the lifespan startup hook.
+
+Each run happens in a fresh interpreter so import caches don't flatter the numbers:
+
+    python benchmarks/startup_time.py --runs 5
+    DB_INIT_ON_STARTUP=1 python benchmarks/startup_time.py --runs 5   # old per-worker init path
+
+Run from the backend directory with DATABASE_URL pointing at a migrated, seeded database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+from app.database import engine
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    await engine.dispose()
+    return ready
+
+ready = asyncio.run(boot())
+print(json.dumps({"import_s": imported - start, "lifespan_s": ready - imported, "total_s": ready - start}))
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": backend_dir}
+    results = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD], cwd=backend_dir, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {
+        key: {
+            "median_ms": round(statistics.median(r[key] for r in results) * 1000, 1),
+            "max_ms": round(max(r[key] for r in results) * 1000, 1),
+        }
+        for key in ("import_s", "lifespan_s", "total_s")
+    }
+    print(json.dumps({"runs": args.runs, "db_init_on_startup": os.getenv("DB_INIT_ON_STARTUP", "0"), **summary}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import async_engine_from_config
+from app.database import Base, DATABASE_URL
+
+# Register every model on Base.metadata so autogenerate sees the full schema
+from app.models import (  # noqa: F401
+    user, category, lesson, flashcard, flashcard_history, sentence, progress, dialogue,
+    mistaken_activity, image_cache, llm_cache, lesson_plan, category_progress, recently_used, review_state
+)
+
+config = context.config
+target_metadata = Base.metadata
+
+# Leave logging alone when invoked from inside the app (app.db_seed.upgrade_database)
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting (`alembic upgrade head --sql`)."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def do_run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite"
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+async def run_async_migrations():
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+    connectable = async_engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
+
+def run_migrations_online():
+    # app.db_seed.upgrade_database hands over a connection from the running event loop
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        do_run_migrations(connection)
+        return
+    asyncio.run(run_async_migrations())
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,156 @@
+"""Initial schema, as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Databases created by create_all before migrations existed already have these tables;
+    # only create what is missing so `alembic upgrade head` adopts them in place.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String()),
+            sa.Column("email", sa.String()),
+            sa.Column("hashed_password", sa.String()),
+            sa.Column("learning_language", sa.String()),
+            sa.Column("openai_thread_id", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("last_login", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "categories" not in existing:
+        op.create_table(
+            "categories",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("chapter", sa.Integer()),
+            sa.Column("difficulty", sa.String()),
+        )
+        op.create_index("ix_categories_id", "categories", ["id"])
+        op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+
+    if "lessons" not in existing:
+        op.create_table(
+            "lessons",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("description", sa.String()),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+        )
+        op.create_index("ix_lessons_id", "lessons", ["id"])
+        op.create_index("ix_lessons_name", "lessons", ["name"])
+
+    if "flashcards" not in existing:
+        op.create_table(
+            "flashcards",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("word", sa.String(), nullable=False),
+            sa.Column("translation", sa.String(), nullable=False),
+            sa.Column("type", sa.String(), nullable=False),
+            sa.Column("english_equivalents", sa.String(), nullable=False),
+            sa.Column("definition", sa.String(), nullable=False),
+            sa.Column("english_definition", sa.String(), nullable=False),
+            sa.Column("example_sentence", sa.String(), nullable=False),
+            sa.Column("english_sentence", sa.String(), nullable=False),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("used_count", sa.Integer()),
+            sa.Column("options", sa.String(), nullable=True),
+        )
+        op.create_index("ix_flashcards_id", "flashcards", ["id"])
+
+    if "flashcard_history" not in existing:
+        op.create_table(
+            "flashcard_history",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("flashcard_id", sa.Integer(), sa.ForeignKey("flashcards.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("lesson_id", sa.Integer(), sa.ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+            sa.UniqueConstraint("user_id", "flashcard_id", "lesson_id", name="uix_user_flashcard_lesson"),
+        )
+        op.create_index("ix_flashcard_history_id", "flashcard_history", ["id"])
+
+    if "sentences" not in existing:
+        op.create_table(
+            "sentences",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("text", sa.String(), nullable=False),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+            sa.Column("used_count", sa.Integer()),
+            sa.Column("last_used_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_sentences_id", "sentences", ["id"])
+
+    if "sentence_translations" not in existing:
+        op.create_table(
+            "sentence_translations",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("sentence_id", sa.Integer(), sa.ForeignKey("sentences.id")),
+            sa.Column("language", sa.String(), nullable=False),
+            sa.Column("translated_text", sa.String(), nullable=False),
+            sa.Column("translated_words", sa.String(), nullable=False),
+            sa.Column("hints", sa.String(), nullable=True),
+            sa.Column("explanation", sa.String(), nullable=True),
+        )
+        op.create_index("ix_sentence_translations_id", "sentence_translations", ["id"])
+
+    if "progress" not in existing:
+        op.create_table(
+            "progress",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+            sa.Column("activity_id", sa.String()),
+            sa.Column("type", sa.String()),
+            sa.Column("completed", sa.Boolean()),
+            sa.Column("result", sa.String()),
+        )
+        op.create_index("ix_progress_id", "progress", ["id"])
+
+    if "dialogues" not in existing:
+        op.create_table(
+            "dialogues",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("situation", sa.String(), nullable=False),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+            sa.Column("lesson_id", sa.Integer(), sa.ForeignKey("lessons.id")),
+        )
+        op.create_index("ix_dialogues_id", "dialogues", ["id"])
+
+    if "mistaken_activities" not in existing:
+        op.create_table(
+            "mistaken_activities",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+            sa.Column("lesson_id", sa.Integer(), sa.ForeignKey("lessons.id")),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id")),
+            sa.Column("activity_id", sa.String()),
+            sa.Column("activity_type", sa.String()),
+            sa.Column("word", sa.String(), nullable=True),
+        )
+        op.create_index("ix_mistaken_activities_id", "mistaken_activities", ["id"])
+        op.create_index("ix_mistaken_activities_activity_id", "mistaken_activities", ["activity_id"])
+
+def downgrade():
+    for table in (
+        "mistaken_activities", "dialogues", "progress", "sentence_translations", "sentences",
+        "flashcard_history", "flashcards", "lessons", "categories", "users"
+    ):
+        op.drop_table(table)
@@ -0,0 +1,75 @@
+"""Image/LLM caches, lesson plans, category progress summaries and users.progress_version
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # These were also created by create_all on worker startup, so skip whatever already exists.
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    if "image_cache" not in existing:
+        op.create_table(
+            "image_cache",
+            sa.Column("query", sa.String(), primary_key=True),
+            sa.Column("image_url", sa.String(), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        )
+
+    if "llm_response_cache" not in existing:
+        op.create_table(
+            "llm_response_cache",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("prompt_type", sa.String(), nullable=False),
+            sa.Column("response", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_llm_response_cache_expires_at", "llm_response_cache", ["expires_at"])
+
+    if "lesson_plans" not in existing:
+        op.create_table(
+            "lesson_plans",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("lesson_id", sa.Integer(), sa.ForeignKey("lessons.id"), nullable=False),
+            sa.Column("is_new_lesson", sa.Boolean(), nullable=False),
+            sa.Column("activities", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("user_id", "lesson_id", name="uq_lesson_plans_user_lesson"),
+        )
+        op.create_index("ix_lesson_plans_id", "lesson_plans", ["id"])
+
+    if "category_progress" not in existing:
+        op.create_table(
+            "category_progress",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("category_id", sa.Integer(), sa.ForeignKey("categories.id"), nullable=False),
+            sa.Column("completed_lesson_ids", sa.Text(), nullable=False),
+            sa.Column("activities_completed", sa.Integer(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("user_id", "category_id", name="uq_category_progress_user_category"),
+        )
+        op.create_index("ix_category_progress_id", "category_progress", ["id"])
+        op.create_index("ix_category_progress_user_id", "category_progress", ["user_id"])
+
+    user_columns = {column["name"] for column in inspector.get_columns("users")}
+    if "progress_version" not in user_columns:
+        op.add_column("users", sa.Column("progress_version", sa.Integer(), server_default="0", nullable=False))
+
+def downgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("progress_version")
+    for table in ("category_progress", "lesson_plans", "llm_response_cache", "image_cache"):
+        op.drop_table(table)
@@ -0,0 +1,36 @@
+"""Composite indexes for the per-user/per-category hot queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index("ix_progress_user_category", "progress", ["user_id", "category_id"])
+    op.create_index("ix_flashcards_user_category_word", "flashcards", ["user_id", "category_id", "word"])
+    op.create_index("ix_mistaken_activities_user_category", "mistaken_activities", ["user_id", "category_id"])
+    op.create_index("ix_dialogues_category_lesson", "dialogues", ["category_id", "lesson_id"])
+    op.create_index("ix_sentences_text_category", "sentences", ["text", "category_id"])
+
+    # Concurrent first requests could store the same translation twice; keep the oldest row.
+    op.execute(
+        "DELETE FROM sentence_translations WHERE sentence_id IS NOT NULL AND id NOT IN ("
+        "SELECT MIN(id) FROM sentence_translations WHERE sentence_id IS NOT NULL GROUP BY sentence_id, language)"
+    )
+    with op.batch_alter_table("sentence_translations") as batch_op:
+        batch_op.create_unique_constraint("uq_sentence_translations_sentence_language", ["sentence_id", "language"])
+
+def downgrade():
+    with op.batch_alter_table("sentence_translations") as batch_op:
+        batch_op.drop_constraint("uq_sentence_translations_sentence_language", type_="unique")
+    op.drop_index("ix_sentences_text_category", table_name="sentences")
+    op.drop_index("ix_dialogues_category_lesson", table_name="dialogues")
+    op.drop_index("ix_mistaken_activities_user_category", table_name="mistaken_activities")
+    op.drop_index("ix_flashcards_user_category_word", table_name="flashcards")
+    op.drop_index("ix_progress_user_category", table_name="progress")
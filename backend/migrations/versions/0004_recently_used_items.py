@@ -0,0 +1,27 @@
+"""Shared per-(user, lesson) recently-used sentence store
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "recently_used_items",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("lesson_id", sa.Integer(), sa.ForeignKey("lessons.id"), primary_key=True),
+        sa.Column("item_id", sa.Integer(), primary_key=True),
+        sa.Column("used_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_recently_used_items_used_at", "recently_used_items", ["used_at"])
+
+def downgrade():
+    op.drop_index("ix_recently_used_items_used_at", table_name="recently_used_items")
+    op.drop_table("recently_used_items")
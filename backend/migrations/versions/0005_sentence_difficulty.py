@@ -0,0 +1,26 @@
+"""Sentence difficulty and the index behind bank-first sentence selection
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Earlier sentences were never tagged, so they count as basic
+    with op.batch_alter_table("sentences") as batch_op:
+        batch_op.add_column(sa.Column("difficulty", sa.Integer(), server_default="1", nullable=False))
+    op.create_index(
+        "ix_sentences_category_difficulty_last_used", "sentences", ["category_id", "difficulty", "last_used_at"]
+    )
+
+def downgrade():
+    op.drop_index("ix_sentences_category_difficulty_last_used", table_name="sentences")
+    with op.batch_alter_table("sentences") as batch_op:
+        batch_op.drop_column("difficulty")
@@ -0,0 +1,48 @@
+"""Normalized-text hash on sentences, unique per category
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+import hashlib
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def _text_hash(text: str) -> str:
+    # Frozen copy of app.services.sentence_bank.sentence_text_hash as of this revision
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = "".join(char for char in text if not unicodedata.category(char).startswith("P"))
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+def upgrade():
+    op.add_column("sentences", sa.Column("text_hash", sa.String(64), nullable=True))
+
+    # Hash the oldest sentence of each normalized text per category. Later duplicates keep a NULL
+    # hash: progress records and lesson plans may still point at them, so they are not deleted.
+    bind = op.get_bind()
+    seen = set()
+    updates = []
+    for row in bind.execute(sa.text("SELECT id, category_id, text FROM sentences ORDER BY id")):
+        key = (row.category_id, _text_hash(row.text))
+        if key not in seen:
+            seen.add(key)
+            updates.append({"id": row.id, "text_hash": key[1]})
+    if updates:
+        bind.execute(sa.text("UPDATE sentences SET text_hash = :text_hash WHERE id = :id"), updates)
+
+    with op.batch_alter_table("sentences") as batch_op:
+        batch_op.create_unique_constraint("uq_sentences_category_text_hash", ["category_id", "text_hash"])
+    # Lookups by exact text are replaced by the hash constraint
+    op.drop_index("ix_sentences_text_category", table_name="sentences")
+
+def downgrade():
+    op.create_index("ix_sentences_text_category", "sentences", ["text", "category_id"])
+    with op.batch_alter_table("sentences") as batch_op:
+        batch_op.drop_constraint("uq_sentences_category_text_hash", type_="unique")
+        batch_op.drop_column("text_hash")
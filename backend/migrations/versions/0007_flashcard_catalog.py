@@ -0,0 +1,92 @@
+"""Shared flashcard catalog; flashcards become per-user assignments of catalog entries
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+CONTENT_COLUMNS = (
+    "translation", "type", "english_equivalents", "definition", "english_definition",
+    "example_sentence", "english_sentence", "options",
+)
+NULLABLE_CONTENT = {"options"}
+
+catalog = sa.table(
+    "flashcard_catalog",
+    sa.column("id", sa.Integer), sa.column("language", sa.String), sa.column("category_id", sa.Integer),
+    sa.column("word", sa.String), sa.column("difficulty", sa.Integer),
+    *(sa.column(name, sa.String) for name in CONTENT_COLUMNS),
+)
+
+def upgrade():
+    op.create_table(
+        "flashcard_catalog",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("language", sa.String(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("word", sa.String(), nullable=False),
+        *(sa.Column(name, sa.String(), nullable=name in NULLABLE_CONTENT) for name in CONTENT_COLUMNS),
+        sa.Column("lesson_name", sa.String(), nullable=True),
+        sa.Column("difficulty", sa.Integer(), server_default="1", nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("language", "category_id", "word", name="uq_flashcard_catalog_language_category_word"),
+    )
+    op.create_index("ix_flashcard_catalog_id", "flashcard_catalog", ["id"])
+
+    # The oldest card of each (owner's language, category, word) becomes the catalog entry; every
+    # card, duplicates included, keeps its id so lesson plans and flashcard_history stay valid.
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT f.id, COALESCE(u.learning_language, 'Japanese') AS language, f.category_id, f.word, "
+        + ", ".join(f"f.{name}" for name in CONTENT_COLUMNS)
+        + " FROM flashcards f LEFT JOIN users u ON u.id = f.user_id ORDER BY f.id"
+    )).mappings().all()
+    entries = {}
+    for row in rows:
+        key = (row["language"], row["category_id"], row["word"])
+        if key not in entries:
+            entries[key] = {"language": key[0], "category_id": key[1], "word": key[2], "difficulty": 1,
+                            **{name: row[name] for name in CONTENT_COLUMNS}}
+    if entries:
+        op.bulk_insert(catalog, list(entries.values()))
+    catalog_ids = {
+        (entry.language, entry.category_id, entry.word): entry.id
+        for entry in bind.execute(sa.select(catalog.c.id, catalog.c.language, catalog.c.category_id, catalog.c.word))
+    }
+
+    op.add_column("flashcards", sa.Column("catalog_id", sa.Integer(), nullable=True))
+    if rows:
+        bind.execute(
+            sa.text("UPDATE flashcards SET catalog_id = :catalog_id WHERE id = :id"),
+            [{"id": row["id"], "catalog_id": catalog_ids[(row["language"], row["category_id"], row["word"])]} for row in rows]
+        )
+    with op.batch_alter_table("flashcards") as batch_op:
+        batch_op.alter_column("catalog_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key("fk_flashcards_catalog_id", "flashcard_catalog", ["catalog_id"], ["id"])
+        for name in CONTENT_COLUMNS:
+            batch_op.drop_column(name)
+
+def downgrade():
+    with op.batch_alter_table("flashcards") as batch_op:
+        for name in CONTENT_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.String(), nullable=True))
+    op.execute(
+        "UPDATE flashcards SET "
+        + ", ".join(f"{name} = (SELECT c.{name} FROM flashcard_catalog c WHERE c.id = flashcards.catalog_id)" for name in CONTENT_COLUMNS)
+    )
+    with op.batch_alter_table("flashcards") as batch_op:
+        for name in CONTENT_COLUMNS:
+            if name not in NULLABLE_CONTENT:
+                batch_op.alter_column(name, existing_type=sa.String(), nullable=False)
+        batch_op.drop_constraint("fk_flashcards_catalog_id", type_="foreignkey")
+        batch_op.drop_column("catalog_id")
+    op.drop_index("ix_flashcard_catalog_id", table_name="flashcard_catalog")
+    op.drop_table("flashcard_catalog")
@@ -0,0 +1,34 @@
+"""SM-2 review state per user flashcard, with the due-queue index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "flashcard_review_states",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("flashcard_id", sa.Integer(), nullable=False),
+        sa.Column("ease", sa.Float(), nullable=False),
+        sa.Column("interval_days", sa.Integer(), nullable=False),
+        sa.Column("repetitions", sa.Integer(), nullable=False),
+        sa.Column("lapses", sa.Integer(), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=False),
+        sa.Column("reviewed_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["flashcard_id"], ["flashcards.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "flashcard_id"),
+    )
+    op.create_index("ix_flashcard_review_states_user_due", "flashcard_review_states", ["user_id", "due_at"])
+
+def downgrade():
+    op.drop_index("ix_flashcard_review_states_user_due", table_name="flashcard_review_states")
+    op.drop_table("flashcard_review_states")
@@ -0,0 +1,22 @@
+"""Record when each mistake was made, so checkpoint plans can pick up later ones
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Existing mistakes get the migration time, so each stored checkpoint plan is rebuilt once
+    with op.batch_alter_table("mistaken_activities") as batch_op:
+        batch_op.add_column(sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False))
+
+def downgrade():
+    with op.batch_alter_table("mistaken_activities") as batch_op:
+        batch_op.drop_column("created_at")
@@ -0,0 +1,29 @@
+"""Epoch instead of NULL for never-used sentences, so the bank's ORDER BY uses its index
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+EPOCH = "'1970-01-01 00:00:00'"
+
+def upgrade():
+    # ix_sentences_category_difficulty_last_used is ascending, which PostgreSQL stores NULLS LAST;
+    # with no NULLs left, ORDER BY last_used_at reads straight off it
+    op.execute(f"UPDATE sentences SET last_used_at = {EPOCH} WHERE last_used_at IS NULL")
+    with op.batch_alter_table("sentences") as batch_op:
+        batch_op.alter_column(
+            "last_used_at", existing_type=sa.DateTime(), nullable=False, server_default=sa.text(EPOCH)
+        )
+
+def downgrade():
+    with op.batch_alter_table("sentences") as batch_op:
+        batch_op.alter_column("last_used_at", existing_type=sa.DateTime(), nullable=True, server_default=None)
+    op.execute(f"UPDATE sentences SET last_used_at = NULL WHERE last_used_at = {EPOCH}")